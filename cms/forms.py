@@ -0,0 +1,49 @@
+"""
+Admin form bases for images and documents (WAGTAILIMAGES_IMAGE_FORM_BASE,
+WAGTAILDOCS_DOCUMENT_FORM_BASE).
+
+Replacing a file in Wagtail's edit form deletes the old file outright; with
+upload dedup (cms.signals) another image or document may still use it, so it
+is only deleted once nothing references it.
+
+Image uploads are checked from their header (main.validators.check_image_header)
+rather than by Wagtail's pixel-count check, which decodes the whole image in
+the request (WAGTAILIMAGES_MAX_IMAGE_PIXELS is unset); the full decode runs in
+the background (cms.tasks.verify_image).
+"""
+from django.core.files.uploadedfile import UploadedFile
+from wagtail.documents.forms import BaseDocumentForm
+from wagtail.images.forms import BaseImageForm
+
+from main.validators import check_image_header
+
+from .signals import delete_unreferenced_file
+
+
+class SharedFileImageForm(BaseImageForm):
+    def clean_file(self):
+        f = self.cleaned_data.get("file")
+        if isinstance(f, UploadedFile) and not f.name.lower().endswith(".svg"):
+            check_image_header(f)
+        return f
+
+    def save(self, commit=True):
+        original = self.original_file if "file" in self.changed_data else None
+        if original:
+            self.original_file = None  # handled below instead
+        instance = super().save(commit=commit)
+        if commit and original and original.name != instance.file.name:
+            instance.renditions.all().delete()
+            delete_unreferenced_file(type(instance), original.storage, original.name)
+        return instance
+
+
+class SharedFileDocumentForm(BaseDocumentForm):
+    def save(self, commit=True):
+        original = self.original_file if "file" in self.changed_data else None
+        if original:
+            self.original_file = None  # handled below instead
+        instance = super().save(commit=commit)
+        if commit and original and original.name != instance.file.name:
+            delete_unreferenced_file(type(instance), original.storage, original.name)
+        return instance
@@ -0,0 +1,240 @@
+"""
+Image renditions for the API: a fallback rendition plus modern-format variants.
+
+Every serialised image carries a ``sources`` list, best format first, that the
+frontend drops into ``<picture>``:
+
+    "sources": [
+        {"type": "image/avif", "url": "…", "width": 1600, "height": 900},
+        {"type": "image/webp", "url": "…", "width": 1600, "height": 900},
+    ]
+
+The variants are ordinary Wagtail renditions (the fallback spec with a
+``|format-…`` filter appended), so each is generated once, stored alongside the
+fallback and looked up from the rendition cache afterwards. AVIF is only
+offered when the installed Pillow can encode it.
+
+StreamField images also get a width ladder (WIDTH_LADDER, cropped to the
+block's aspect) as ``srcset`` strings, on the fallback and on each source,
+plus a ``sizes`` hint from the block's layout (see sizes_hint).
+
+Each image also stores an inline placeholder (a tiny base64 WebP data URI) and
+its dominant colour, computed once on upload (see make_placeholder), so
+listings paint a blur-up without fetching anything.
+"""
+import base64
+import io
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.fields import Field
+
+# Variant formats in order of preference (smallest first).
+VARIANT_FORMATS = ("avif", "webp")
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+# srcset widths; the largest one ≤ FALLBACK_WIDTH is also the plain `url`.
+WIDTH_LADDER   = (400, 800, 1200, 1600, 2400)
+FALLBACK_WIDTH = 1600
+
+# PrettyImageBlock `aspect` choices → crop ratio ("auto" keeps the original).
+ASPECTS = {"16x9": (16, 9), "4x3": (4, 3), "1x1": (1, 1)}
+
+# Thumbnail served next to every StreamField / site-bundle image.
+THUMB_SPEC = "fill-600x400"
+
+# Widest the content column gets on the frontend (max-w-5xl minus px-7 padding).
+CONTENT_WIDTH = 968
+
+
+@lru_cache(maxsize=1)
+def variant_formats():
+    """The VARIANT_FORMATS this Pillow build can write (settings.IMAGE_VARIANT_FORMATS
+    narrows the list, e.g. ``["webp"]`` to skip the slower AVIF encode)."""
+    from PIL import Image
+
+    try:  # Pillow < 11.3 only encodes AVIF through the plugin
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        pass
+    Image.init()
+    writable = {ext.lstrip(".") for ext, fmt in Image.registered_extensions().items() if fmt in Image.SAVE}
+    wanted = getattr(settings, "IMAGE_VARIANT_FORMATS", None) or VARIANT_FORMATS
+    return tuple(fmt for fmt in VARIANT_FORMATS if fmt in wanted and fmt in writable)
+
+
+PLACEHOLDER_SIZE = 24   # px, longest side
+
+
+def make_placeholder(f):
+    """(data URI, "#rrggbb") for an image file: a PLACEHOLDER_SIZE thumbnail
+    encoded as low-quality WebP, and the most common of a few quantised
+    colours. Returns ("", "") for files Pillow cannot read (e.g. SVG)."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        f.seek(0)
+        with Image.open(f) as im:
+            im.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))  # JPEG: decode downscaled
+            im = ImageOps.exif_transpose(im).convert("RGB")
+            im.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    except (UnidentifiedImageError, OSError, ValueError):
+        return "", ""
+    finally:
+        f.seek(0)
+
+    buf = io.BytesIO()
+    im.save(buf, "WEBP", quality=40, method=6)
+    uri = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+    quantised = im.quantize(colors=5)
+    palette = quantised.getpalette()
+    _, index = max(quantised.getcolors())
+    color = "#{:02x}{:02x}{:02x}".format(*palette[index * 3:index * 3 + 3])
+    return uri, color
+
+
+def placeholder_rep(image):
+    """Inline placeholder for the API: ``{"url": data URI, "color": "#…"}``
+    (``url`` keeps the shape of the old *_lqip rendition fields)."""
+    if not image or not getattr(image, "lqip", ""):
+        return None
+    return {"url": image.lqip, "color": image.dominant_color}
+
+
+def variant_spec(spec, fmt):
+    return f"{spec}|format-{fmt}"
+
+
+def rendition_set(image, *specs):
+    """Renditions for each spec and its format variants, fetched (or created)
+    in one pass. Returns {spec: (fallback, [(format, rendition), …])}."""
+    specs = list(dict.fromkeys(specs))
+    formats = () if image.is_svg() else variant_formats()
+    wanted = [s for spec in specs for s in (spec, *(variant_spec(spec, f) for f in formats))]
+    renditions = image.get_renditions(*wanted)
+    return {
+        spec: (renditions[spec], [(f, renditions[variant_spec(spec, f)]) for f in formats])
+        for spec in specs
+    }
+
+
+def ladder_spec(width, aspect=None):
+    if aspect in ASPECTS:
+        w, h = ASPECTS[aspect]
+        return f"fill-{width}x{round(width * h / w)}"
+    return f"width-{width}"
+
+
+def ladder_specs(image, aspect=None):
+    """Rendition specs for the widths this image can fill (never upscaled:
+    a narrower original ends the ladder at its own width). Returns
+    (specs, fallback_spec)."""
+    widths = sorted({w for w in WIDTH_LADDER if w < image.width} | {min(image.width, WIDTH_LADDER[-1])})
+    fallback = max([w for w in widths if w <= FALLBACK_WIDTH] or widths[:1])
+    return [ladder_spec(w, aspect) for w in widths], ladder_spec(fallback, aspect)
+
+
+def sizes_hint(alignment="center", width_pct=100):
+    """`sizes` for an image block: a share of the content column (full width
+    for wide/full alignment), which is the whole viewport minus padding on
+    narrow screens."""
+    pct = 100 if alignment in ("wide", "full") else max(20, min(100, width_pct or 100))
+    if pct == 100:
+        return f"(max-width: {CONTENT_WIDTH + 56}px) calc(100vw - 56px), {CONTENT_WIDTH}px"
+    return (
+        f"(max-width: {CONTENT_WIDTH + 56}px) calc((100vw - 56px) * {pct / 100:g}), "
+        f"{round(CONTENT_WIDTH * pct / 100)}px"
+    )
+
+
+def page_rendition_specs():
+    """Specs of the ImageRenditionField API fields declared on page models."""
+    from wagtail.images.api.fields import ImageRenditionField
+    from wagtail.models import get_page_models
+
+    specs = []
+    for model in get_page_models():
+        for field in getattr(model, "api_fields", None) or []:
+            serializer = getattr(field, "serializer", None)
+            if isinstance(serializer, ImageRenditionField):
+                specs.append(serializer.filter_spec)
+    return list(dict.fromkeys(specs))
+
+
+def api_specs(image, aspects=(None,)):
+    """Every rendition spec the API can serve for ``image``: the StreamField
+    srcset ladder (per crop aspect), thumb and site-bundle renditions with
+    their format variants, plus the page ImageRenditionField specs."""
+    from main.api import SITE_IMAGE_SPECS
+
+    specs = []
+    for aspect in aspects:
+        specs += ladder_specs(image, aspect)[0]
+    specs += [THUMB_SPEC, *SITE_IMAGE_SPECS]
+    if not image.is_svg():
+        specs += [variant_spec(s, f) for s in specs for f in variant_formats()]
+    specs += page_rendition_specs()
+    return list(dict.fromkeys(specs))
+
+
+def _srcset(renditions):
+    # A crop can cap several ladder steps at the same width; srcset needs
+    # unique descriptors.
+    by_width = {}
+    for r in renditions:
+        by_width.setdefault(r.width, r.url)
+    return ", ".join(f"{url} {w}w" for w, url in by_width.items())
+
+
+def sources(variants, ladder=None):
+    """``ladder``: per-format lists of the width-ladder renditions, for srcset."""
+    out = []
+    for fmt, r in variants:
+        source = {"type": MIME_TYPES[fmt], "url": r.url, "width": r.width, "height": r.height}
+        if ladder:
+            source["srcset"] = _srcset(ladder[fmt])
+        out.append(source)
+    return out
+
+
+def image_rep(image, spec_full, spec_thumb, alt=None, ladder=()):
+    """The shared API shape: fallback url/size, thumb, and their ``sources``.
+    With ``ladder`` (rendition specs, normally including spec_full) the full
+    image and each source also get a ``srcset``. None until the original has
+    been verified (cms.tasks.verify_image): a pending one would be decoded in
+    the request, a quarantined one not at all."""
+    if getattr(image, "file_status", "verified") != "verified":
+        return None
+    renditions = rendition_set(image, spec_full, spec_thumb, *ladder)
+    full, full_variants = renditions[spec_full]
+    thumb, thumb_variants = renditions[spec_thumb]
+    rep = {
+        "url": full.url,
+        "width": full.width,
+        "height": full.height,
+    }
+    by_format = None
+    if ladder:
+        rep["srcset"] = _srcset(renditions[spec][0] for spec in ladder)
+        by_format = {fmt: [] for fmt, _ in full_variants}
+        for spec in ladder:
+            for fmt, r in renditions[spec][1]:
+                by_format[fmt].append(r)
+    rep.update({
+        "sources": sources(full_variants, by_format),
+        "thumb": thumb.url,
+        "thumb_sources": sources(thumb_variants),
+        "placeholder": placeholder_rep(image),
+        "alt": alt or image.title,
+    })
+    return rep
+
+
+class PlaceholderField(Field):
+    """API field for an image's inline placeholder, e.g.
+    ``APIField("card_lqip", serializer=PlaceholderField(source="card_image"))``."""
+
+    def to_representation(self, image):
+        return placeholder_rep(image)
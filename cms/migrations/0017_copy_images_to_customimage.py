@@ -0,0 +1,65 @@
+"""
+Data migration: copy the Wagtail image library (wagtailimages.Image and its
+renditions) into cms.CustomImage / cms.CustomRendition, keeping primary keys so
+StreamField image references and page/settings foreign keys stay valid, and
+moving image tags over. Files are not touched: the rows point at the same
+media paths. Non-destructive: the old rows stay in place.
+
+Placeholders are filled afterwards by `python manage.py image_placeholders`.
+"""
+from django.core.management.color import no_style
+from django.db import migrations
+
+IMAGE_FIELDS = [
+    "id", "title", "file", "description", "width", "height", "created_at",
+    "focal_point_x", "focal_point_y", "focal_point_width", "focal_point_height",
+    "file_size", "file_hash", "collection_id", "uploaded_by_user_id",
+]
+RENDITION_FIELDS = ["id", "filter_spec", "file", "width", "height", "focal_point_key", "image_id"]
+
+
+def forwards(apps, schema_editor):
+    OldImage = apps.get_model("wagtailimages", "Image")
+    OldRendition = apps.get_model("wagtailimages", "Rendition")
+    CustomImage = apps.get_model("cms", "CustomImage")
+    CustomRendition = apps.get_model("cms", "CustomRendition")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+
+    if CustomImage.objects.exists():
+        return
+
+    CustomImage.objects.bulk_create(
+        (CustomImage(**row) for row in OldImage.objects.values(*IMAGE_FIELDS).iterator()),
+        batch_size=500,
+    )
+    CustomRendition.objects.bulk_create(
+        (CustomRendition(**row) for row in OldRendition.objects.values(*RENDITION_FIELDS).iterator()),
+        batch_size=500,
+    )
+
+    old_ct = ContentType.objects.filter(app_label="wagtailimages", model="image").first()
+    if old_ct:
+        new_ct, _ = ContentType.objects.get_or_create(app_label="cms", model="customimage")
+        TaggedItem.objects.filter(content_type=old_ct).update(content_type=new_ct)
+
+    # Rows were inserted with explicit ids; move the sequences past them.
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [CustomImage, CustomRendition]):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cms", "0016_customimage_customrendition"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("taggit", "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx"),
+        ("wagtailimages", "0027_image_description"),
+        ("main", "0017_migrate_sitecopy_siteasset_to_sitecontent"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
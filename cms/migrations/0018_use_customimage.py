@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0017_copy_images_to_customimage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogpage',
+            name='card_image',
+            field=models.ForeignKey(blank=True, help_text='Thumbnail shown on the blog index card. Falls back to the hero image.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cms.customimage'),
+        ),
+        migrations.AlterField(
+            model_name='blogpage',
+            name='hero_image',
+            field=models.ForeignKey(blank=True, help_text='Optional header image.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cms.customimage'),
+        ),
+        migrations.AlterField(
+            model_name='portfolioprojectpage',
+            name='card_image',
+            field=models.ForeignKey(blank=True, help_text='Square thumbnail shown on the work list. Falls back to the cover image.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cms.customimage'),
+        ),
+        migrations.AlterField(
+            model_name='portfolioprojectpage',
+            name='cover_image',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cms.customimage'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0018_use_customimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customimage',
+            name='upload_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=40),
+        ),
+    ]
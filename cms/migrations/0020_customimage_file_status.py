@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:51
+
+import cms.models
+import wagtail.images.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0019_customimage_upload_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customimage',
+            name='file_status',
+            field=models.CharField(choices=[('pending', 'Pending check'), ('verified', 'Verified'), ('quarantined', 'Quarantined')], default='verified', editable=False, max_length=12),
+        ),
+        migrations.AlterField(
+            model_name='customimage',
+            name='file',
+            field=cms.models.HeaderImageField(height_field='height', upload_to=wagtail.images.models.get_upload_to, verbose_name='file', width_field='width'),
+        ),
+    ]
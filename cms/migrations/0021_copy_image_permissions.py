@@ -0,0 +1,59 @@
+"""
+Data migration: give every group and user holding a wagtailimages image
+permission the matching cms.CustomImage one (0017 copied the images, not who
+may edit them), including Wagtail's per-collection group permissions.
+
+The wagtailimages permissions stay in place: Wagtail's image permission policy
+still checks them (auth_model=wagtailimages.Image), as does the image chooser
+for ``choose_image``, which has no CustomImage counterpart.
+"""
+from django.conf import settings
+from django.db import migrations
+
+ACTIONS = ("add", "change", "delete", "view")
+
+
+def forwards(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Permission = apps.get_model("auth", "Permission")
+    Group = apps.get_model("auth", "Group")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    GroupCollectionPermission = apps.get_model("wagtailcore", "GroupCollectionPermission")
+
+    old_ct = ContentType.objects.filter(app_label="wagtailimages", model="image").first()
+    if not old_ct:
+        return
+    new_ct, _ = ContentType.objects.get_or_create(app_label="cms", model="customimage")
+
+    for action in ACTIONS:
+        old = Permission.objects.filter(content_type=old_ct, codename=f"{action}_image").first()
+        if not old:
+            continue
+        # Normally created after migrating (post_migrate); needed now.
+        new, _ = Permission.objects.get_or_create(
+            content_type=new_ct, codename=f"{action}_customimage",
+            defaults={"name": f"Can {action} custom image"},
+        )
+        for group in Group.objects.filter(permissions=old):
+            group.permissions.add(new)
+        for user in User.objects.filter(user_permissions=old):
+            user.user_permissions.add(new)
+        for gcp in GroupCollectionPermission.objects.filter(permission=old):
+            GroupCollectionPermission.objects.get_or_create(
+                group_id=gcp.group_id, collection_id=gcp.collection_id, permission=new,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cms", "0020_customimage_file_status"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("wagtailcore", "0066_collection_management_permissions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
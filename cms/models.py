@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+from contextlib import contextmanager
+
 from django.conf import settings
 from django.db import models
 from django.shortcuts import redirect
@@ -7,6 +10,7 @@ from django.shortcuts import redirect
 from modelcluster.fields import ParentalKey
 from modelcluster.tags import ClusterTaggableManager
 from taggit.models import TaggedItemBase
+from PIL import Image as PILImage
 
 from wagtail import blocks
 from wagtail.api import APIField
@@ -16,12 +20,23 @@ from wagtail.embeds.blocks import EmbedBlock
 from wagtail.fields import RichTextField, StreamField
 from wagtail.images import get_image_model_string
 from wagtail.images.blocks import ImageChooserBlock
+from wagtail.images.models import (
+    AbstractImage, AbstractRendition, Image, SourceImageIOError, WagtailImageField, WagtailImageFieldFile,
+    get_upload_to,
+)
 from wagtail.models import Page, PageManager
 from wagtail.search import index
 
 from wagtail_headless_preview.models import HeadlessMixin, HeadlessServeMixin
 from wagtail.documents.blocks import DocumentChooserBlock
 
+from main.serving import document_filename, document_url, hashed_media_url, rendition_digest
+from main.validators import PENDING_DIR
+
+from .images import (
+    ASPECTS, THUMB_SPEC, PlaceholderField, image_rep, ladder_specs, make_placeholder, sizes_hint,
+)
+
 
 def frontend_url(path: str = "/") -> str:
     """Absolute URL on the public Next.js frontend (for headless redirects)."""
@@ -29,25 +44,142 @@ def frontend_url(path: str = "/") -> str:
     return base + path
 
 
+# =============================================================================
+# Images (settings.WAGTAILIMAGES_IMAGE_MODEL)
+# =============================================================================
+
+class HeaderImageFieldFile(WagtailImageFieldFile):
+    def get_image_dimensions(self):
+        # Wagtail asks Willow, which decodes the whole image for its size;
+        # Pillow reads it from the header. SVGs still go through Willow.
+        close = self.closed
+        try:
+            self.open()
+            return PILImage.open(self).size
+        except OSError:  # not something Pillow reads (SVG)
+            self.seek(0)
+            return super().get_image_dimensions()
+        finally:
+            if close:
+                self.close()
+            else:
+                self.seek(0)
+
+
+class HeaderImageField(WagtailImageField):
+    attr_class = HeaderImageFieldFile
+
+
+class CustomImage(AbstractImage):
+    """Wagtail image that also stores an inline blur-up placeholder, so API
+    listings need no extra request per card (see cms.images.make_placeholder),
+    and the hash of the file as uploaded, so re-uploads reuse the stored
+    original (see cms.signals.validate_uploaded_image)."""
+
+    # Uploads are validated from their header; the full decode and
+    # normalisation run in the background (cms.tasks.verify_image), which
+    # quarantines bad files.
+    FILE_PENDING, FILE_VERIFIED, FILE_QUARANTINED = "pending", "verified", "quarantined"
+    FILE_STATUS_CHOICES = [
+        (FILE_PENDING, "Pending check"), (FILE_VERIFIED, "Verified"), (FILE_QUARANTINED, "Quarantined"),
+    ]
+
+    file           = HeaderImageField(
+        verbose_name="file", upload_to=get_upload_to, width_field="width", height_field="height",
+    )
+    lqip           = models.TextField(blank=True, editable=False, help_text="Tiny base64 WebP data URI.")
+    dominant_color = models.CharField(max_length=7, blank=True, editable=False)
+    # SHA-1 of the upload before normalisation; file_hash is of the stored file.
+    upload_hash    = models.CharField(max_length=40, blank=True, editable=False, db_index=True)
+    file_status    = models.CharField(
+        max_length=12, choices=FILE_STATUS_CHOICES, default=FILE_VERIFIED, editable=False,
+    )
+
+    admin_form_fields = Image.admin_form_fields
+
+    def get_upload_to(self, filename):
+        # An upload still carries its metadata (EXIF/GPS) until it has been
+        # normalised; keep it out of public media until then.
+        name = super().get_upload_to(filename)
+        if self.file_status == self.FILE_PENDING:
+            return f"{PENDING_DIR}/{os.path.basename(name)}"
+        return name
+
+    def get_public_upload_to(self, filename):
+        return super().get_upload_to(filename)
+
+    @contextmanager
+    def open_file(self):
+        # A quarantined original is never decoded again: renditions and the
+        # API's ImageRenditionFields report it like a missing file.
+        if self.file_status == self.FILE_QUARANTINED:
+            raise SourceImageIOError(f"Image file {self.file.name} is quarantined.")
+        with super().open_file() as f:
+            yield f
+
+    def update_placeholder(self):
+        try:
+            with self.open_file() as f:
+                self.lqip, self.dominant_color = make_placeholder(f)
+        except SourceImageIOError:
+            self.lqip, self.dominant_color = "", ""
+
+
+class CustomRendition(AbstractRendition):
+    image = models.ForeignKey(CustomImage, related_name="renditions", on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = (("image", "filter_spec", "focal_point_key"),)
+
+    @property
+    def url(self):
+        # Content-hashed, so it can be cached forever (main.views.media_hashed).
+        return hashed_media_url(self.file, rendition_digest(self))
+
+
+# =============================================================================
+# Documents
+# =============================================================================
+
+class DocumentUpload(models.Model):
+    """The file name a document was uploaded under, when upload dedup
+    (cms.signals.validate_wagtail_document) stored it as an earlier upload's
+    file. Downloads use it instead (main.serving.document_filename)."""
+
+    document = models.OneToOneField(
+        "wagtaildocs.Document", on_delete=models.CASCADE, primary_key=True, related_name="upload",
+    )
+    filename = models.CharField(max_length=255)
+
+    def __str__(self):
+        return self.filename
+
+
 # =============================================================================
 # Shared StreamField blocks (used by BlogPage + PortfolioProjectPage)
 # =============================================================================
 
-def _image_api_rep(image, alt_override=None):
-    """Serialise a Wagtail image to self-contained rendition URLs for the API."""
-    if not image:
+def _image_api_rep(image, alt_override=None, aspect=None, context=None, sizes=None):
+    """Serialise a Wagtail image to self-contained rendition URLs (with a
+    responsive srcset and optional ``sizes`` hint) for the API. Renditions are
+    resolved once per image and aspect per serialisation ``context``, however
+    many blocks reference it. None for a missing image, or one whose original
+    is pending verification or quarantined (see image_rep)."""
+    if not image or image.file_status != CustomImage.FILE_VERIFIED:
         return None
-    full = image.get_rendition("width-1600")
-    thumb = image.get_rendition("fill-600x400")
-    return {
-        "id": image.id,
-        "title": image.title,
-        "alt": alt_override or image.title,
-        "url": full.url,
-        "width": full.width,
-        "height": full.height,
-        "thumb": thumb.url,
-    }
+    memo = context.setdefault("_image_reps", {}) if isinstance(context, dict) else {}
+    key = (image.pk, aspect if aspect in ASPECTS else None)
+    if key not in memo:
+        ladder, full = ladder_specs(image, key[1])
+        memo[key] = {
+            "id": image.id,
+            "title": image.title,
+            **image_rep(image, full, THUMB_SPEC, ladder=ladder),
+        }
+    rep = {**memo[key], "alt": alt_override or image.title}
+    if sizes:
+        rep["sizes"] = sizes
+    return rep
 
 
 class PrettyEmbedBlock(blocks.StructBlock):
@@ -168,7 +300,10 @@ class PrettyImageBlock(blocks.StructBlock):
 
     def get_api_representation(self, value, context=None):
         rep = super().get_api_representation(value, context)
-        rep["image"] = _image_api_rep(value.get("image"), value.get("alt_override"))
+        rep["image"] = _image_api_rep(
+            value.get("image"), value.get("alt_override"), value.get("aspect"), context,
+            sizes=sizes_hint(value.get("alignment"), value.get("width_pct")),
+        )
         return rep
     caption_spacing = blocks.ChoiceBlock(
         required=False,
@@ -313,7 +448,8 @@ class GalleryBlock(blocks.StructBlock):
 
     def get_api_representation(self, value, context=None):
         rep = super().get_api_representation(value, context)
-        rep["images"] = [_image_api_rep(img) for img in value.get("images") or []]
+        reps = (_image_api_rep(img, context=context) for img in value.get("images") or [])
+        rep["images"] = [r for r in reps if r]
         return rep
 
     class Meta:
@@ -353,8 +489,8 @@ class PdfDownloadsBlock(blocks.StructBlock):
                 "label": d.get("label") or doc.title,
                 "note": d.get("note") or "",
                 "open_in_new": bool(d.get("open_in_new")),
-                "url": doc.url,          # relative /documents/<id>/<file> — proxied
-                "filename": doc.filename,
+                "url": document_url(doc),  # relative /documents/<id>/<hash>/<file> — proxied
+                "filename": document_filename(doc),
             })
         rep["documents"] = items
         return rep
@@ -548,9 +684,9 @@ class BlogPage(HeadlessMixin, Page):
         APIField("hero_caption"),
         APIField("hero_image", serializer=ImageRenditionField("width-1200")),
         APIField("hero_thumb", serializer=ImageRenditionField("fill-600x400", source="hero_image")),
-        APIField("hero_lqip", serializer=ImageRenditionField("fill-32x20|jpegquality-30", source="hero_image")),
+        APIField("hero_lqip", serializer=PlaceholderField(source="hero_image")),
         APIField("card_thumb", serializer=ImageRenditionField("fill-800x800", source="card_image")),
-        APIField("card_lqip", serializer=ImageRenditionField("fill-24x24|jpegquality-30", source="card_image")),
+        APIField("card_lqip", serializer=PlaceholderField(source="card_image")),
         APIField("body"),
         APIField("tag_names"),
     ]
@@ -700,9 +836,9 @@ class PortfolioProjectPage(HeadlessMixin, Page):
         APIField("github_url"),
         APIField("cover_image", serializer=ImageRenditionField("width-1200")),
         APIField("cover_thumb", serializer=ImageRenditionField("fill-800x600", source="cover_image")),
-        APIField("cover_lqip", serializer=ImageRenditionField("fill-32x24|jpegquality-30", source="cover_image")),
+        APIField("cover_lqip", serializer=PlaceholderField(source="cover_image")),
         APIField("card_thumb", serializer=ImageRenditionField("fill-800x800", source="card_image")),
-        APIField("card_lqip", serializer=ImageRenditionField("fill-24x24|jpegquality-30", source="card_image")),
+        APIField("card_lqip", serializer=PlaceholderField(source="card_image")),
         APIField("body"),
         APIField("tag_names"),
     ]
@@ -750,7 +886,7 @@ class HomeGalleryBlock(blocks.StructBlock):
     def get_api_representation(self, value, context=None):
         rep = super().get_api_representation(value, context)
         rep["items"] = [
-            {"image": _image_api_rep(it.get("image")), "caption": it.get("caption") or ""}
+            {"image": _image_api_rep(it.get("image"), context=context), "caption": it.get("caption") or ""}
             for it in value.get("items") or []
         ]
         return rep
@@ -778,7 +914,7 @@ class HomeCarouselBlock(blocks.StructBlock):
         rep = super().get_api_representation(value, context)
         rep["slides"] = [
             {
-                "image": _image_api_rep(s.get("image")),
+                "image": _image_api_rep(s.get("image"), context=context, sizes=sizes_hint("full")),
                 "caption": s.get("caption") or "",
                 "link": s.get("link") or "",
             }
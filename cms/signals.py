@@ -1,9 +1,18 @@
 import os
 from django.core.exceptions import ValidationError
-from django.db.models.signals import pre_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from wagtail.documents import signal_handlers as document_signal_handlers
 from wagtail.documents.models import Document
+from wagtail.images import get_image_model
+from wagtail.images import signal_handlers as image_signal_handlers
+
+from main.validators import hash_upload, validate_image_file
+
+from .models import DocumentUpload
 
 # whitelist of allowed document extensions (lowercase)
 ALLOWED_DOC_EXT = {".pdf", ".docx", ".txt", ".xlsx", ".pptx"}
@@ -21,9 +30,134 @@ def validate_wagtail_document(sender, instance, **kwargs):
     if ext and ext not in ALLOWED_DOC_EXT:
         raise ValidationError(f"Files with extension '{ext}' are not allowed.")
 
-    try:
-        size = instance.file.size
-    except Exception:
-        size = None
-    if size and size > MAX_DOC_UPLOAD_MB * 1024 * 1024:
-        raise ValidationError(f"Document too large (max {MAX_DOC_UPLOAD_MB} MB).")
+    if instance.file._committed:
+        return
+    # size check, hashing in the same pass: an identical stored document is
+    # reused instead of keeping a second copy
+    digest = hash_upload(instance.file, MAX_DOC_UPLOAD_MB, "Document")
+    duplicate = sender._base_manager.filter(file_hash=digest).exclude(pk=instance.pk).first()
+    upload_name = instance.file.storage.get_valid_name(os.path.basename(name))
+    instance._upload_filename = ""
+    if duplicate and duplicate.file.storage.exists(duplicate.file.name):
+        instance.file = duplicate.file.name
+        instance.file_size = duplicate.file_size
+        if upload_name != instance.filename:
+            instance._upload_filename = upload_name
+    instance.file_hash = digest
+
+
+@receiver(post_save, sender=Document)
+def remember_document_upload_name(sender, instance, **kwargs):
+    """Keep the uploaded file name of a document stored as another's file
+    (see validate_wagtail_document), so downloads aren't named after the
+    earlier upload."""
+    upload_name = instance.__dict__.pop("_upload_filename", None)
+    if upload_name is None:
+        return  # file unchanged
+    if upload_name:
+        DocumentUpload.objects.update_or_create(document=instance, defaults={"filename": upload_name})
+    else:
+        DocumentUpload.objects.filter(document=instance).delete()
+
+
+@receiver(pre_save, sender=get_image_model())
+def validate_uploaded_image(sender, instance, **kwargs):
+    """Validate a newly uploaded original from its header (size, format,
+    dimensions). Decoding it and storing it normalised (oriented, metadata
+    stripped, capped in size, re-encoded) happen in the background
+    (cms.tasks.verify_image); until then it is kept out of public media
+    (CustomImage.get_upload_to)."""
+    f = getattr(instance, "file", None)
+    if not f or f._committed or instance.is_svg():
+        return
+    digest = validate_image_file(f)
+    instance.upload_hash = digest
+    # Same bytes as an earlier upload (or as a stored original): reuse that
+    # file, its placeholder and, after saving, its renditions. Pending files
+    # are not reused: cms.tasks.verify_image moves them once it has run.
+    duplicate = (
+        sender._base_manager.filter(Q(upload_hash=digest) | Q(file_hash=digest))
+        .exclude(pk=instance.pk).filter(file_status=sender.FILE_VERIFIED).first()
+    )
+    if duplicate and duplicate.file.storage.exists(duplicate.file.name):
+        instance.file = duplicate.file.name
+        for attr in ("width", "height", "file_size", "file_hash", "lqip", "dominant_color", "file_status"):
+            setattr(instance, attr, getattr(duplicate, attr))
+        instance._duplicate_of = duplicate
+        return
+    instance.file_status = sender.FILE_PENDING
+
+
+@receiver(pre_save, sender=get_image_model())
+def update_image_placeholder(sender, instance, **kwargs):
+    """Compute the inline placeholder when an image file is uploaded or
+    replaced (and for older images still without one)."""
+    if not getattr(instance, "file", None):
+        return
+    if instance.lqip and instance.file._committed:
+        return
+    if instance.file_status == sender.FILE_PENDING:
+        return  # computed by cms.tasks.verify_image once the file has decoded
+    instance.update_placeholder()
+
+
+@receiver(post_save, sender=get_image_model())
+def share_duplicate_renditions(sender, instance, **kwargs):
+    """An image reusing another's file (see validate_uploaded_image) gets
+    rows for that image's renditions, pointing at the same files, instead of
+    rendering them again."""
+    source = instance.__dict__.pop("_duplicate_of", None)
+    if source is None or source.get_focal_point() != instance.get_focal_point():
+        return  # a different focal point means different crops
+    Rendition = sender.get_rendition_model()
+    have = set(instance.renditions.values_list("filter_spec", "focal_point_key"))
+    Rendition.objects.bulk_create(
+        [
+            Rendition(
+                image=instance, filter_spec=r.filter_spec, focal_point_key=r.focal_point_key,
+                file=r.file.name, width=r.width, height=r.height,
+            )
+            for r in source.renditions.all()
+            if (r.filter_spec, r.focal_point_key) not in have
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_save, sender=get_image_model())
+def queue_image_verification(sender, instance, **kwargs):
+    """Fully decode header-checked uploads in the background."""
+    if instance.file_status != sender.FILE_PENDING:
+        return
+    from .tasks import verify_image
+
+    pk = instance.pk
+    transaction.on_commit(lambda: verify_image.enqueue(image_id=pk, dedup_key=f"image.verify:{pk}"))
+
+
+# ── Shared files ─────────────────────────────────────────────────────────────
+# Upload dedup lets several rows point at one stored file, so a file is only
+# deleted once no row of its model references it. This replaces Wagtail's
+# unconditional post_delete cleanup (its apps are ready before this one).
+
+def delete_unreferenced_file(model, storage, name):
+    """After the current transaction commits, delete ``name`` unless a
+    ``model`` row still uses it."""
+    def cleanup():
+        if name and not model._base_manager.filter(file=name).exists():
+            storage.delete(name)
+
+    transaction.on_commit(cleanup)
+
+
+def delete_file_unless_shared(sender, instance, **kwargs):
+    delete_unreferenced_file(sender, instance.file.storage, instance.file.name)
+
+
+for _model, _handler in (
+    (Document, document_signal_handlers.post_delete_file_cleanup),
+    (get_image_model(), image_signal_handlers.post_delete_file_cleanup),
+    (get_image_model().get_rendition_model(), image_signal_handlers.post_delete_file_cleanup),
+):
+    post_delete.disconnect(_handler, sender=_model)
+    post_delete.connect(delete_file_unless_shared, sender=_model)
@@ -0,0 +1,112 @@
+"""
+Background tasks for `run_worker` (see main.taskqueue).
+"""
+import hashlib
+import io
+import logging
+import os
+
+from django.core.exceptions import ValidationError
+from PIL import Image as PILImage
+from wagtail.images import get_image_model
+
+from main.taskqueue import task
+from main.validators import QUARANTINE_DIR, decode_image_file, normalise_image_file
+
+from .signals import delete_unreferenced_file
+
+logger = logging.getLogger(__name__)
+
+
+@task("image.verify", max_attempts=3)
+def verify_image(image_id):
+    """Fully decode a header-checked upload (main.validators.decode_image_file),
+    store it normalised (normalise_image_file) in public media, and quarantine
+    it instead if the pixel data is corrupt."""
+    Image = get_image_model()
+    image = Image.objects.filter(pk=image_id).first()
+    if not image or image.file_status != Image.FILE_PENDING:
+        return
+    storage, name = image.file.storage, image.file.name
+    try:
+        with storage.open(name, "rb") as f:
+            decode_image_file(f)
+            try:
+                normalised = normalise_image_file(f, name)
+            except Exception as exc:
+                raise ValidationError(f"Image could not be normalised ({type(exc).__name__}: {exc}).")
+    except ValidationError as exc:
+        quarantine_image_file(image, exc.messages[0])
+        return
+
+    upload_to = image.get_public_upload_to
+    if normalised is None:
+        # Already fine as uploaded: only moved out of the pending prefix.
+        with storage.open(name, "rb") as f:
+            stored = storage.save(upload_to(os.path.basename(name)), f)
+        width, height = image.width, image.height
+    else:
+        data = normalised.read()
+        stored = storage.save(upload_to(normalised.name), normalised)
+        image.file_size, image.file_hash = len(data), hashlib.sha1(data).hexdigest()
+        width, height = PILImage.open(io.BytesIO(data)).size
+
+    image.file.name = stored
+    image.file_status = Image.FILE_VERIFIED
+    image.update_placeholder()
+
+    # Every image sharing the file is settled by this run. New uploads don't
+    # reuse a pending file (cms.signals), and the file is only deleted below
+    # once no row references it.
+    sharing = list(Image.objects.filter(file=name, file_status=Image.FILE_PENDING))
+    if (width, height) != (image.width, image.height):
+        # Renditions and focal points were made from the un-normalised file.
+        Image.get_rendition_model().objects.filter(image__in=sharing).delete()
+    for other in sharing:
+        other.file.name = stored
+        other.file_status = Image.FILE_VERIFIED
+        other.file_size, other.file_hash = image.file_size, image.file_hash
+        other.lqip, other.dominant_color = image.lqip, image.dominant_color
+        _rescale_focal_point(other, width, height)
+        other.width, other.height = width, height
+        other.save(update_fields=[
+            "file", "file_status", "file_size", "file_hash", "lqip", "dominant_color", "width", "height",
+            "focal_point_x", "focal_point_y", "focal_point_width", "focal_point_height",
+        ])
+    delete_unreferenced_file(Image, storage, name)
+
+
+def _rescale_focal_point(image, width, height):
+    """Map a focal point set on the pending original onto the normalised
+    size; drop it when the aspect changed (EXIF rotation)."""
+    if image.focal_point_x is None or (width, height) == (image.width, image.height):
+        return
+    sx, sy = width / image.width, height / image.height
+    if abs(sx - sy) > 0.01:
+        image.focal_point_x = image.focal_point_y = None
+        image.focal_point_width = image.focal_point_height = None
+        return
+    image.focal_point_x = round(image.focal_point_x * sx)
+    image.focal_point_y = round(image.focal_point_y * sy)
+    image.focal_point_width = round(image.focal_point_width * sx)
+    image.focal_point_height = round(image.focal_point_height * sy)
+
+
+def quarantine_image_file(image, reason):
+    """Move an original that fails to decode under QUARANTINE_DIR (kept for
+    inspection, not served) and flag every image using it, dropping their
+    renditions and placeholders."""
+    Image = type(image)
+    storage, name = image.file.storage, image.file.name
+    with storage.open(name, "rb") as f:
+        moved = storage.save(f"{QUARANTINE_DIR}/{os.path.basename(name)}", f)
+
+    sharing = Image.objects.filter(file=name)
+    # Model delete: the post_delete handlers remove the files and cache entries.
+    Image.get_rendition_model().objects.filter(image__in=sharing).delete()
+    ids = list(sharing.values_list("pk", flat=True))
+    Image.objects.filter(pk__in=ids).update(
+        file=moved, file_status=Image.FILE_QUARANTINED, lqip="", dominant_color="",
+    )
+    storage.delete(name)
+    logger.warning("Quarantined image(s) %s (%s → %s): %s", ids, name, moved, reason)
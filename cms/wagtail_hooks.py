@@ -0,0 +1,19 @@
+"""
+Wagtail hooks for the cms app.
+"""
+from django.shortcuts import redirect
+from wagtail import hooks
+
+from main.serving import document_url
+
+
+@hooks.register("before_serve_document")
+def serve_under_upload_name(doc, request):
+    """Wagtail's /documents/ view names a download after the stored file. A
+    document stored as an earlier upload's file (upload dedup) is sent to its
+    content-hashed URL instead, which uses the name it was uploaded under."""
+    match = request.resolver_match
+    if getattr(doc, "upload", None) is None or (match and match.url_name == "document-hashed"):
+        return None
+    url = document_url(doc)
+    return redirect(url) if url != doc.url else None
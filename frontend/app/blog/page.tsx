@@ -50,6 +50,7 @@ export default async function BlogIndex() {
                   <Media
                     src={(p.card_thumb || p.hero_thumb)!.url}
                     lqip={p.card_lqip?.url}
+                    color={p.card_lqip?.color}
                     alt={p.title}
                     className="h-28 rounded-xl sm:h-full"
                     imgClassName="h-full w-full object-cover"
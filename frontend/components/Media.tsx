@@ -4,13 +4,15 @@ import { useState } from "react";
 import { mediaUrl } from "@/lib/api";
 
 /**
- * Blur-up image: paints the tiny LQIP rendition instantly as a background,
- * then fades the full image in on load. Falls back to a plain image (or the
- * gradient set by the parent) when no LQIP is available.
+ * Blur-up image: paints the inline LQIP (a data URI, so no extra request) and
+ * the image's dominant colour instantly as a background, then fades the full
+ * image in on load. Falls back to a plain image (or the gradient set by the
+ * parent) when no LQIP is available.
  */
 export default function Media({
   src,
   lqip,
+  color,
   alt,
   width,
   height,
@@ -19,6 +21,7 @@ export default function Media({
 }: {
   src: string;
   lqip?: string | null;
+  color?: string | null;
   alt: string;
   width?: number;
   height?: number;
@@ -32,6 +35,7 @@ export default function Media({
       style={
         lqip
           ? {
+              backgroundColor: color || undefined,
               backgroundImage: `url(${mediaUrl(lqip)})`,
               backgroundSize: "cover",
               backgroundPosition: "center",
@@ -0,0 +1,31 @@
+import type { ImgHTMLAttributes } from "react";
+import type { ImageSource } from "@/lib/types";
+import { mediaUrl } from "@/lib/api";
+
+/**
+ * `<img>` wrapped in `<picture>` with the API's AVIF/WebP `sources`, so the
+ * browser picks the smallest format it supports and falls back to `src`.
+ * With a `srcSet` ladder + `sizes`, each format also picks its width.
+ * The wrapper is `display: contents`, so layout classes stay on the `<img>`.
+ */
+export default function Picture({
+  sources,
+  src,
+  sizes,
+  ...img
+}: ImgHTMLAttributes<HTMLImageElement> & { src: string; sources?: ImageSource[] }) {
+  return (
+    <picture className="contents">
+      {(sources || []).map((s) => (
+        <source
+          key={s.type}
+          type={s.type}
+          srcSet={s.srcset || mediaUrl(s.url)}
+          sizes={s.srcset ? sizes : undefined}
+        />
+      ))}
+      {/* eslint-disable-next-line @next/next/no-img-element */}
+      <img src={mediaUrl(src)} sizes={img.srcSet ? sizes : undefined} {...img} />
+    </picture>
+  );
+}
@@ -17,6 +17,7 @@ function RelCard({ item, base }: { item: RelItem; base: string }) {
         <Media
           src={thumb.url}
           lqip={item.card_lqip?.url}
+          color={item.card_lqip?.color}
           alt={thumb.alt}
           className="h-28 w-full rounded-xl"
           imgClassName="h-full w-full object-cover"
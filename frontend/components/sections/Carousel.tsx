@@ -2,7 +2,7 @@
 
 import { useCallback, useEffect, useState } from "react";
 import type { HomeSection } from "@/lib/types";
-import { mediaUrl } from "@/lib/api";
+import Picture from "../Picture";
 import Eyebrow from "../Eyebrow";
 
 export default function Carousel({ section }: { section: HomeSection }) {
@@ -40,9 +40,11 @@ export default function Carousel({ section }: { section: HomeSection }) {
           >
             {slides.map((s, idx) => {
               const media = (
-                /* eslint-disable-next-line @next/next/no-img-element */
-                <img
-                  src={mediaUrl(s.image!.url)}
+                <Picture
+                  src={s.image!.url}
+                  srcSet={s.image!.srcset}
+                  sizes={s.image!.sizes}
+                  sources={s.image!.sources}
                   alt={s.image!.alt}
                   className="h-full w-full object-cover"
                 />
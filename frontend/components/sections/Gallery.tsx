@@ -1,5 +1,5 @@
 import type { HomeSection } from "@/lib/types";
-import { mediaUrl } from "@/lib/api";
+import Picture from "../Picture";
 import Eyebrow from "../Eyebrow";
 import Reveal from "../Reveal";
 
@@ -25,9 +25,9 @@ export default function Gallery({ section }: { section: HomeSection }) {
           <div className="grid grid-cols-2 gap-3 sm:grid-cols-3">
             {items.map((it, i) => (
               <figure key={i} className="group overflow-hidden rounded-xl border border-border">
-                {/* eslint-disable-next-line @next/next/no-img-element */}
-                <img
-                  src={mediaUrl(it.image!.thumb || it.image!.url)}
+                <Picture
+                  src={it.image!.thumb || it.image!.url}
+                  sources={it.image!.thumb ? it.image!.thumb_sources : it.image!.sources}
                   alt={it.image!.alt}
                   className="aspect-square w-full object-cover transition duration-500 group-hover:scale-105"
                 />
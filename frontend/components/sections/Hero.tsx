@@ -1,6 +1,6 @@
 import type { SiteBundle } from "@/lib/types";
-import { mediaUrl } from "@/lib/api";
 import HeroBackground from "../HeroBackground";
+import Picture from "../Picture";
 
 export default function Hero({ bundle }: { bundle: SiteBundle }) {
   const { copy } = bundle;
@@ -78,9 +78,9 @@ export default function Hero({ bundle }: { bundle: SiteBundle }) {
         {/* Right: big square portrait */}
         {img && (
           <div className="rise" style={{ animationDelay: "0.5s" }}>
-            {/* eslint-disable-next-line @next/next/no-img-element */}
-            <img
-              src={mediaUrl(img.url)}
+            <Picture
+              src={img.url}
+              sources={img.sources}
               alt={img.alt}
               className="aspect-square w-full rounded-3xl border border-border object-cover shadow-[var(--shadow)]"
             />
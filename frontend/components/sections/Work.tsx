@@ -33,6 +33,7 @@ export default function Work({
                   <Media
                     src={(p.card_thumb || p.cover_thumb)!.url}
                     lqip={p.card_lqip?.url}
+                    color={p.card_lqip?.color}
                     alt={p.title}
                     className="h-28 w-full rounded-xl md:aspect-square md:h-auto"
                     imgClassName="h-full w-full object-cover"
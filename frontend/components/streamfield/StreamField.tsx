@@ -1,6 +1,7 @@
 import type { StreamBlock, ImageRendition } from "@/lib/types";
 import { mediaUrl } from "@/lib/api";
 import CodeBlock from "./CodeBlock";
+import Picture from "../Picture";
 
 /* ---------- helpers ---------- */
 function embedSrc(url: string): string | null {
@@ -29,9 +30,11 @@ function ImageBlock({ value }: { value: Record<string, unknown> }) {
   const full = alignment === "full" || alignment === "wide";
 
   const el = (
-    /* eslint-disable-next-line @next/next/no-img-element */
-    <img
-      src={mediaUrl(img.url)}
+    <Picture
+      src={img.url}
+      srcSet={img.srcset}
+      sizes={img.sizes}
+      sources={img.sources}
       alt={img.alt}
       width={img.width}
       height={img.height}
@@ -158,10 +161,10 @@ function block(b: StreamBlock): React.ReactNode {
       return (
         <div className="my-7 grid grid-cols-2 gap-3 sm:grid-cols-3">
           {images.map((im, i) => (
-            /* eslint-disable-next-line @next/next/no-img-element */
-            <img
+            <Picture
               key={i}
-              src={mediaUrl(im.thumb || im.url)}
+              src={im.thumb || im.url}
+              sources={im.thumb ? im.thumb_sources : im.sources}
               alt={im.alt}
               className="aspect-square w-full rounded-lg border border-border object-cover"
             />
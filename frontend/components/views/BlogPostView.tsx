@@ -56,6 +56,7 @@ export default function BlogPostView({
             <Media
               src={post.hero_image.url}
               lqip={post.hero_lqip?.url}
+              color={post.hero_lqip?.color}
               alt={post.hero_image.alt}
               width={post.hero_image.width}
               height={post.hero_image.height}
@@ -91,6 +91,7 @@ export default function ProjectView({
           <Media
             src={project.cover_image.url}
             lqip={project.cover_lqip?.url}
+            color={project.cover_lqip?.color}
             alt={project.cover_image.alt}
             width={project.cover_image.width}
             height={project.cover_image.height}
@@ -1,10 +1,34 @@
+// A modern-format variant of a rendition (AVIF/WebP), best first.
+export type ImageSource = {
+  type: string;
+  url: string;
+  width: number;
+  height: number;
+  // Width ladder of this format ("<url> 400w, <url> 800w, …"), StreamField only.
+  srcset?: string;
+};
+
+// Inline blur-up placeholder stored on the image: `url` is a tiny data URI.
+export type Placeholder = {
+  url: string;
+  color: string;
+};
+
 export type ImageRendition = {
   url: string;
   width: number;
   height: number;
-  // Only present on SiteBundle images (hand-built with two renditions); page
-  // API renditions (cover_thumb/hero_thumb/card_thumb) expose `url` only.
+  // Only present on SiteBundle images and StreamField image blocks (built by
+  // cms.images); page API renditions (cover_thumb/hero_thumb/card_thumb)
+  // expose `url` only.
   thumb?: string;
+  // Responsive ladder of the fallback format and the layout's `sizes` hint
+  // (StreamField image/carousel blocks).
+  srcset?: string;
+  sizes?: string;
+  sources?: ImageSource[];
+  thumb_sources?: ImageSource[];
+  placeholder?: Placeholder | null;
   alt: string;
 };
 
@@ -59,6 +83,7 @@ export type SiteBundle = {
   languages: { name: string; level: string; level_display: string }[];
   github: GithubStats | null;
   orcid_id: string;
+  citations: CitationSummary | null;
   has_research: boolean;
   sections: HomeSection[];
   contact: {
@@ -144,6 +169,14 @@ export type Publication = {
   featured: boolean;
 };
 
+export type CitationSummary = {
+  total: number;
+  h_index: number;
+  i10_index: number;
+  cited_publications: number;
+  updated_at: string | null;
+};
+
 export type PublicationGroup = { label: string; items: Publication[] };
 
 export type Grant = {
@@ -193,13 +226,13 @@ export type BlogListItem = {
   reading_time_minutes: number | null;
   hero_thumb: ImageRendition | null;
   card_thumb: ImageRendition | null;
-  card_lqip: ImageRendition | null;
+  card_lqip: Placeholder | null;
   tag_names: string[];
 };
 
 export type BlogDetail = BlogListItem & {
   hero_image: ImageRendition | null;
-  hero_lqip: ImageRendition | null;
+  hero_lqip: Placeholder | null;
   hero_caption: string;
   featured: boolean;
   body: StreamBlock[];
@@ -213,13 +246,13 @@ export type ProjectListItem = {
   date: string | null;
   cover_thumb: ImageRendition | null;
   card_thumb: ImageRendition | null;
-  card_lqip: ImageRendition | null;
+  card_lqip: Placeholder | null;
   tag_names: string[];
 };
 
 export type ProjectDetail = ProjectListItem & {
   cover_image: ImageRendition | null;
-  cover_lqip: ImageRendition | null;
+  cover_lqip: Placeholder | null;
   result_metric: string;
   tech_list: string[];
   problem: string;
@@ -13,42 +13,41 @@ from django.core.cache import cache
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-import requests
-
+from .citations import citation_summary
+from .cv import CV_VARIANTS
+from .http_client import get_client
 from .models import (
     SiteContent, Skill, Education, Experience, Publication,
     Grant, Award, Language, PUB_TYPE_CHOICES, PUB_TYPE_ORDER,
 )
 
 GITHUB_CACHE_TTL = 3600  # 1 hour
+SITE_IMAGE_SPECS = ("width-1200", "fill-600x400")  # profile images: full, thumb
 
 
-def _img(image, spec_full="width-1200", spec_thumb="fill-600x400"):
+def _img(image, spec_full=SITE_IMAGE_SPECS[0], spec_thumb=SITE_IMAGE_SPECS[1]):
     if not image:
         return None
-    full = image.get_rendition(spec_full)
-    thumb = image.get_rendition(spec_thumb)
-    return {
-        "url": full.url, "width": full.width, "height": full.height,
-        "thumb": thumb.url, "alt": image.title,
-    }
+    from cms.images import image_rep
+
+    return image_rep(image, spec_full, spec_thumb)
 
 
-def github_stats(username, ttl=GITHUB_CACHE_TTL):
+def github_stats(username, ttl=GITHUB_CACHE_TTL, refresh=False):
+    """GitHub profile stats, cached for ``ttl``. ``refresh`` skips the cached
+    value (used by the scheduler to re-warm the cache before it expires)."""
     if not username:
         return None
     key = f"github_stats:{username}"
-    cached = cache.get(key)
+    cached = None if refresh else cache.get(key)
     if cached is not None:
         return cached or None
+    client = get_client()
     try:
-        user = requests.get(
-            f"https://api.github.com/users/{username}", timeout=6
-        ).json()
-        repos = requests.get(
+        user = client.get_json(f"https://api.github.com/users/{username}", timeout=6)
+        repos = client.get_json(
             f"https://api.github.com/users/{username}/repos?per_page=100&type=owner",
-            timeout=8,
-        ).json()
+        )
         if not isinstance(repos, list):
             repos = []
         langs = {}
@@ -59,12 +58,11 @@ def github_stats(username, ttl=GITHUB_CACHE_TTL):
         # Lifetime public commits authored by the user (search API, cached).
         total_commits = None
         try:
-            sr = requests.get(
+            sr = client.get_json(
                 "https://api.github.com/search/commits",
                 params={"q": f"author:{username}", "per_page": 1},
                 headers={"Accept": "application/vnd.github+json"},
-                timeout=8,
-            ).json()
+            )
             if isinstance(sr, dict) and "total_count" in sr:
                 total_commits = sr["total_count"]
         except Exception:
@@ -204,6 +202,7 @@ class SiteBundleView(APIView):
             ],
             "github": github_stats(sc.github_username if sc else ""),
             "orcid_id": getattr(settings, "ORCID_ID", ""),
+            "citations": citation_summary() if pubs else None,
             "has_research": bool(pubs),
             "sections": _home_sections(),
             "contact": {
@@ -240,5 +239,9 @@ class SiteBundleView(APIView):
                 # Slashless so the frontend proxy doesn't hit an APPEND_SLASH
                 # loop; regenerates-if-stale then redirects to the inline PDF.
                 "url": "/resume/pdf" if (sc and sc.cv_enabled) else "",
+                "variants": [
+                    {"key": key, "label": spec["label"], "url": f"/resume/pdf/{key}"}
+                    for key, spec in CV_VARIANTS.items()
+                ] if (sc and sc.cv_enabled) else [],
             },
         })
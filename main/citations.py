@@ -0,0 +1,120 @@
+"""
+Citation history: refresh planning and aggregate metrics.
+
+Every `sync_citations` fetch is stored as a CitationSnapshot. The planner uses
+that series to decide which publications are due: papers from the last couple
+of years and papers still gaining citations are checked daily, slow risers
+weekly, old stable ones monthly, and DOIs the source does not know (stored
+with an empty count) monthly as well. Aggregate metrics (total citations, h-index,
+i10-index) are computed once per sync and cached for the site bundle.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import CitationSnapshot, Publication
+
+SOURCE = "semantic_scholar"
+
+RECENT_YEARS   = 2                    # published within this many years → daily
+GROWTH_WINDOW  = timedelta(days=180)  # history used to estimate growth
+FAST_GROWTH    = 2.0                  # citations per 30 days → daily
+DAILY, WEEKLY, MONTHLY = timedelta(days=1), timedelta(weeks=1), timedelta(days=30)
+
+SUMMARY_CACHE_KEY = "citation_summary"
+SUMMARY_CACHE_TTL = 7 * 24 * 3600  # refreshed by every sync anyway
+
+
+def _growth_per_month(history):
+    """Citations gained per 30 days across [(fetched_at, count), …] (oldest first)."""
+    if len(history) < 2:
+        return 0.0
+    (t0, c0), (t1, c1) = history[0], history[-1]
+    days = (t1 - t0).total_seconds() / 86400
+    return max(c1 - c0, 0) * 30 / days if days >= 1 else 0.0
+
+
+def refresh_interval(pub, history, now=None):
+    """How long a publication's count stays fresh, given its recent history."""
+    now = now or timezone.now()
+    if pub.year and pub.year >= now.year - RECENT_YEARS:
+        return DAILY
+    growth = _growth_per_month(history)
+    if growth >= FAST_GROWTH:
+        return DAILY
+    if growth > 0:
+        return WEEKLY
+    return MONTHLY
+
+
+def due_publications(now=None):
+    """Publications with a DOI whose citation count is due for a refresh
+    (never fetched, or older than their refresh interval). A DOI the source
+    did not know on the latest fetch is retried MONTHLY."""
+    now = now or timezone.now()
+    fetched = Q(citation_snapshots__source=SOURCE)
+    pubs = list(
+        Publication.objects.exclude(doi="")
+        .annotate(
+            last_fetched=Max("citation_snapshots__fetched_at", filter=fetched),
+            last_found=Max(
+                "citation_snapshots__fetched_at",
+                filter=fetched & Q(citation_snapshots__count__isnull=False),
+            ),
+        )
+    )
+    history = {}
+    for pub_id, fetched_at, count in (
+        CitationSnapshot.objects
+        .filter(source=SOURCE, fetched_at__gte=now - GROWTH_WINDOW, count__isnull=False,
+                publication__in=[p.pk for p in pubs if p.last_found])
+        .order_by("fetched_at")
+        .values_list("publication_id", "fetched_at", "count")
+    ):
+        history.setdefault(pub_id, []).append((fetched_at, count))
+    def interval(p):
+        if p.last_found != p.last_fetched:
+            return MONTHLY  # not found last time
+        return refresh_interval(p, history.get(p.pk, []), now)
+
+    return [p for p in pubs if p.last_fetched is None or now - p.last_fetched >= interval(p)]
+
+
+def record_snapshots(counts, fetched_at=None):
+    """Store one snapshot per {publication: count}; a count of None records a
+    fetch that found nothing."""
+    fetched_at = fetched_at or timezone.now()
+    CitationSnapshot.objects.bulk_create([
+        CitationSnapshot(publication=pub, source=SOURCE, count=count, fetched_at=fetched_at)
+        for pub, count in counts.items()
+    ], batch_size=500)
+
+
+def citation_metrics(counts):
+    """Total citations, h-index and i10-index for an iterable of counts."""
+    ranked = sorted((c for c in counts if c), reverse=True)
+    return {
+        "total": sum(ranked),
+        "h_index": sum(1 for i, c in enumerate(ranked, 1) if c >= i),
+        "i10_index": sum(1 for c in ranked if c >= 10),
+        "cited_publications": len(ranked),
+    }
+
+
+def refresh_citation_summary():
+    """Recompute the aggregate metrics and store them in the cache."""
+    summary = citation_metrics(Publication.objects.values_list("citation_count", flat=True))
+    last = CitationSnapshot.objects.filter(source=SOURCE).aggregate(last=Max("fetched_at"))["last"]
+    summary["updated_at"] = last.isoformat() if last else None
+    cache.set(SUMMARY_CACHE_KEY, summary, SUMMARY_CACHE_TTL)
+    return summary
+
+
+def citation_summary():
+    """Cached aggregate metrics for the site bundle (computed on a cache miss)."""
+    summary = cache.get(SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = refresh_citation_summary()
+    return summary
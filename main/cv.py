@@ -1,15 +1,25 @@
 """
-CV PDF as a cached Wagtail Document.
+CV PDFs as cached Wagtail Documents.
 
 The PDF is rendered from the live CMS data (experience, education, skills,
-publications, …) via XeLaTeX and stored in a single Wagtail Document. The
+publications, …) via XeLaTeX. Each named variant in CV_VARIANTS (full, one-page
+summary, per-language) has its own template and its own Wagtail Document. The
 Document is the cache: it has a stable URL, opens inline, and is only
 regenerated when missing or older than the configured refresh window
-(daily / weekly) — never per request.
+(daily / weekly) — never per request. Even then a variant is only recompiled
+when its fingerprint (hash of the rendered LaTeX + photo) has changed.
 """
-import mimetypes
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import timedelta
 
+from django.conf import settings
 from django.core.files.base import ContentFile
 from django.utils import timezone
 
@@ -17,97 +27,281 @@ from wagtail.documents import get_document_model
 
 from .models import (
     Education, Experience, Skill, Publication, Grant, Award, Language,
-    SiteContent, PUB_TYPE_CHOICES, PUB_TYPE_ORDER,
+    SiteContent, CVVariantDocument, CVRegenerationLog, PUB_TYPE_ORDER,
 )
 
+logger = logging.getLogger(__name__)
+
 _REFRESH = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
 _CV_FILENAME = "cv_rafael_correia.pdf"
+_SELECTED_PUBS = 5  # one-page fallback when no publication is marked featured
+# The photo is printed ~24 mm wide; a cached 600px JPEG rendition keeps the PDF
+# small and fast to compile no matter how large the uploaded original is.
+CV_PHOTO_SPEC = "max-600x600|format-jpeg|jpegquality-85"
 
+# template: LaTeX template under main/templates · lang: key into cv_pdf.CV_LABELS
+# pubs: "all" publications grouped by type, or "selected" (featured) only
+CV_VARIANTS = {
+    "full": {
+        "label": "Full CV", "template": "resume.tex.j2", "lang": "en",
+        "pubs": "all", "filename": _CV_FILENAME,
+    },
+    "onepage": {
+        "label": "One-page summary", "template": "resume_onepage.tex.j2", "lang": "en",
+        "pubs": "selected", "filename": "cv_rafael_correia_onepage.pdf",
+    },
+    "pt": {
+        "label": "CV (Português)", "template": "resume.tex.j2", "lang": "pt",
+        "pubs": "all", "filename": "cv_rafael_correia_pt.pdf",
+    },
+}
+DEFAULT_CV_VARIANT = "full"
 
-def _resume_context(sc):
-    pubs = list(Publication.objects.all())
-    pub_groups = []
-    if pubs:
-        label_map = dict(PUB_TYPE_CHOICES)
-        for key in PUB_TYPE_ORDER:
-            group = [p for p in pubs if p.pub_type == key]
-            if group:
-                pub_groups.append({"label": label_map[key], "pubs": group})
 
+def _resume_context(sc):
+    """Variant-independent CV data. Querysets are evaluated once here so every
+    variant renders from the same rows."""
     github = sc.github_username if sc else ""
     return {
-        "name":        (sc.full_name if sc else "") or "Rafael Correia",
-        "title":       (sc.role_title if sc else "") or "Software Developer & Researcher",
-        "email":       (sc.email if sc else "") or "rafaelmdcorreia@gmail.com",
-        "github":      f"github.com/{github}" if github else "",
-        "linkedin":    (sc.linkedin_url if sc else "").replace("https://", "").replace("http://", ""),
-        "skills":      Skill.objects.filter(active=True).order_by("order", "id"),
-        "languages":   Language.objects.all(),
-        "experiences": Experience.objects.prefetch_related("bullets").all(),
-        "educations":  Education.objects.all(),
-        "grants":      Grant.objects.all(),
-        "awards":      Award.objects.all(),
-        "pub_groups":  pub_groups,
+        "name":         (sc.full_name if sc else "") or "Rafael Correia",
+        "title":        (sc.role_title if sc else "") or "Software Developer & Researcher",
+        "email":        (sc.email if sc else "") or "rafaelmdcorreia@gmail.com",
+        "github":       f"github.com/{github}" if github else "",
+        "linkedin":     (sc.linkedin_url if sc else "").replace("https://", "").replace("http://", ""),
+        "skills":       list(Skill.objects.filter(active=True).order_by("order", "id")),
+        "languages":    list(Language.objects.all()),
+        "experiences":  list(Experience.objects.prefetch_related("bullets").all()),
+        "educations":   list(Education.objects.all()),
+        "grants":       list(Grant.objects.all()),
+        "awards":       list(Award.objects.all()),
+        "publications": list(Publication.objects.all()),
     }
 
 
-def _render_pdf_bytes(sc):
-    from .cv_pdf import render_cv_pdf
+def _pub_groups(pubs, labels, selected=False):
+    if selected:
+        pubs = [p for p in pubs if p.featured] or pubs[:_SELECTED_PUBS]
+    groups = []
+    for key in PUB_TYPE_ORDER:
+        group = [p for p in pubs if p.pub_type == key]
+        if group:
+            groups.append({"label": labels["pub_types"][key], "pubs": group})
+    return groups
+
+
+def _variant_context(base, key):
+    from .cv_pdf import CV_LABELS
 
-    ctx = _resume_context(sc)
-    img_bytes, img_mime = None, None
+    spec = CV_VARIANTS[key]
+    labels = CV_LABELS[spec["lang"]]
+    ctx = dict(base)
+    ctx["labels"] = labels
+    ctx["pub_groups"] = _pub_groups(
+        ctx.pop("publications"), labels, selected=spec["pubs"] == "selected",
+    )
+    return ctx
+
+
+def _stage_profile_photo(sc, workdir):
+    """Stream the CV photo rendition into workdir, hashing it on the way.
+    Returns (path, sha256 hexdigest), or (None, "") when there is no photo."""
     img = sc.home_profile if sc else None
-    if img:
-        try:
-            img_mime = mimetypes.guess_type(img.file.name)[0] or "image/jpeg"
-            img.file.open("rb")
-            img_bytes = img.file.read()
-            img.file.close()
-        except Exception:
-            pass
-    return render_cv_pdf(ctx, profile_image_bytes=img_bytes, profile_image_mime=img_mime)
+    if not img:
+        return None, ""
+    try:
+        rendition = img.get_rendition(CV_PHOTO_SPEC)
+        path = os.path.join(workdir, "photo" + os.path.splitext(rendition.file.name)[1])
+        digest = hashlib.sha256()
+        with rendition.file.open("rb") as src, open(path, "wb") as dst:
+            for chunk in src.chunks():
+                digest.update(chunk)
+                dst.write(chunk)
+    except Exception:
+        return None, ""
+    return path, digest.hexdigest()
 
 
-def _is_stale(sc):
-    if not sc or not sc.cv_document or not sc.cv_generated_at:
+@contextmanager
+def _timed(stages, name):
+    """Record the wall time of the enclosed block in stages[name] (ms)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = round((time.perf_counter() - start) * 1000)
+
+
+def _fingerprint(tex, photo_digest):
+    return hashlib.sha256(f"{tex}\0{photo_digest}".encode("utf-8")).hexdigest()
+
+
+def _is_stale(sc, row):
+    if not sc or not row or not row.document or not row.generated_at:
         return True
     window = _REFRESH.get(sc.cv_refresh, _REFRESH["weekly"])
-    return timezone.now() - sc.cv_generated_at > window
+    return timezone.now() - row.generated_at > window
 
 
-def regenerate_cv_document(sc=None):
-    """Render the CV and store it in the (singleton) Wagtail Document. Returns
-    the Document, or None if rendering failed."""
-    sc = sc or SiteContent.objects.first()
-    if not sc:
-        return None
+def stale_cv_variants(sc, variants=None):
+    """Keys of the given variants (default: all) that are missing or older
+    than the refresh window."""
+    keys = list(variants or CV_VARIANTS)
+    rows = {r.variant: r for r in CVVariantDocument.objects.filter(variant__in=keys)}
+    return [k for k in keys if _is_stale(sc, rows.get(k))]
 
-    pdf = _render_pdf_bytes(sc)  # may raise RuntimeError if XeLaTeX is missing
 
+def _store(sc, row, pdf, fingerprint):
+    spec = CV_VARIANTS[row.variant]
     Document = get_document_model()
-    content = ContentFile(pdf, name=_CV_FILENAME)
-    doc = sc.cv_document
+    content = ContentFile(pdf, name=spec["filename"])
+    doc = row.document
     if doc is None:
-        doc = Document(title="CV — auto-generated")
-        doc.file.save(_CV_FILENAME, content, save=True)
-        sc.cv_document = doc
-    else:
-        doc.file.save(_CV_FILENAME, content, save=True)
-    sc.cv_generated_at = timezone.now()
-    sc.save(update_fields=["cv_document", "cv_generated_at"])
+        doc = Document(title=f"CV ({spec['label']}) — auto-generated")
+    previous = doc.file.name if doc.file else ""
+    # Stored (or matched to an identical stored file, with its file_hash set)
+    # by the document pre_save handler in cms.signals.
+    doc.file = content
+    doc.save()
+    if previous and previous != doc.file.name:
+        from cms.signals import delete_unreferenced_file
+
+        delete_unreferenced_file(Document, doc.file.storage, previous)
+    row.document = doc
+    row.fingerprint = fingerprint
+    _mark_fresh(sc, row)
     return doc
 
 
-def get_cv_document(sc=None):
-    """Return the current CV Document, regenerating it first if missing/stale."""
+def _mark_fresh(sc, row):
+    row.generated_at = timezone.now()
+    row.save()
+    if row.variant == DEFAULT_CV_VARIANT:
+        # The site-wide CV link and the CV settings tab use the default variant.
+        sc.cv_document = row.document
+        sc.cv_generated_at = row.generated_at
+        sc.save(update_fields=["cv_document", "cv_generated_at"])
+
+
+def _record_run(keys, status, started, stages, sizes, errors):
+    """Persist a CVRegenerationLog row and emit the same data as a structured
+    log line (one JSON object), then prune old rows."""
+    total_ms = round((time.perf_counter() - started) * 1000)
+    logger.info("cv.regenerate %s", json.dumps({
+        "variants": keys, "status": status, "total_ms": total_ms,
+        "stages": stages, "sizes": sizes, "errors": errors,
+    }, sort_keys=True))
+    CVRegenerationLog.objects.create(
+        variants=",".join(keys), status=status, total_ms=total_ms,
+        stages=stages, sizes=sizes, error="\n\n".join(errors),
+    )
+    stale = CVRegenerationLog.objects.values_list("pk", flat=True)[CVRegenerationLog.KEEP:]
+    CVRegenerationLog.objects.filter(pk__in=list(stale)).delete()
+
+
+def regenerate_cv_documents(sc=None, variants=None, rebuild=False, max_workers=None):
+    """
+    Render CV variants (default: all) into their Wagtail Documents and return
+    {variant: Document}.
+
+    A variant whose fingerprint matches its stored one is only marked fresh,
+    unless ``rebuild``. The rest are compiled concurrently, at most
+    ``max_workers`` (default: settings.CV_RENDER_CONCURRENCY) at a time; each
+    compile is its own XeLaTeX process, so threads are enough to keep them
+    parallel. Documents are saved from the calling thread. Every run is
+    recorded as a CVRegenerationLog with per-stage timings and output sizes.
+    Raises RuntimeError after storing the successful variants if any variant
+    failed to compile.
+    """
+    from .cv_pdf import compile_cv_pdf, photo_filename, render_cv_tex
+
     sc = sc or SiteContent.objects.first()
-    if not sc or not sc.cv_enabled:
+    if not sc:
+        return {}
+    keys = [k for k in (variants or CV_VARIANTS) if k in CV_VARIANTS]
+
+    started = time.perf_counter()
+    stages, sizes = {}, {}
+    docs, jobs, errors = {}, {}, []
+    try:
+        with _timed(stages, "context"):
+            base = _resume_context(sc)
+        with tempfile.TemporaryDirectory() as workdir:
+            with _timed(stages, "photo"):
+                photo_path, photo_digest = _stage_profile_photo(sc, workdir)
+            photo = photo_filename(photo_path) if photo_path else ""
+            if photo_path:
+                sizes["photo"] = os.path.getsize(photo_path)
+
+            for key in keys:
+                stages[key], sizes[key] = {}, {}
+                row, _ = CVVariantDocument.objects.get_or_create(variant=key)
+                with _timed(stages[key], "tex"):
+                    tex = render_cv_tex(
+                        _variant_context(base, key),
+                        template_name=CV_VARIANTS[key]["template"], profile_image=photo,
+                    )
+                sizes[key]["tex"] = len(tex.encode("utf-8"))
+                fingerprint = _fingerprint(tex, photo_digest)
+                if not rebuild and row.document and row.fingerprint == fingerprint:
+                    _mark_fresh(sc, row)
+                    docs[key] = row.document
+                else:
+                    jobs[key] = (row, tex, fingerprint)
+
+            if jobs:
+                workers = max(1, min(max_workers or settings.CV_RENDER_CONCURRENCY, len(jobs)))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        key: pool.submit(compile_cv_pdf, tex, photo_path, stages[key])
+                        for key, (_, tex, _) in jobs.items()
+                    }
+                    for key, future in futures.items():
+                        row, _, fingerprint = jobs[key]
+                        try:
+                            pdf = future.result()
+                        except Exception as exc:
+                            errors.append(f"[{key}] {exc}")
+                            docs[key] = row.document
+                            continue
+                        sizes[key]["pdf"] = len(pdf)
+                        with _timed(stages[key], "save"):
+                            docs[key] = _store(sc, row, pdf, fingerprint)
+    except Exception as exc:
+        errors.append(str(exc))
+        raise
+    finally:
+        status = "failed" if errors else ("ok" if jobs else "unchanged")
+        _record_run(keys, status, started, stages, sizes, errors)
+
+    if errors:
+        raise RuntimeError("\n\n".join(errors))
+    return docs
+
+
+def regenerate_cv_document(sc=None, variant=DEFAULT_CV_VARIANT):
+    """Render one CV variant into its Wagtail Document. Returns the Document,
+    or None if there is no SiteContent."""
+    return regenerate_cv_documents(sc, [variant]).get(variant)
+
+
+def get_cv_document(sc=None, variant=DEFAULT_CV_VARIANT):
+    """Return a variant's current CV Document. A stale one is served as-is
+    while a background task re-renders it; only a missing one is rendered
+    inline."""
+    sc = sc or SiteContent.objects.first()
+    if not sc or not sc.cv_enabled or variant not in CV_VARIANTS:
         return None
-    if _is_stale(sc):
+    row = CVVariantDocument.objects.filter(variant=variant).select_related("document").first()
+    if row and row.document and _is_stale(sc, row):
+        from .tasks import regenerate_cv
+
+        regenerate_cv.enqueue(variants=[variant], dedup_key=f"cv.regenerate:{variant}")
+        return row.document
+    if _is_stale(sc, row):
         try:
-            return regenerate_cv_document(sc)
+            return regenerate_cv_document(sc, variant)
         except Exception:
             # Fall back to the existing (possibly stale) document if generation
             # fails — better a slightly old CV than a broken link.
-            return sc.cv_document
-    return sc.cv_document
+            return row.document if row else None
+    return row.document
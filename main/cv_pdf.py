@@ -3,9 +3,10 @@ CV PDF generation via XeLaTeX + Jinja2.
 """
 import os
 import re
+import shutil
 import subprocess
 import tempfile
-import mimetypes
+import time
 
 import jinja2
 
@@ -67,30 +68,94 @@ def _authors_to_latex(html):
     return out
 
 
-def render_cv_pdf(context, profile_image_bytes=None, profile_image_mime=None):
+CV_LABELS = {
+    "en": {
+        "profile":               "Profile",
+        "skills":                "Skills",
+        "languages":             "Languages",
+        "experience":            "Professional Experience",
+        "education":             "Education",
+        "grants":                "Grants & Funding",
+        "awards":                "Awards & Honours",
+        "publications":          "Publications",
+        "selected_publications": "Selected Publications",
+        "present":               "Present",
+        "citations":             "citations",
+        "citations_prefix":      "Citations:",
+        "pub_types": {
+            "journal":      "Journal Article",
+            "conference":   "Conference Paper",
+            "preprint":     "Preprint",
+            "thesis":       "Thesis / Dissertation",
+            "book_chapter": "Book Chapter",
+            "other":        "Other",
+        },
+    },
+    "pt": {
+        "profile":               "Perfil",
+        "skills":                "Competências",
+        "languages":             "Línguas",
+        "experience":            "Experiência Profissional",
+        "education":             "Formação Académica",
+        "grants":                "Bolsas & Financiamento",
+        "awards":                "Prémios & Distinções",
+        "publications":          "Publicações",
+        "selected_publications": "Publicações Selecionadas",
+        "present":               "Presente",
+        "citations":             "citações",
+        "citations_prefix":      "Citações:",
+        "pub_types": {
+            "journal":      "Artigo em Revista",
+            "conference":   "Artigo em Conferência",
+            "preprint":     "Preprint",
+            "thesis":       "Tese / Dissertação",
+            "book_chapter": "Capítulo de Livro",
+            "other":        "Outro",
+        },
+    },
+}
+
+
+def photo_filename(path):
+    """File name the profile photo is staged under, next to cv.tex."""
+    ext = os.path.splitext(path)[1].lower() or ".jpg"
+    # Wagtail/Pillow may name JPEGs .jpeg; normalise
+    if ext == ".jpeg":
+        ext = ".jpg"
+    return f"photo{ext}"
+
+
+def render_cv_tex(context, template_name="resume.tex.j2", profile_image=""):
     """
-    Render the CV as a PDF and return raw bytes.
+    Render the LaTeX source for a CV. Deterministic for a given context, so the
+    result doubles as the input fingerprint (see main.cv).
 
-    context: dict with CV data (skills, experiences, educations, etc.)
-    profile_image_bytes: raw image bytes or None
-    profile_image_mime: MIME type string or None
+    profile_image: photo file name relative to the XeLaTeX working directory
+    (see photo_filename), or "" for no photo.
+    """
+    ctx = dict(context)
+    ctx.setdefault("labels", CV_LABELS["en"])
+    ctx["profile_image"] = profile_image
+    return _get_env().get_template(template_name).render(**ctx)
+
+
+def compile_cv_pdf(tex, profile_image_path=None, timings=None):
+    """
+    Compile LaTeX source (from render_cv_tex) with XeLaTeX and return the PDF
+    bytes. Touches no database state, so it is safe to run from a worker.
+
+    profile_image_path: photo file on disk, copied next to cv.tex under the
+    name render_cv_tex was given (photo_filename).
+    timings: optional dict that receives the duration (ms) of each XeLaTeX
+    pass as "xelatex_1" / "xelatex_2".
     """
+    timings = {} if timings is None else timings
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Write profile image to disk so XeLaTeX can include it
-        photo_path = ""
-        if profile_image_bytes:
-            ext = mimetypes.guess_extension(profile_image_mime or "image/jpeg") or ".jpg"
-            # guess_extension returns .jpeg on some systems; normalise
-            if ext == ".jpeg":
-                ext = ".jpg"
-            photo_path = os.path.join(tmpdir, f"photo{ext}")
-            with open(photo_path, "wb") as fh:
-                fh.write(profile_image_bytes)
-
-        ctx = dict(context)
-        ctx["profile_image"] = photo_path
-
-        tex = _get_env().get_template("resume.tex.j2").render(**ctx)
+        if profile_image_path:
+            shutil.copyfile(
+                profile_image_path,
+                os.path.join(tmpdir, photo_filename(profile_image_path)),
+            )
 
         tex_path = os.path.join(tmpdir, "cv.tex")
         with open(tex_path, "w", encoding="utf-8") as fh:
@@ -103,10 +168,15 @@ def render_cv_pdf(context, profile_image_bytes=None, profile_image_mime=None):
             f"-output-directory={tmpdir}",
             tex_path,
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        # cwd=tmpdir so the relative photo path in the .tex resolves.
+        run = dict(capture_output=True, text=True, timeout=120, cwd=tmpdir)
         # Run twice so \pageref{LastPage} resolves
-        if result.returncode == 0:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        for npass in (1, 2):
+            start = time.perf_counter()
+            result = subprocess.run(cmd, **run)
+            timings[f"xelatex_{npass}"] = round((time.perf_counter() - start) * 1000)
+            if result.returncode != 0:
+                break
 
         pdf_path = os.path.join(tmpdir, "cv.pdf")
         if not os.path.exists(pdf_path):
@@ -115,3 +185,16 @@ def render_cv_pdf(context, profile_image_bytes=None, profile_image_mime=None):
 
         with open(pdf_path, "rb") as fh:
             return fh.read()
+
+
+def render_cv_pdf(context, profile_image_path=None, template_name="resume.tex.j2"):
+    """
+    Render the CV as a PDF and return raw bytes.
+
+    context: dict with CV data (skills, experiences, educations, etc.)
+    profile_image_path: path to the (already downscaled) photo, or None
+    template_name: LaTeX template under main/templates
+    """
+    photo = photo_filename(profile_image_path) if profile_image_path else ""
+    tex = render_cv_tex(context, template_name=template_name, profile_image=photo)
+    return compile_cv_pdf(tex, profile_image_path=profile_image_path)
@@ -0,0 +1,433 @@
+"""
+Shared HTTP client for outbound integrations (GitHub stats, ORCID,
+Semantic Scholar).
+
+One HttpClient wraps a single keep-alive requests.Session; urllib3 keeps a
+connection pool per host. Behaviour is configured per host through a
+HostPolicy:
+
+- rate limiting: a token bucket per host, shared by all threads;
+- retries: connection errors and retryable statuses (429/5xx) are retried
+  with exponential backoff. Retry-After is honoured, and a 429 pauses every
+  caller of that host, not just the one that hit it;
+- circuit breaking: after ``breaker_threshold`` consecutive failures the host
+  is skipped (CircuitOpenError) for ``breaker_cooldown`` seconds, then one
+  trial request decides whether it closes again;
+- caching: with a ``cache_dir`` (default settings.HTTP_CACHE_DIR), calls made
+  with ``cache_ttl`` store successful responses on disk;
+- metrics: request/retry/error/cache counts and latency per host
+  (``metrics()``, ``log_metrics()``);
+- record / replay: with ``record_dir`` every final response is also written
+  as a gzipped JSON fixture; with ``replay_dir`` responses come only from
+  those fixtures (no network, no rate limiting, no retries), so a sync run is
+  reproducible offline. ``write_fixture`` creates fixtures directly, e.g. for
+  synthetic large profiles.
+
+Nothing is tied to a hostname, so a client pointed at a local stub server
+behaves exactly as in production (under the default policy, or one passed in).
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "rafaelmdc-portfolio (+https://github.com/rafaelmdc/portfolio)"
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    rate:              float = 0      # requests per second; 0 = unlimited
+    burst:             int   = 1
+    timeout:           float = 10
+    retries:           int   = 3
+    backoff:           float = 1.0    # first retry delay (s), doubled each attempt
+    max_wait:          float = 120    # cap on any single Retry-After / backoff wait
+    retry_statuses:    tuple = (429, 500, 502, 503, 504)
+    breaker_threshold: int   = 5
+    breaker_cooldown:  float = 60
+
+
+DEFAULT_POLICY = HostPolicy()
+
+HOST_POLICIES = {
+    # ORCID public API: 24 req/s sustained, bursts of 40.
+    "pub.orcid.org":           HostPolicy(rate=20, burst=40, timeout=15, retries=4),
+    # Semantic Scholar: ~1 req/s shared without a key; batch calls are slow.
+    "api.semanticscholar.org": HostPolicy(rate=1, burst=1, timeout=30, retries=4),
+    # GitHub is also called inside web requests (github_stats, on a cold
+    # cache): fail fast rather than hold a worker through retries or a long
+    # Retry-After. The scheduler's warm-up tries again on its next run.
+    "api.github.com":          HostPolicy(rate=5, burst=5, timeout=8, retries=0, max_wait=5),
+}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """The host failed repeatedly and is being skipped until its cooldown ends."""
+
+
+class ReplayMissError(requests.ConnectionError):
+    """Replay mode: no fixture was recorded for this request."""
+
+
+def _request_key(method, url, params=None, json_body=None, data=None):
+    """Stable digest of what identifies a request (headers excluded, so API
+    keys never end up in cache or fixture names)."""
+    key = json.dumps([method.upper(), url, params, json_body, data], sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _fixture_path(root, method, url, params=None, json_body=None, data=None):
+    host = (urlsplit(url).netloc or "_").replace(":", "_")
+    return os.path.join(root, host, _request_key(method, url, params, json_body, data) + ".json.gz")
+
+
+def _response(url, status, headers, body):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers     = CaseInsensitiveDict(headers)
+    resp._content    = body.encode("utf-8")
+    resp.encoding    = "utf-8"
+    resp.url         = url
+    return resp
+
+
+def write_fixture(root, method, url, body, status=200, params=None, json_body=None,
+                  headers=None, data=None):
+    """Write one replay fixture. ``body`` is a str, or any JSON-serialisable value."""
+    if not isinstance(body, str):
+        body = json.dumps(body)
+    path = _fixture_path(root, method, url, params, json_body, data)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        "request": {
+            "method": method.upper(), "url": url, "params": params, "json": json_body, "data": data,
+        },
+        "status": status,
+        "headers": headers or {"Content-Type": "application/json"},
+        "body": body,
+    }
+    # mtime=0 keeps re-recorded fixtures byte-identical when nothing changed.
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as fh:
+        fh.write(json.dumps(record, sort_keys=True).encode("utf-8"))
+    return path
+
+
+class _TokenBucket:
+    """Thread-safe token bucket: ``acquire()`` blocks until a request may go out."""
+
+    def __init__(self, rate, burst):
+        self.rate     = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens   = self.capacity
+        self.updated  = time.monotonic()
+        self.lock     = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Drain the bucket so every caller waits ``seconds`` (after a 429/503)."""
+        with self.lock:
+            self.tokens  = min(self.tokens, 0) - seconds * self.rate
+            self.updated = time.monotonic()
+
+
+class _Host:
+    """Per-host state: policy, limiter, breaker and metrics."""
+
+    def __init__(self, policy):
+        self.policy   = policy
+        self.bucket   = _TokenBucket(policy.rate, policy.burst) if policy.rate else None
+        self.lock     = threading.Lock()
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial    = False
+        self.stats    = {
+            "requests": 0, "retries": 0, "errors": 0, "cache_hits": 0,
+            "circuit_rejects": 0, "total_ms": 0.0, "max_ms": 0.0,
+        }
+
+    def admit(self):
+        with self.lock:
+            if self.open_until and time.monotonic() < self.open_until:
+                self.stats["circuit_rejects"] += 1
+                return False
+            if self.open_until:
+                # Cooldown over: let one trial request through (half-open).
+                if self.trial:
+                    self.stats["circuit_rejects"] += 1
+                    return False
+                self.trial = True
+            return True
+
+    def record(self, ok, elapsed_ms):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["total_ms"] += elapsed_ms
+            self.stats["max_ms"] = max(self.stats["max_ms"], elapsed_ms)
+            if ok:
+                self.failures, self.open_until, self.trial = 0, 0.0, False
+                return
+            self.stats["errors"] += 1
+            self.failures += 1
+            if self.trial or self.failures >= self.policy.breaker_threshold:
+                self.open_until = time.monotonic() + self.policy.breaker_cooldown
+                self.trial = False
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+
+def retry_after(resp, default):
+    """Seconds to wait from a Retry-After header (seconds or HTTP date)."""
+    value = (resp.headers.get("Retry-After") or "").strip() if resp is not None else ""
+    if value.isdigit():
+        return float(value)
+    if value:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+class HttpClient:
+    def __init__(self, policies=None, cache_dir=None, pool_maxsize=10,
+                 record_dir=None, replay_dir=None):
+        if record_dir and replay_dir:
+            raise ValueError("record_dir and replay_dir are mutually exclusive")
+        self.policies   = {**HOST_POLICIES, **(policies or {})}
+        self.cache_dir  = cache_dir if cache_dir is not None else getattr(settings, "HTTP_CACHE_DIR", "")
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
+        self.session   = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._hosts = {}
+        self._lock  = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def configure(self, host, **changes):
+        """Override policy fields for one host (before its first request)."""
+        with self._lock:
+            self.policies[host] = replace(self.policies.get(host, DEFAULT_POLICY), **changes)
+            self._hosts.pop(host, None)
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _Host(self.policies.get(host, DEFAULT_POLICY))
+            return self._hosts[host]
+
+    # ── Requests ─────────────────────────────────────────────────────────────
+
+    def request(self, method, url, *, cache_ttl=None, timeout=None, **kwargs):
+        """
+        Send a request under the host's policy and return the final Response
+        (retryable statuses are returned as-is once retries are exhausted).
+        Raises CircuitOpenError while the host's breaker is open, or the last
+        connection error.
+        """
+        host  = urlsplit(url).netloc
+        state = self._host(host)
+        policy = state.policy
+
+        if self.replay_dir:
+            return self._replay(method, url, kwargs, state)
+
+        cache_path = self._cache_path(method, url, kwargs) if cache_ttl else None
+        if cache_path:
+            cached = self._cache_read(cache_path, cache_ttl, url)
+            if cached is not None:
+                state.count("cache_hits")
+                return cached
+
+        for attempt in range(policy.retries + 1):
+            if not state.admit():
+                raise CircuitOpenError(f"circuit open for {host}")
+            if state.bucket:
+                state.bucket.acquire()
+            start = time.perf_counter()
+            resp = error = None
+            try:
+                resp = self.session.request(method, url, timeout=timeout or policy.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            finally:
+                # Always settle the outcome, so an unexpected exception
+                # (ChunkedEncodingError, InvalidURL, …) can't leave a
+                # half-open breaker waiting on its trial forever.
+                failed = resp is None or resp.status_code in policy.retry_statuses
+                state.record(not failed, (time.perf_counter() - start) * 1000)
+            if not failed or attempt >= policy.retries:
+                break
+            wait = min(
+                retry_after(resp, policy.backoff * 2 ** attempt) + random.uniform(0, 0.25),
+                policy.max_wait,
+            )
+            logger.warning(
+                "%s %s → %s; retry %d/%d in %.1fs", method, url,
+                error or resp.status_code, attempt + 1, policy.retries, wait,
+            )
+            state.count("retries")
+            if resp is not None and resp.status_code == 429 and state.bucket:
+                state.bucket.pause(wait)
+            else:
+                time.sleep(wait)
+
+        if error is not None:
+            raise error
+        if cache_path and resp.ok:
+            self._cache_write(cache_path, resp)
+        if self.record_dir:
+            self._record(method, url, kwargs, resp)
+        return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_json(self, url, **kwargs):
+        resp = self.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    def post_json(self, url, **kwargs):
+        resp = self.post(url, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    # ── Record / replay ──────────────────────────────────────────────────────
+
+    def _record(self, method, url, kwargs, resp):
+        headers = {k: resp.headers[k] for k in ("Content-Type", "Retry-After") if k in resp.headers}
+        write_fixture(
+            self.record_dir, method, url, resp.text, status=resp.status_code,
+            params=kwargs.get("params"), json_body=kwargs.get("json"), headers=headers,
+            data=kwargs.get("data"),
+        )
+
+    def _replay(self, method, url, kwargs, state):
+        path = _fixture_path(
+            self.replay_dir, method, url,
+            kwargs.get("params"), kwargs.get("json"), kwargs.get("data"),
+        )
+        start = time.perf_counter()
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                record = json.load(fh)
+        except FileNotFoundError:
+            # Counted, but never trips the breaker: a miss is not a host failure.
+            state.count("requests")
+            state.count("errors")
+            raise ReplayMissError(f"no recorded response for {method} {url}")
+        state.record(True, (time.perf_counter() - start) * 1000)
+        return _response(url, record["status"], record["headers"], record["body"])
+
+    # ── Disk cache ───────────────────────────────────────────────────────────
+
+    def _cache_path(self, method, url, kwargs):
+        if not self.cache_dir:
+            return None
+        digest = _request_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        return os.path.join(self.cache_dir, urlsplit(url).netloc or "_", digest + ".json")
+
+    def _cache_read(self, path, ttl, url):
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return _response(url, data["status"], data["headers"], data["body"])
+
+    def _cache_write(self, path, resp):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({
+                    "status": resp.status_code,
+                    "headers": {"Content-Type": resp.headers.get("Content-Type", "")},
+                    "body": resp.text,
+                }, fh)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("HTTP cache write failed for %s: %s", path, exc)
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+
+    def metrics(self):
+        """{host: {requests, retries, errors, cache_hits, circuit_rejects, avg_ms, max_ms}}"""
+        out = {}
+        with self._lock:
+            hosts = dict(self._hosts)
+        for host, state in hosts.items():
+            with state.lock:
+                s = dict(state.stats)
+            s["avg_ms"] = round(s["total_ms"] / s["requests"], 1) if s["requests"] else 0
+            s["total_ms"] = round(s["total_ms"])
+            s["max_ms"] = round(s["max_ms"])
+            out[host] = s
+        return out
+
+    def log_metrics(self):
+        metrics = self.metrics()
+        if metrics:
+            logger.info("http.metrics %s", json.dumps(metrics, sort_keys=True))
+        return metrics
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client for request-time integrations (e.g. github_stats).
+    HTTP_RECORD_DIR / HTTP_REPLAY_DIR put it in record or replay mode."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient(
+                record_dir=getattr(settings, "HTTP_RECORD_DIR", "") or None,
+                replay_dir=getattr(settings, "HTTP_REPLAY_DIR", "") or None,
+            )
+        return _default
@@ -0,0 +1,141 @@
+"""
+Render every missing API rendition for every image, in a process pool.
+
+Wagtail creates renditions lazily, one API request at a time; after changing
+a spec or restoring a database this renders them all up front instead. The
+specs are the ones the API serves (cms.images.api_specs): the StreamField
+srcset ladder, thumbs and site-bundle renditions with their WebP/AVIF
+variants, and the page ImageRenditionField specs.
+
+Usage:
+    python manage.py backfill_renditions                # all images, missing specs only
+    python manage.py backfill_renditions --workers 8
+    python manage.py backfill_renditions --aspects      # also the cropped (16:9, 4:3, 1:1) ladders
+    python manage.py backfill_renditions --dry-run      # count what is missing
+
+Existing renditions are skipped, so an interrupted run resumes where it
+stopped when started again. So are images whose original is still pending
+verification (cms.tasks.verify_image) or quarantined.
+"""
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+
+from cms.images import ASPECTS, api_specs
+
+LIST_BATCH = 500        # images per existing-rendition lookup
+PROGRESS_EVERY = 2.0    # seconds between progress lines
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    # Ctrl-C reaches the whole process group; let the parent handle it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if not apps.ready:  # spawn/forkserver start methods
+        django.setup()
+    connections.close_all()
+
+
+def _render(job):
+    """Pool task: render ``specs`` for one image. Returns (pk, rendered, error)."""
+    pk, specs = job
+    try:
+        image = get_image_model().objects.get(pk=pk)
+        image.get_renditions(*specs)
+    except Exception as exc:  # missing/corrupt source file, deleted image, …
+        return pk, 0, f"{type(exc).__name__}: {exc}"
+    return pk, len(specs), None
+
+
+def missing_renditions(aspects=(None,)):
+    """Yield (image pk, [missing specs]) for every image with work to do.
+    Only verified originals: pending ones are rendered once the worker has
+    normalised them, quarantined ones never."""
+    Image = get_image_model()
+    Rendition = Image.get_rendition_model()
+    filters = {}
+    pks = list(
+        Image.objects.filter(file_status=Image.FILE_VERIFIED).order_by("pk").values_list("pk", flat=True)
+    )
+    for i in range(0, len(pks), LIST_BATCH):
+        images = Image.objects.filter(pk__in=pks[i:i + LIST_BATCH]).order_by("pk")
+        existing = set(
+            Rendition.objects.filter(image_id__in=pks[i:i + LIST_BATCH])
+            .values_list("image_id", "filter_spec", "focal_point_key")
+        )
+        for image in images:
+            missing = []
+            for spec in api_specs(image, aspects):
+                f = filters.setdefault(spec, Filter(spec))
+                if (image.pk, spec, f.get_cache_key(image)) not in existing:
+                    missing.append(spec)
+            if missing:
+                yield image.pk, missing
+
+
+class Command(BaseCommand):
+    help = "Render missing API renditions for all images in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=min(4, os.cpu_count() or 1),
+            help="Worker processes (default: min(4, CPUs)).",
+        )
+        parser.add_argument("--aspects", action="store_true", help="Also render the cropped srcset ladders.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what is missing.")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+        aspects = (None, *ASPECTS) if options["aspects"] else (None,)
+
+        start = time.perf_counter()
+        jobs = list(missing_renditions(aspects))
+        total = sum(len(specs) for _, specs in jobs)
+        self.stdout.write(
+            f"{total} missing rendition(s) across {len(jobs)} image(s)"
+            f" (listed in {time.perf_counter() - start:.1f}s)"
+        )
+        if options["dry_run"] or not jobs:
+            return
+
+        # Children must not share the parent's database connection.
+        connections.close_all()
+        done = failed = 0
+        start = last = time.perf_counter()
+        pool = multiprocessing.Pool(options["workers"], initializer=_init_worker)
+        try:
+            # Biggest jobs first, so the pool doesn't end on one long straggler.
+            jobs.sort(key=lambda job: -len(job[1]))
+            for pk, rendered, error in pool.imap_unordered(_render, jobs):
+                done += rendered
+                if error:
+                    failed += 1
+                    self.stderr.write(f"  image {pk}: {error}")
+                now = time.perf_counter()
+                if now - last >= PROGRESS_EVERY:
+                    last = now
+                    rate = done / (now - start)
+                    eta = (total - done) / rate if rate else 0
+                    self.stdout.write(f"  {done}/{total} ({done / total:.0%}), {rate:.1f}/s, ~{eta:.0f}s left")
+            pool.close()
+        except KeyboardInterrupt:
+            pool.terminate()
+            self.stdout.write(self.style.WARNING(f"Interrupted after {done} rendition(s); run again to resume."))
+            return
+        finally:
+            pool.join()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {done} rendition(s) in {elapsed:.1f}s ({done / elapsed:.1f}/s,"
+            f" {options['workers']} worker(s)); {failed} image(s) failed."
+        ))
@@ -0,0 +1,107 @@
+"""
+Benchmark upload normalisation: rendition time and storage per image, for the
+original as uploaded vs. as stored after main.validators.normalise_image_file.
+
+Renders every API spec (the srcset ladder, the thumb and their WebP/AVIF
+variants) in memory; nothing is written to the database or media storage.
+
+    python manage.py bench_image_uploads photos/*.jpg
+    python manage.py bench_image_uploads --synthetic 6        # 6000×4000 camera-like JPEGs
+"""
+import io
+import os
+import random
+import time
+
+from django.core.files.images import ImageFile
+from django.core.management.base import BaseCommand, CommandError
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+
+from cms.images import THUMB_SPEC, ladder_specs, variant_formats, variant_spec
+from main.validators import normalise_image_file
+
+
+def synthetic_original(seed, size=(6000, 4000)):
+    """A camera-like JPEG: photo-ish content, quality 95, EXIF with a
+    rotate-90 orientation and GPS block."""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rnd = random.Random(seed)
+    w, h = size
+    im = Image.linear_gradient("L").resize((w, h)).convert("RGB")
+    draw = ImageDraw.Draw(im)
+    for _ in range(80):
+        x, y, r = rnd.randrange(w), rnd.randrange(h), rnd.randrange(40, 900)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rnd.randrange(256) for _ in range(3)))
+    im = im.filter(ImageFilter.GaussianBlur(16))
+    im = Image.blend(im, Image.effect_noise((w, h), 20).convert("RGB"), 0.1)
+    exif = Image.Exif()
+    exif[0x0112] = 6                                   # Orientation: rotate 90
+    exif[0x010F], exif[0x0110] = "Camera Co", "X-100"  # Make, Model
+    exif[0x8825] = {1: "N", 2: (38.0, 42.0, 5.0), 3: "W", 4: (9.0, 8.0, 21.0)}  # GPS
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=95, exif=exif)
+    return f"synthetic-{seed}.jpg", buf.getvalue()
+
+
+def render_all(data, name):
+    """Render every API spec from ``data``; returns (seconds, total bytes, count)."""
+    image = get_image_model()(file=ImageFile(io.BytesIO(data), name=name))
+    ladder, _ = ladder_specs(image)
+    specs = [s for spec in (*ladder, THUMB_SPEC) for s in (spec, *(variant_spec(spec, f) for f in variant_formats()))]
+    total = 0
+    start = time.perf_counter()
+    for spec in specs:
+        out = io.BytesIO()
+        Filter(spec).run(image, out)
+        total += out.tell()
+    return time.perf_counter() - start, total, len(specs)
+
+
+class Command(BaseCommand):
+    help = "Benchmark rendition time and storage for raw vs normalised image originals."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="*", help="Original image files.")
+        parser.add_argument("--synthetic", type=int, default=0, help="Also generate N camera-like originals.")
+
+    def handle(self, *args, **options):
+        originals = []
+        for path in options["files"]:
+            with open(path, "rb") as f:
+                originals.append((os.path.basename(path), f.read()))
+        originals += [synthetic_original(i) for i in range(options["synthetic"])]
+        if not originals:
+            raise CommandError("Pass image files and/or --synthetic N.")
+
+        raw = {"stored": 0, "seconds": 0.0}
+        norm = {"stored": 0, "seconds": 0.0, "normalise": 0.0}
+        for name, data in originals:
+            start = time.perf_counter()
+            normalised = normalise_image_file(io.BytesIO(data), name)
+            norm["normalise"] += time.perf_counter() - start
+            ndata = normalised.read() if normalised else data
+            nname = normalised.name if normalised else name
+
+            r_secs, r_bytes, count = render_all(data, name)
+            n_secs, n_bytes, _ = render_all(ndata, nname)
+            raw["stored"] += len(data) + r_bytes
+            raw["seconds"] += r_secs
+            norm["stored"] += len(ndata) + n_bytes
+            norm["seconds"] += n_secs
+            self.stdout.write(
+                f"  {name:<24} {len(data) / 1e6:6.2f} → {len(ndata) / 1e6:5.2f} MB original, "
+                f"{count} renditions {r_secs:6.2f}s → {n_secs:5.2f}s"
+            )
+
+        n = len(originals)
+        self.stdout.write(f"\nPer image (mean of {n}):")
+        self.stdout.write(f"  {'':<11} {'renditions':>12} {'stored (orig + renditions)':>28}")
+        self.stdout.write(f"  {'raw':<11} {raw['seconds'] / n * 1000:>10.0f}ms {raw['stored'] / n / 1e6:>25.2f} MB")
+        self.stdout.write(f"  {'normalised':<11} {norm['seconds'] / n * 1000:>10.0f}ms {norm['stored'] / n / 1e6:>25.2f} MB")
+        self.stdout.write(f"  normalising on upload: {norm['normalise'] / n * 1000:.0f}ms per image")
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendition time {1 - norm['seconds'] / raw['seconds']:.0%} lower, "
+            f"storage {1 - norm['stored'] / raw['stored']:.0%} lower."
+        ))
@@ -0,0 +1,200 @@
+"""
+Delete media files that no database row references.
+
+Walks the media storage one directory listing at a time and checks each batch
+of paths against every FileField column in the project (image originals,
+renditions, documents, and the pre-CustomImage wagtailimages tables). Files
+nothing points at are deleted: renditions and originals of deleted images,
+and the old ``site/`` and ``portfolio/`` uploads whose models are gone.
+
+With --prune-renditions it first drops rendition rows for specs nothing asks
+for any more (see ``retired_renditions``); their files go in the same run.
+
+Usage:
+    python manage.py gc_media --dry-run                  # report only
+    python manage.py gc_media
+    python manage.py gc_media --prefix site --prefix portfolio
+    python manage.py gc_media --prune-renditions
+    python manage.py gc_media --min-age 0                # no grace period
+
+Files younger than --min-age hours are kept: an upload has its file in
+storage before its row is committed.
+"""
+import itertools
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from wagtail.images import get_image_model
+
+from cms.images import ASPECTS, api_specs
+from main.cv import CV_PHOTO_SPEC
+
+BATCH = 900          # paths per lookup/delete batch (below SQLite's 999 parameters)
+LIST_BATCH = 500     # images per rendition-row lookup
+
+# Renditions the Wagtail admin renders for choosers, listings and the focal
+# point editor; pruning them would only have the admin render them again.
+ADMIN_SPECS = ("max-165x165", "max-800x600", "original")
+
+
+def file_columns():
+    """(model, column) for every concrete FileField/ImageField.
+
+    A field on another storage can only add references, never remove one, so
+    it is safe to include."""
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field.attname
+
+
+def walk(storage, path=""):
+    """Yield (name, size, mtime) for every file under ``path``.
+
+    Local storage is read with os.scandir, which streams even a directory of
+    millions of renditions; other backends fall back to Storage.listdir, one
+    directory at a time."""
+    try:
+        storage.path("")
+    except NotImplementedError:
+        local = False
+    else:
+        local = True
+
+    stack = [path.strip("/")]
+    while stack:
+        current = stack.pop()
+        if local:
+            try:
+                entries = os.scandir(storage.path(current))
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = f"{current}/{entry.name}" if current else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(name)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        yield name, st.st_size, st.st_mtime
+        else:
+            dirs, files = storage.listdir(current)
+            stack += [f"{current}/{d}" if current else d for d in dirs]
+            for f in files:
+                name = f"{current}/{f}" if current else f
+                yield name, storage.size(name), storage.get_modified_time(name).timestamp()
+
+
+def referenced(columns, names):
+    """The subset of ``names`` stored in any of ``columns``."""
+    found = set()
+    for model, column in columns:
+        found.update(
+            model._base_manager.filter(**{f"{column}__in": names}).values_list(column, flat=True)
+        )
+    return found
+
+
+def retired_renditions(aspects=(None, *ASPECTS)):
+    """Yield rendition pks whose spec is neither an API spec for their image
+    (cms.images.api_specs, every crop aspect), the CV photo nor an admin
+    thumbnail."""
+    Image = get_image_model()
+    Rendition = Image.get_rendition_model()
+    pks = list(Image.objects.order_by("pk").values_list("pk", flat=True))
+    for i in range(0, len(pks), LIST_BATCH):
+        images = Image.objects.filter(pk__in=pks[i:i + LIST_BATCH])
+        keep = {image.pk: {*api_specs(image, aspects), CV_PHOTO_SPEC, *ADMIN_SPECS} for image in images}
+        rows = Rendition.objects.filter(image_id__in=keep).values_list("pk", "image_id", "filter_spec")
+        for pk, image_id, spec in rows.iterator():
+            if spec not in keep[image_id]:
+                yield pk
+
+
+def _size(n):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced files from media storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+        parser.add_argument(
+            "--prefix", action="append", default=[],
+            help="Only collect under this top-level directory (repeatable; default: everything).",
+        )
+        parser.add_argument(
+            "--min-age", type=float, default=1.0,
+            help="Keep files modified in the last N hours (default: 1).",
+        )
+        parser.add_argument(
+            "--prune-renditions", action="store_true",
+            help="First delete rendition rows for specs the API no longer serves.",
+        )
+
+    def handle(self, *args, **options):
+        if options["min_age"] < 0:
+            raise CommandError("--min-age cannot be negative.")
+        dry_run = options["dry_run"]
+        start = time.perf_counter()
+
+        if options["prune_renditions"]:
+            self.prune_renditions(dry_run)
+
+        columns = list(file_columns())
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=options["min_age"])).timestamp()
+        # prefix → [files, bytes, orphan files, orphan bytes, too recent]
+        report = {}
+        files = itertools.chain.from_iterable(
+            walk(default_storage, p) for p in (options["prefix"] or [""])
+        )
+        while batch := list(itertools.islice(files, BATCH)):
+            keep = referenced(columns, [name for name, _, _ in batch])
+            for name, size, mtime in batch:
+                stats = report.setdefault(name.split("/", 1)[0] if "/" in name else ".", [0, 0, 0, 0, 0])
+                stats[0] += 1
+                stats[1] += size
+                if name in keep:
+                    continue
+                if mtime > cutoff:
+                    stats[4] += 1
+                    continue
+                stats[2] += 1
+                stats[3] += size
+                if not dry_run:
+                    default_storage.delete(name)
+
+        self.stdout.write(f"  {'prefix':<20} {'files':>9} {'size':>11} {'orphans':>9} {'orphan size':>12} {'recent':>7}")
+        for prefix, (n, size, orphans, orphan_size, recent) in sorted(report.items()):
+            self.stdout.write(
+                f"  {prefix:<20} {n:>9} {_size(size):>11} {orphans:>9} {_size(orphan_size):>12} {recent:>7}"
+            )
+        orphans = sum(s[2] for s in report.values())
+        orphan_size = sum(s[3] for s in report.values())
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {orphans} unreferenced file(s), {_size(orphan_size)}"
+            f" ({time.perf_counter() - start:.1f}s)."
+        ))
+
+    def prune_renditions(self, dry_run):
+        Rendition = get_image_model().get_rendition_model()
+        pks = list(retired_renditions())
+        if not dry_run:
+            # Model delete(): Wagtail's post_delete handlers remove the files
+            # and purge the rendition cache.
+            for i in range(0, len(pks), BATCH):
+                Rendition.objects.filter(pk__in=pks[i:i + BATCH]).delete()
+        verb = "Would prune" if dry_run else "Pruned"
+        self.stdout.write(f"{verb} {len(pks)} rendition row(s) for retired specs.")
@@ -1,38 +1,67 @@
 """
-Regenerate the CV PDF Wagtail Document from the live CMS data.
+Regenerate the CV PDF Wagtail Documents (one per variant) from the live CMS data.
 
 Run on a schedule (e.g. a daily/weekly cron or k8s CronJob) to keep the cached
-CV fresh, or manually:
+CVs fresh, or manually:
 
     python manage.py gen_cv
-    python manage.py gen_cv --force   # ignore the daily/weekly staleness window
+    python manage.py gen_cv --force             # ignore the daily/weekly staleness window
+    python manage.py gen_cv --rebuild           # recompile even unchanged variants
+    python manage.py gen_cv --variant onepage   # only some variants (repeatable)
+    python manage.py gen_cv --jobs 4            # compile up to 4 variants at once
 """
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from main.cv import get_cv_document, regenerate_cv_document
+from main.cv import CV_VARIANTS, regenerate_cv_documents, stale_cv_variants
 from main.models import SiteContent
 
 
 class Command(BaseCommand):
-    help = "Regenerate the cached CV PDF document from CMS data."
+    help = "Regenerate the cached CV PDF documents from CMS data."
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--force", action="store_true",
             help="Regenerate even if the cached CV is still within its refresh window.",
         )
+        parser.add_argument(
+            "--rebuild", action="store_true",
+            help="Recompile variants whose fingerprint is unchanged (implies --force).",
+        )
+        parser.add_argument(
+            "--variant", action="append", choices=sorted(CV_VARIANTS),
+            help="Variant to regenerate (repeatable). Defaults to all variants.",
+        )
+        parser.add_argument(
+            "--jobs", type=int, default=None,
+            help="Max variants compiled concurrently (default: settings.CV_RENDER_CONCURRENCY).",
+        )
 
     def handle(self, *args, **options):
         sc = SiteContent.objects.first()
         if not sc:
             self.stderr.write("No SiteContent configured.")
             return
+        if not sc.cv_enabled:
+            self.stdout.write("CV is disabled or unavailable.")
+            return
+        if options["jobs"] is not None and options["jobs"] < 1:
+            raise CommandError("--jobs must be at least 1.")
+
+        variants = options["variant"] or list(CV_VARIANTS)
+        if not (options["force"] or options["rebuild"]):
+            variants = stale_cv_variants(sc, variants)
+        if not variants:
+            self.stdout.write("All CV variants are within their refresh window.")
+            return
+
         try:
-            doc = regenerate_cv_document(sc) if options["force"] else get_cv_document(sc)
+            docs = regenerate_cv_documents(
+                sc, variants, rebuild=options["rebuild"], max_workers=options["jobs"],
+            )
         except RuntimeError as exc:
             self.stderr.write(str(exc))
             return
-        if doc:
-            self.stdout.write(self.style.SUCCESS(f"CV document ready → {doc.url}"))
-        else:
-            self.stdout.write("CV is disabled or unavailable.")
+        for key, doc in docs.items():
+            if doc:
+                self.stdout.write(self.style.SUCCESS(f"CV [{key}] ready → {doc.url}"))
@@ -0,0 +1,107 @@
+"""
+Write replay fixtures for a synthetic ORCID profile (no network, no DB).
+
+The fixtures are what `sync_orcid --record` would have captured for a profile
+of the given size, so the DB side of a sync can be profiled at scale:
+
+    python manage.py gen_orcid_fixtures /tmp/orcid-5k --works 5000 --fundings 200
+    python manage.py sync_orcid --orcid-id 0000-0000-0000-0000 --full --replay /tmp/orcid-5k
+"""
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.http_client import write_fixture
+from main.management.commands.sync_orcid import BULK_MAX, ORCID_API, WORK_TYPE_MAP
+
+SYNTHETIC_ORCID_ID = "0000-0000-0000-0000"
+_MODIFIED = 1_700_000_000_000  # ms since epoch
+
+
+def _value(v):
+    return {"value": v}
+
+
+def _work_summary(pc, rnd):
+    return {
+        "put-code": pc,
+        "title": {"title": _value(f"Synthetic study {pc} of protein dynamics")},
+        "type": rnd.choice(list(WORK_TYPE_MAP)),
+        "publication-date": {"year": _value(str(rnd.randint(2005, 2025)))},
+        "journal-title": _value(f"Journal of Synthetic Results {pc % 40}"),
+        "last-modified-date": _value(_MODIFIED + pc),
+        "external-ids": {"external-id": [
+            {"external-id-type": "doi", "external-id-value": f"10.5555/synthetic.{pc}"},
+        ]},
+    }
+
+
+def _work_detail(pc, rnd):
+    names = ["Correia R"] + [f"Author{rnd.randint(1, 9999)} {chr(65 + i)}" for i in range(rnd.randint(1, 12))]
+    rnd.shuffle(names)
+    return {
+        "put-code": pc,
+        "last-modified-date": _value(_MODIFIED + pc),
+        "contributors": {"contributor": [
+            {"credit-name": _value(n), "contributor-attributes": {"contributor-role": "author"}}
+            for n in names
+        ]},
+    }
+
+
+def _funding_summary(pc, rnd):
+    start = rnd.randint(2010, 2024)
+    return {
+        "put-code": pc,
+        "title": {"title": _value(f"Synthetic grant {pc}")},
+        "organization": {"name": f"Funding Agency {pc % 7}"},
+        "start-date": {"year": _value(str(start))},
+        "end-date": {"year": _value(str(start + rnd.randint(1, 5)))},
+        "last-modified-date": _value(_MODIFIED + pc),
+    }
+
+
+class Command(BaseCommand):
+    help = "Write sync_orcid replay fixtures for a synthetic profile of a given size."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Fixture directory (pass to sync_orcid --replay).")
+        parser.add_argument("--works", type=int, default=1000)
+        parser.add_argument("--fundings", type=int, default=50)
+        parser.add_argument("--orcid-id", default=SYNTHETIC_ORCID_ID)
+        parser.add_argument("--seed", type=int, default=1, help="Random seed (fixtures are deterministic).")
+
+    def handle(self, *args, **options):
+        if options["works"] < 0 or options["fundings"] < 0:
+            raise CommandError("--works and --fundings must be zero or more.")
+        root, orcid_id = options["directory"], options["orcid_id"]
+        rnd = random.Random(options["seed"])
+        base = f"{ORCID_API}/{orcid_id}"
+
+        # ── Works: summary list + bulk detail chunks (same order as sync_orcid) ──
+        codes = list(range(1, options["works"] + 1))
+        write_fixture(root, "GET", f"{base}/works", {
+            "group": [{"work-summary": [_work_summary(pc, rnd)]} for pc in codes],
+        })
+        for i in range(0, len(codes), BULK_MAX):
+            chunk = codes[i:i + BULK_MAX]
+            write_fixture(
+                root, "GET", f"{base}/works/{','.join(map(str, chunk))}",
+                {"bulk": [{"work": _work_detail(pc, rnd)} for pc in chunk]},
+            )
+
+        # ── Fundings: summary list + one detail per put-code ────────────────────
+        fundings = list(range(100_001, 100_001 + options["fundings"]))
+        write_fixture(root, "GET", f"{base}/fundings", {
+            "group": [{"funding-summary": [_funding_summary(pc, rnd)]} for pc in fundings],
+        })
+        for pc in fundings:
+            write_fixture(root, "GET", f"{base}/funding/{pc}", {
+                "amount": {"value": str(rnd.randint(10, 500) * 1000), "currency-code": "EUR"},
+                "description": f"Synthetic funding description {pc}.",
+            })
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote fixtures for {len(codes)} works and {len(fundings)} fundings → {root}\n"
+            f"  python manage.py sync_orcid --orcid-id {orcid_id} --full --replay {root}"
+        ))
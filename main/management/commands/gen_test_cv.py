@@ -4,10 +4,30 @@ Generate a test CV PDF with artificial data (no DB required).
 Usage:
     python manage.py gen_test_cv
     python manage.py gen_test_cv --output /tmp/cv_test.pdf
+
+Benchmark mode renders synthetic CVs at increasing scale (10/100/1,000
+publications, long experience histories, escape-heavy text) and writes wall
+time per stage, peak memory and .tex/PDF sizes for each scale to a JSON report,
+so template and escaping changes can be compared run to run:
+
+    python manage.py gen_test_cv --bench
+    python manage.py gen_test_cv --bench --scale pubs-1000 --report /tmp/cv_bench.json
+    python manage.py gen_test_cv --bench --no-pdf          # LaTeX render only
+    python manage.py gen_test_cv --bench --template resume_onepage.tex.j2
 """
+import json
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
 from types import SimpleNamespace
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from jinja2 import meta
 
 
 # ── Mock helpers ──────────────────────────────────────────────────────────────
@@ -43,11 +63,11 @@ def _lang(name, level_display):
     return _ns(name=name, get_level_display=lambda ld=level_display: ld)
 
 
-def _pub(title, authors, year, venue, pub_type="journal", doi="", cit=0):
+def _pub(title, authors, year, venue, pub_type="journal", doi="", cit=0, featured=False):
     display = authors.replace("Correia R", "<strong>Correia R</strong>", 1)
     return _ns(
         title=title, authors=authors, authors_display=display,
-        year=year, venue=venue,
+        year=year, venue=venue, pub_type=pub_type, featured=featured,
         doi=doi, link=f"https://doi.org/{doi}" if doi else "",
         citation_count=cit,
     )
@@ -241,6 +261,90 @@ PUB_GROUPS = [
 ]
 
 
+# ── Synthetic data for --bench ────────────────────────────────────────────────
+
+# Every character _latex_escape rewrites, plus non-ASCII that XeLaTeX must shape.
+_NASTY = r"R&D 100% $5 #1 snake_case {x} ~home ^caret C:\\path — Ångström ü"
+
+BENCH_SCALES = [
+    {"name": "pubs-10",      "pubs": 10,   "experiences": 5,  "bullets": 3, "escape_heavy": False},
+    {"name": "pubs-100",     "pubs": 100,  "experiences": 5,  "bullets": 3, "escape_heavy": False},
+    {"name": "pubs-1000",    "pubs": 1000, "experiences": 5,  "bullets": 3, "escape_heavy": False},
+    {"name": "long-history", "pubs": 10,   "experiences": 60, "bullets": 8, "escape_heavy": False},
+    {"name": "escape-heavy", "pubs": 100,  "experiences": 20, "bullets": 5, "escape_heavy": True},
+]
+
+_WORDS = (
+    "adaptive sparse genomic inference scalable neural protein variant pipeline "
+    "federated clinical graph bayesian sequence alignment metagenomic robust"
+).split()
+
+
+def _synthetic_context(pubs, experiences, bullets, escape_heavy, seed=0):
+    """Deterministic, variant-independent CV context of the requested size
+    (same shape as main.cv._resume_context; see _variant_context)."""
+    rng = random.Random(seed)
+
+    def text(n):
+        words = " ".join(rng.choice(_WORDS) for _ in range(n))
+        return f"{words} {_NASTY}" if escape_heavy else words
+
+    def authors():
+        names = [f"Author{rng.randrange(500)} {chr(65 + rng.randrange(26))}" for _ in range(rng.randrange(2, 12))]
+        names.insert(rng.randrange(len(names)), "Correia R")
+        if escape_heavy:
+            names.append("O'Brien_J & Co")
+        return ", ".join(names)
+
+    publications = [
+        _pub(
+            text(12), authors(), 2024 - i % 20, text(4),
+            pub_type=("journal", "conference", "preprint")[i % 3],
+            doi=f"10.5555/bench.{i}_{seed}" if i % 4 else "", cit=rng.randrange(200),
+            featured=i % 200 == 0,
+        )
+        for i in range(pubs)
+    ]
+
+    return {
+        "name":        "Jane Researcher",
+        "title":       text(4),
+        "email":       "jane@example.com",
+        "github":      "github.com/janeresearcher",
+        "linkedin":    "linkedin.com/in/janeresearcher",
+        "skills":      [_ns(name=s) for s in SKILLS],
+        "languages":   LANGUAGES,
+        "experiences": [
+            _exp(text(3), text(2), 2024 - i, 2025 - i, location=text(1), blurb=text(20),
+                 bullets=[text(18) for _ in range(bullets)])
+            for i in range(experiences)
+        ],
+        "educations":  EDUCATIONS,
+        "grants":      [_grant(text(6), text(3), "PI", "€10,000", 2020, 2023, desc=text(25)) for _ in range(5)],
+        "awards":      [_award(text(4), text(3), 2020, desc=text(10)) for _ in range(5)],
+        "publications": publications,
+    }
+
+
+def _escape_workload(ctx):
+    """Every string the template pushes through |e or |authors_latex."""
+    strings, authors = [], []
+    for group in ctx["pub_groups"]:
+        for p in group["pubs"]:
+            strings += [p.title, p.venue, p.doi]
+            authors.append(p.authors_display)
+    for x in ctx["experiences"]:
+        strings += [x.role, x.company, x.location, x.blurb] + [b.text for b in x.bullets.all()]
+    return strings, authors
+
+
+def _xelatex_version():
+    if not shutil.which("xelatex"):
+        return None
+    out = subprocess.run(["xelatex", "--version"], capture_output=True, text=True)
+    return (out.stdout.splitlines() or ["xelatex (unknown version)"])[0]
+
+
 # ── Command ───────────────────────────────────────────────────────────────────
 
 class Command(BaseCommand):
@@ -251,10 +355,33 @@ class Command(BaseCommand):
             "--output", default="test_cv.pdf",
             help="Output path for the generated PDF (default: test_cv.pdf)",
         )
+        parser.add_argument(
+            "--bench", action="store_true",
+            help="Run the synthetic-data benchmark suite instead of writing one PDF.",
+        )
+        parser.add_argument(
+            "--scale", action="append", choices=[s["name"] for s in BENCH_SCALES],
+            help="Benchmark scale to run (repeatable). Defaults to all scales.",
+        )
+        parser.add_argument(
+            "--report", default="cv_bench.json",
+            help="Output path for the benchmark JSON report (default: cv_bench.json)",
+        )
+        parser.add_argument(
+            "--template", default="resume.tex.j2",
+            help="LaTeX template to benchmark (default: resume.tex.j2)",
+        )
+        parser.add_argument(
+            "--no-pdf", action="store_true",
+            help="Benchmark the LaTeX render only; skip the XeLaTeX compile.",
+        )
 
     def handle(self, *args, **options):
         from main.cv_pdf import render_cv_pdf
 
+        if options["bench"]:
+            return self._bench(options)
+
         ctx = {
             "name":       "Jane Researcher",
             "title":      "Software Developer & Researcher",
@@ -281,3 +408,94 @@ class Command(BaseCommand):
             fh.write(pdf)
 
         self.stdout.write(self.style.SUCCESS(f"PDF written → {output}"))
+
+    def _bench(self, options):
+        from main.cv import CV_VARIANTS, DEFAULT_CV_VARIANT, _variant_context
+        from main.cv_pdf import (
+            _authors_to_latex, _get_env, _latex_escape, compile_cv_pdf, render_cv_tex,
+        )
+
+        compile_pdf = not options["no_pdf"]
+        xelatex = _xelatex_version()
+        if compile_pdf and not xelatex:
+            raise CommandError("xelatex not found; install TeX Live or pass --no-pdf.")
+
+        # Publications are filtered and grouped as for the variant that uses
+        # this template (e.g. only selected ones on the one-page summary).
+        variant = next(
+            (k for k, v in CV_VARIANTS.items() if v["template"] == options["template"]),
+            DEFAULT_CV_VARIANT,
+        )
+
+        # Compile the Jinja template (and any it extends or includes) up front
+        # so the first scale isn't charged for it.
+        start = time.perf_counter()
+        env = _get_env()
+        pending = [options["template"]]
+        while pending:
+            name = pending.pop()
+            env.get_template(name)
+            source = env.loader.get_source(env, name)[0]
+            pending += [t for t in meta.find_referenced_templates(env.parse(source)) if t]
+        template_load_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        wanted = options["scale"] or [s["name"] for s in BENCH_SCALES]
+        results = []
+        for scale in (s for s in BENCH_SCALES if s["name"] in wanted):
+            params = {k: v for k, v in scale.items() if k != "name"}
+            ctx = _variant_context(_synthetic_context(**params), variant)
+            wall, entry = {}, {"name": scale["name"], "params": params}
+
+            strings, authors = _escape_workload(ctx)
+            start = time.perf_counter()
+            for value in strings:
+                _latex_escape(value)
+            for value in authors:
+                _authors_to_latex(value)
+            wall["escape"] = round((time.perf_counter() - start) * 1000, 2)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            tex = render_cv_tex(ctx, template_name=options["template"])
+            wall["tex"] = round((time.perf_counter() - start) * 1000, 2)
+            entry["py_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+            entry["tex_bytes"] = len(tex.encode("utf-8"))
+
+            entry["pdf_bytes"] = None
+            if compile_pdf:
+                passes = {}
+                start = time.perf_counter()
+                try:
+                    entry["pdf_bytes"] = len(compile_cv_pdf(tex, timings=passes))
+                except RuntimeError as exc:
+                    entry["error"] = str(exc)[-2000:]
+                wall["pdf"] = round((time.perf_counter() - start) * 1000, 2)
+                wall.update(passes)
+
+            wall["total"] = round(sum(wall[k] for k in ("escape", "tex", "pdf") if k in wall), 2)
+            entry["wall_ms"] = wall
+            # High-water marks (KB on Linux): this process, and the largest
+            # XeLaTeX child so far. Monotonic, so run scales small → large.
+            entry["rss_peak_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            entry["xelatex_rss_peak_kb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            results.append(entry)
+
+            pdf = f"{entry['pdf_bytes'] / 1024:.0f} KB PDF" if entry["pdf_bytes"] else "no PDF"
+            self.stdout.write(
+                f"  {scale['name']:<14} {wall['total']:>10.1f} ms  "
+                f"{entry['tex_bytes'] / 1024:>8.0f} KB tex  {pdf}"
+            )
+
+        report = {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "xelatex": xelatex,
+            "template": options["template"],
+            "variant": variant,
+            "template_load_ms": template_load_ms,
+            "results": results,
+        }
+        with open(options["report"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Benchmark report written → {options['report']}"))
@@ -0,0 +1,42 @@
+"""
+Compute the inline blur-up placeholders (LQIP data URI + dominant colour)
+stored on each image.
+
+New uploads get theirs on save; this fills in images that predate the custom
+image model (or recomputes all of them after changing the placeholder format):
+
+    python manage.py image_placeholders          # only images without one
+    python manage.py image_placeholders --all    # recompute every image
+"""
+from django.core.management.base import BaseCommand
+from wagtail.images import get_image_model
+
+
+class Command(BaseCommand):
+    help = "Compute missing image placeholders (LQIP + dominant colour)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every image, not just missing ones.")
+
+    def handle(self, *args, **options):
+        images = get_image_model().objects.order_by("pk")
+        if not options["all"]:
+            images = images.filter(lqip="")
+
+        done = failed = 0
+        total_bytes = 0
+        for image in images.iterator():
+            image.update_placeholder()
+            # update(): no save signals, so the placeholder isn't recomputed.
+            type(image).objects.filter(pk=image.pk).update(
+                lqip=image.lqip, dominant_color=image.dominant_color,
+            )
+            if image.lqip:
+                done += 1
+                total_bytes += len(image.lqip)
+            else:
+                failed += 1
+                self.stderr.write(f"  no placeholder for image {image.pk} ({image.title})")
+
+        avg = f", avg {total_bytes // done} bytes inline" if done else ""
+        self.stdout.write(self.style.SUCCESS(f"Placeholders: {done} computed{avg}, {failed} unreadable."))
@@ -0,0 +1,75 @@
+"""
+Report how many bytes the WebP/AVIF rendition variants save over the fallback.
+
+Renders (or reuses) each image's API renditions and their format variants, then
+prints the total size per format and the saving against the fallback:
+
+    python manage.py image_savings                   # every image, API specs
+    python manage.py image_savings --limit 50        # a sample of 50 images
+    python manage.py image_savings --spec width-800  # other rendition specs
+"""
+from django.core.management.base import BaseCommand, CommandError
+from wagtail.images import get_image_model
+
+from cms.images import MIME_TYPES, rendition_set, variant_formats
+
+DEFAULT_SPECS = ["width-1600", "fill-600x400"]
+
+
+def _size(rendition):
+    try:
+        return rendition.file.size
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = "Compare fallback vs WebP/AVIF rendition sizes across images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spec", action="append", help=f"Rendition spec (repeatable; default {DEFAULT_SPECS}).")
+        parser.add_argument("--limit", type=int, default=0, help="Only the first N images (0 = all).")
+
+    def handle(self, *args, **options):
+        formats = variant_formats()
+        if not formats:
+            raise CommandError("This Pillow build cannot write WebP or AVIF.")
+        specs = options["spec"] or DEFAULT_SPECS
+        images = get_image_model().objects.order_by("pk")
+        if options["limit"]:
+            images = images[:options["limit"]]
+
+        totals = {fmt: 0 for fmt in ("fallback", *formats)}
+        counted = skipped = 0
+        for image in images.iterator():
+            if image.is_svg():
+                continue
+            try:
+                renditions = rendition_set(image, *specs)
+            except Exception as exc:  # missing/corrupt source file
+                self.stderr.write(f"  skip image {image.pk} ({image.title}): {exc}")
+                skipped += 1
+                continue
+            for fallback, variants in renditions.values():
+                sizes = [_size(fallback)] + [_size(r) for _, r in variants]
+                if None in sizes:
+                    skipped += 1
+                    continue
+                totals["fallback"] += sizes[0]
+                for (fmt, _), size in zip(variants, sizes[1:]):
+                    totals[fmt] += size
+                counted += 1
+
+        if not counted:
+            self.stdout.write("No renditions to compare.")
+            return
+        base = totals["fallback"]
+        self.stdout.write(f"{counted} rendition(s) over specs {', '.join(specs)}; {skipped} skipped")
+        self.stdout.write(f"  {'fallback':<12} {base / 1024:>10.1f} KiB")
+        for fmt in formats:
+            saved = base - totals[fmt]
+            self.stdout.write(
+                f"  {MIME_TYPES[fmt]:<12} {totals[fmt] / 1024:>10.1f} KiB"
+                f"  ({saved / 1024:+.1f} KiB saved, {saved / base:.0%})"
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
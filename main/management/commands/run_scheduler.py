@@ -0,0 +1,86 @@
+"""
+Run the periodic jobs declared in main.scheduler.JOBS (CV refresh, ORCID and
+citation syncs, GitHub stats warm-up) in a long-running process, so none of
+that work happens inside web requests.
+
+Usage:
+    python manage.py run_scheduler                    # run forever (SIGTERM to stop)
+    python manage.py run_scheduler --list             # jobs, next due, recent runs
+    python manage.py run_scheduler --once             # run whatever is due, then exit
+    python manage.py run_scheduler --once --force --job gen_cv   # run one job now
+
+Several replicas may run at once: per-job leases make sure each job runs on
+only one of them at a time.
+"""
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from main.models import ScheduledJobRun
+from main.scheduler import Scheduler, configured_jobs, last_started
+
+
+class Command(BaseCommand):
+    help = "Run the periodic job scheduler (CV, ORCID/citation syncs, cache warm-up)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--job", action="append", metavar="NAME",
+            help="Only schedule this job (repeatable). Defaults to all jobs.",
+        )
+        parser.add_argument("--list", action="store_true", help="Show jobs and recent runs, then exit.")
+        parser.add_argument("--once", action="store_true", help="Run due jobs once, wait for them, exit.")
+        parser.add_argument("--force", action="store_true", help="With --once: run jobs even if not due.")
+        parser.add_argument("--tick", type=int, default=30, help="Max seconds between checks (default 30).")
+        parser.add_argument(
+            "--grace", type=int, default=None,
+            help="On shutdown, wait at most this many seconds for running jobs (default: no limit).",
+        )
+
+    def handle(self, *args, **options):
+        jobs = configured_jobs()
+        if options["job"]:
+            unknown = set(options["job"]) - {j.name for j in jobs}
+            if unknown:
+                raise CommandError(
+                    f"Unknown job(s): {', '.join(sorted(unknown))}. "
+                    f"Known: {', '.join(j.name for j in jobs)}."
+                )
+            jobs = [j for j in jobs if j.name in options["job"]]
+        if options["tick"] < 1:
+            raise CommandError("--tick must be at least 1.")
+
+        if options["list"]:
+            self._list(jobs)
+            return
+
+        scheduler = Scheduler(jobs, tick=options["tick"], stdout=self.stdout)
+        if options["once"]:
+            scheduler.run_pending(force=options["force"])
+            scheduler.wait()
+            return
+
+        def stop(signum, frame):
+            scheduler.stop.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        scheduler.run_forever(grace=options["grace"])
+
+    def _list(self, jobs):
+        now = timezone.now()
+        for job in jobs:
+            last = last_started(job.name)
+            due = (last + job.interval) if last else now
+            state = "enabled" if job.is_enabled() else "disabled"
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{job.name}  every {job.interval} (+≤{job.jitter} jitter), {state}, "
+                f"next due {'now' if due <= now else timezone.localtime(due).strftime('%Y-%m-%d %H:%M')}"
+            ))
+            for run in ScheduledJobRun.objects.filter(job=job.name)[:5]:
+                took = f"{run.duration_ms} ms" if run.duration_ms is not None else "…"
+                line = f"  {timezone.localtime(run.started_at):%Y-%m-%d %H:%M:%S}  {run.status:<8} {took}"
+                if run.error:
+                    line += f"  {run.error.splitlines()[-1][:80]}"
+                self.stdout.write(line)
@@ -0,0 +1,78 @@
+"""
+Run background tasks from the database-backed queue (main.taskqueue).
+
+Usage:
+    python manage.py run_worker                 # work forever (SIGTERM to stop)
+    python manage.py run_worker --once          # drain the queue, then exit
+    python manage.py run_worker --max-tasks 100 # exit after 100 tasks (recycle)
+    python manage.py run_worker --status        # queued / running / failed counts
+
+Run as many workers as needed; SKIP LOCKED keeps them from contending for the
+same task.
+"""
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from main import taskqueue
+from main.models import Task
+
+HOUSEKEEPING_EVERY = 60  # seconds between lease reaping / pruning passes
+
+
+class Command(BaseCommand):
+    help = "Run background tasks from the database queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when no task is runnable.")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds to wait when idle (default 2).")
+        parser.add_argument("--max-tasks", type=int, default=0, help="Exit after this many tasks (0 = no limit).")
+        parser.add_argument("--status", action="store_true", help="Print queue counts and exit.")
+
+    def handle(self, *args, **options):
+        if options["poll"] <= 0:
+            raise CommandError("--poll must be positive.")
+        if options["status"]:
+            counts = dict(Task.objects.values_list("status").annotate(n=Count("id")))
+            for status, label in Task.STATUS_CHOICES:
+                self.stdout.write(f"{label:<8} {counts.get(status, 0)}")
+            return
+
+        taskqueue.autodiscover()
+        worker = taskqueue.worker_id()
+        stop = threading.Event()
+        if not options["once"]:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, lambda signum, frame: stop.set())
+
+        self.stdout.write(f"Worker {worker}: {', '.join(sorted(taskqueue.REGISTRY))}")
+        done = failed = 0
+        housekeeping = 0.0
+        while not stop.is_set():
+            if time.monotonic() - housekeeping > HOUSEKEEPING_EVERY:
+                housekeeping = time.monotonic()
+                reaped, pruned = taskqueue.reap_expired(), taskqueue.prune()
+                if reaped or pruned:
+                    self.stdout.write(f"Re-queued {reaped} expired task(s), pruned {pruned} old task(s).")
+
+            t = taskqueue.run_next(worker)
+            if t is None:
+                if options["once"]:
+                    break
+                stop.wait(options["poll"])
+                continue
+
+            ok = t.status == "done"
+            done, failed = done + ok, failed + (not ok)
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(
+                f"[{t.name} #{t.pk}] {t.status if t.status != 'queued' else 'retry scheduled'}"
+                f" in {t.duration_ms} ms (attempt {t.attempts}/{t.max_attempts})"
+            ))
+            if options["max_tasks"] and done + failed >= options["max_tasks"]:
+                break
+
+        self.stdout.write(f"Worker {worker} stopping: {done} done, {failed} failed.")
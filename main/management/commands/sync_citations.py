@@ -1,20 +1,55 @@
 """
 Sync citation counts from Semantic Scholar for all publications with a DOI.
 
+DOIs are looked up through the batch endpoint, BATCH_SIZE per request, so a
+run takes a handful of requests whatever the size of the corpus. Only
+publications the refresh planner (main.citations) marks as due are fetched;
+every fetch is stored as a CitationSnapshot (with an empty count for DOIs
+Semantic Scholar does not know, which the planner then retries monthly) and
+the cached aggregate metrics (total, h-index, i10) are recomputed.
+
 Usage:
     python manage.py sync_citations
+    python manage.py sync_citations --all       # ignore the refresh planner
     python manage.py sync_citations --dry-run
+    python manage.py sync_citations --record fixtures/citations   # capture every API response
+    python manage.py sync_citations --replay fixtures/citations   # run offline from the capture
 """
-import time
 import logging
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from main.citations import due_publications, record_snapshots, refresh_citation_summary
 from main.models import Publication
+from main.sync import Changeset
 
 logger = logging.getLogger(__name__)
 
-S2_API = "https://api.semanticscholar.org/graph/v1/paper/DOI:{doi}"
+S2_BATCH_API = "https://api.semanticscholar.org/graph/v1/paper/batch"
+BATCH_SIZE   = 500   # ids per batch request (Semantic Scholar maximum)
+
+
+def _fetch_batch(client, dois):
+    """
+    Citation counts for one chunk of DOIs as {doi: count}. DOIs Semantic
+    Scholar does not know are left out. Retries (exponential backoff on
+    429/5xx and network errors) are handled by the client's host policy.
+    """
+    headers = {}
+    if getattr(settings, "SEMANTIC_SCHOLAR_API_KEY", ""):
+        headers["x-api-key"] = settings.SEMANTIC_SCHOLAR_API_KEY
+    papers = client.post_json(
+        S2_BATCH_API, params={"fields": "citationCount"},
+        json={"ids": [f"DOI:{doi}" for doi in dois]}, headers=headers,
+    )
+    # Results come back in request order, null for unknown ids.
+    return {
+        doi: (paper.get("citationCount") or 0)
+        for doi, paper in zip(dois, papers)
+        if paper
+    }
 
 
 class Command(BaseCommand):
@@ -22,47 +57,85 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Fetch every publication with a DOI, not only those due for a refresh.",
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--record", metavar="DIR",
+            help="Also save every API response as a gzipped fixture in DIR.",
+        )
+        mode.add_argument(
+            "--replay", metavar="DIR",
+            help="Serve API responses only from fixtures in DIR (no network).",
+        )
 
     def handle(self, *args, **options):
         try:
-            import requests
+            from main.http_client import HttpClient
         except ImportError:
             raise CommandError("requests is required: pip install requests")
 
-        qs = Publication.objects.exclude(doi="")
-        self.stdout.write(f"{qs.count()} publication(s) with a DOI.")
-        dry_run = options["dry_run"]
-        updated = errors = 0
+        total = Publication.objects.exclude(doi="").count()
+        pubs  = list(Publication.objects.exclude(doi="")) if options["all"] else due_publications()
+        # DOI -> publications (the same DOI may be linked from several rows)
+        by_doi = {}
+        for pub in pubs:
+            by_doi.setdefault(pub.doi, []).append(pub)
+        self.stdout.write(
+            f"{len(pubs)} of {total} publication(s) with a DOI due for a refresh "
+            f"({len(by_doi)} distinct DOI(s))."
+        )
+        dry_run   = options["dry_run"]
+        changes   = Changeset(Publication)
+        snapshots = {}
+        errors    = 0
 
-        session = requests.Session()
-
-        for pub in qs:
-            url = S2_API.format(doi=pub.doi)
-            try:
-                resp = session.get(url, params={"fields": "citationCount"}, timeout=10)
-                if resp.status_code == 404:
-                    self.stderr.write(f"  not found  {pub.doi}")
+        dois = list(by_doi)
+        client = HttpClient(record_dir=options["record"], replay_dir=options["replay"])
+        with client:
+            for i in range(0, len(dois), BATCH_SIZE):
+                chunk = dois[i:i + BATCH_SIZE]
+                try:
+                    counts = _fetch_batch(client, chunk)
+                except Exception as exc:
+                    self.stderr.write(f"  error  batch of {len(chunk)} DOI(s): {exc}")
+                    errors += len(chunk)
                     continue
-                resp.raise_for_status()
-                count = resp.json().get("citationCount", 0) or 0
-            except Exception as exc:
-                self.stderr.write(f"  error  {pub.doi}: {exc}")
-                errors += 1
-                time.sleep(1)
-                continue
-
-            if dry_run:
-                self.stdout.write(f"  {pub.doi} → {count} citations")
-            else:
-                if pub.citation_count != count:
-                    pub.citation_count = count
-                    pub.save(update_fields=["citation_count"])
-                    self.stdout.write(f"  updated  {pub.doi} → {count}")
-                    updated += 1
-
-            time.sleep(0.35)  # ~3 req/s, well within the free tier limit
+
+                for doi in chunk:
+                    if doi not in counts:
+                        self.stderr.write(f"  not found  {doi}")
+                        for pub in by_doi[doi]:
+                            snapshots[pub] = None
+                        continue
+                    count = counts[doi]
+                    for pub in by_doi[doi]:
+                        snapshots[pub] = count
+                        old = pub.citation_count
+                        if changes.stage(pub, {"citation_count": count}):
+                            self.stdout.write(f"  changed  {doi}: {old} → {count}")
+
+        metrics = client.log_metrics()
+        if options["verbosity"] > 1:
+            for host, m in metrics.items():
+                self.stdout.write(
+                    f"{host}: {m['requests']} request(s), {m['retries']} retried, "
+                    f"{m['errors']} failed, avg {m['avg_ms']} ms"
+                )
 
         if dry_run:
-            self.stdout.write(self.style.WARNING("Dry run — nothing written."))
+            self.stdout.write(self.style.WARNING(f"Dry run — nothing written. {changes.summary()}."))
         else:
-            self.stdout.write(self.style.SUCCESS(f"Done — {updated} updated, {errors} error(s)."))
+            with transaction.atomic():
+                changes.apply()
+                record_snapshots(snapshots)
+            summary = refresh_citation_summary()
+            self.stdout.write(self.style.SUCCESS(
+                f"Done — {changes.summary()}, {len(snapshots)} snapshot(s), {errors} error(s)."
+            ))
+            self.stdout.write(
+                f"Citations: {summary['total']} total · h-index {summary['h_index']}"
+                f" · i10-index {summary['i10_index']}"
+            )
@@ -5,17 +5,24 @@ Usage:
     python manage.py sync_orcid
     python manage.py sync_orcid --orcid-id 0000-0000-0000-0000
     python manage.py sync_orcid --highlight-name "Correia R" --dry-run
-    python manage.py sync_orcid --no-authors   # skip per-work fetches, faster
+    python manage.py sync_orcid --no-authors   # skip work detail (bulk) fetches, faster
     python manage.py sync_orcid --skip-works   # only sync grants
     python manage.py sync_orcid --skip-grants  # only sync works
+    python manage.py sync_orcid --full         # reprocess items unchanged since the last sync
+    python manage.py sync_orcid --workers 8 --rate 12   # detail-fetch concurrency / req/s
+    python manage.py sync_orcid --record fixtures/orcid   # capture every API response
+    python manage.py sync_orcid --replay fixtures/orcid   # run offline from the capture
 """
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.utils import timezone
 
 from main.models import Publication, Grant
+from main.sync import Changeset
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +40,34 @@ WORK_TYPE_MAP = {
 }
 
 
-def _get(url, session):
-    resp = session.get(url, headers=HEADERS, timeout=15)
-    resp.raise_for_status()
-    return resp.json()
+# ORCID public API: 24 requests/s sustained, bursts of up to 40 (see
+# main.http_client.HOST_POLICIES). --rate lowers the sustained rate if needed.
+ORCID_RATE     = 20
+ORCID_WORKERS  = 8
+BULK_MAX       = 100   # put-codes per /works/{a,b,…} request (ORCID maximum)
+
+
+def _get(url, client):
+    return client.get_json(url, headers=HEADERS)
+
+
+def _fetch_all(urls, client, workers):
+    """GET every url in {key: url} concurrently. Returns {key: json or Exception}."""
+    def fetch(url):
+        try:
+            return _get(url, client)
+        except Exception as exc:
+            return exc
+
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        futures = {key: pool.submit(fetch, url) for key, url in urls.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def _host(url):
+    return urlsplit(url).netloc
 
 
 def _extract_doi(external_ids):
@@ -46,6 +77,31 @@ def _extract_doi(external_ids):
     return ""
 
 
+def _fetch_work_details(orcid_id, put_codes, client, workers):
+    """Work details via the bulk /works/{put-codes} endpoint, BULK_MAX per
+    request, chunks fetched concurrently. Returns {put_code: detail or Exception};
+    a put-code ORCID reports as an error (or omits) maps to an Exception."""
+    chunks = [put_codes[i:i + BULK_MAX] for i in range(0, len(put_codes), BULK_MAX)]
+    results = _fetch_all(
+        {i: f"{ORCID_API}/{orcid_id}/works/{','.join(chunk)}" for i, chunk in enumerate(chunks)},
+        client, workers,
+    )
+    details = {}
+    for i, chunk in enumerate(chunks):
+        data = results[i]
+        if isinstance(data, Exception):
+            details.update((pc, data) for pc in chunk)
+            continue
+        for item in data.get("bulk") or []:
+            work = item.get("work")
+            if work and work.get("put-code") is not None:
+                details[str(work["put-code"])] = work
+        for pc in chunk:
+            if pc not in details:
+                details[pc] = LookupError("not returned by the bulk endpoint")
+    return details
+
+
 def _extract_authors(work_detail):
     contributors = (work_detail.get("contributors", {}).get("contributor") or [])
     names = []
@@ -58,6 +114,12 @@ def _extract_authors(work_detail):
     return ", ".join(names)
 
 
+def _modified(summary):
+    """The summary's last-modified-date (ms since epoch), or None."""
+    val = (summary.get("last-modified-date") or {}).get("value")
+    return int(val) if val else None
+
+
 def _year(date_obj):
     if not date_obj:
         return None
@@ -79,14 +141,35 @@ class Command(BaseCommand):
             default=getattr(settings, "ORCID_HIGHLIGHT_NAME", ""),
             help="Author name string to bold in the CV (e.g. 'Correia R').",
         )
-        parser.add_argument("--no-authors",   action="store_true", help="Skip per-work author fetch.")
+        parser.add_argument("--no-authors",   action="store_true", help="Skip work detail (author) fetch.")
         parser.add_argument("--skip-works",   action="store_true", help="Skip works/publications sync.")
         parser.add_argument("--skip-grants",  action="store_true", help="Skip funding/grants sync.")
         parser.add_argument("--dry-run",      action="store_true", help="Print changes without writing.")
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Fetch and save every item, not only those modified since the last sync.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=ORCID_WORKERS,
+            help=f"Concurrent work/funding detail fetches (default {ORCID_WORKERS}).",
+        )
+        parser.add_argument(
+            "--rate", type=float, default=ORCID_RATE,
+            help=f"Max ORCID requests per second, shared by all workers (default {ORCID_RATE}).",
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--record", metavar="DIR",
+            help="Also save every API response as a gzipped fixture in DIR.",
+        )
+        mode.add_argument(
+            "--replay", metavar="DIR",
+            help="Serve API responses only from fixtures in DIR (no network).",
+        )
 
     def handle(self, *args, **options):
         try:
-            import requests
+            from main.http_client import HttpClient
         except ImportError:
             raise CommandError("requests is required: pip install requests")
 
@@ -96,40 +179,123 @@ class Command(BaseCommand):
                 "No ORCID iD supplied. Pass --orcid-id or set ORCID_ID in settings/env."
             )
 
-        session  = requests.Session()
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+        if options["rate"] <= 0:
+            raise CommandError("--rate must be positive.")
+
+        self.workers = options["workers"]
+        self.full    = options["full"]
         dry_run  = options["dry_run"]
 
-        if not options["skip_works"]:
-            self._sync_works(session, orcid_id, options, dry_run)
+        # One client (keep-alive pool sized for the workers, shared rate limit,
+        # retries) for both the works and fundings phases.
+        client = HttpClient(
+            pool_maxsize=self.workers,
+            record_dir=options["record"], replay_dir=options["replay"],
+        )
+        client.configure(_host(ORCID_API), rate=options["rate"])
+        with client:
+            if not options["skip_works"]:
+                self._sync_works(client, orcid_id, options, dry_run)
+
+            if not options["skip_grants"]:
+                self._sync_grants(client, orcid_id, dry_run)
+        self._report_http(client, options["verbosity"])
+
+    def _report_http(self, client, verbosity):
+        metrics = client.log_metrics()
+        if verbosity < 2:
+            return
+        for host, m in metrics.items():
+            self.stdout.write(
+                f"\n{host}: {m['requests']} request(s), {m['retries']} retried, "
+                f"{m['errors']} failed, avg {m['avg_ms']} ms, max {m['max_ms']} ms"
+            )
 
-        if not options["skip_grants"]:
-            self._sync_grants(session, orcid_id, dry_run)
+    # ── Incremental filter / write ───────────────────────────────────────────
+
+    def _existing(self, model):
+        """{put_code: row} for rows already linked to ORCID (first row wins)."""
+        rows = {}
+        for row in model.objects.exclude(orcid_put_code="").order_by("pk"):
+            rows.setdefault(row.orcid_put_code, row)
+        return rows
+
+    def _stage(self, changes, label, existing, put_code, values, when, dry_run):
+        row = existing.get(put_code)
+        if row is None:
+            values = {**values, "orcid_put_code": put_code}
+        result = changes.stage(row, values, touch={"orcid_synced_at": timezone.now()})
+        if dry_run and result:
+            action = "CREATE" if result == "create" else f"UPDATE {', '.join(result)}"
+            self.stdout.write(f"  [{label} {action}] {when} — {values['title'][:70]}")
+
+    def _finish(self, changes, label, dry_run):
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"  {label} dry run: {changes.summary()}."))
+        else:
+            changes.apply()
+            self.stdout.write(self.style.SUCCESS(f"  {label}: {changes.summary()}."))
+
+    def _changed(self, existing, entries, label, outdated=()):
+        """Drop entries whose last-modified-date matches the synced row's,
+        except those whose put code is in ``outdated`` (stored values that
+        must be rewritten whatever ORCID says)."""
+        if self.full:
+            return entries
+        synced = {pc: row.orcid_modified for pc, row in existing.items()
+                  if row.orcid_modified is not None and pc not in outdated}
+        changed = [
+            e for e in entries
+            if _modified(e[0]) is None or synced.get(e[1], -1) < _modified(e[0])
+        ]
+        if len(changed) < len(entries):
+            last = max((r.orcid_synced_at for r in existing.values() if r.orcid_synced_at), default=None)
+            since = f" since {timezone.localtime(last):%Y-%m-%d %H:%M}" if last else ""
+            self.stdout.write(f"  {len(entries) - len(changed)} {label} unchanged{since}.")
+        return changed
 
     # ── Works ────────────────────────────────────────────────────────────────
 
-    def _sync_works(self, session, orcid_id, options, dry_run):
+    def _sync_works(self, client, orcid_id, options, dry_run):
         highlight  = options["highlight_name"].strip()
         no_authors = options["no_authors"]
 
         self.stdout.write(f"\nFetching works for {orcid_id}…")
         try:
-            data = _get(f"{ORCID_API}/{orcid_id}/works", session)
+            data = _get(f"{ORCID_API}/{orcid_id}/works", client)
         except Exception as exc:
             self.stderr.write(f"Works API error: {exc}")
             return
 
-        groups  = data.get("group") or []
-        created = updated = skipped = 0
-
-        for group in groups:
+        entries = []
+        for group in data.get("group") or []:
             summaries = group.get("work-summary") or []
             if not summaries:
                 continue
             summary  = summaries[0]
             put_code = str(summary.get("put-code", ""))
             title    = ((summary.get("title") or {}).get("title") or {}).get("value", "").strip()
-            if not title or not put_code:
-                continue
+            if title and put_code:
+                entries.append((summary, put_code, title))
+        existing = self._existing(Publication)
+        # A new --highlight-name changes stored rows even when ORCID hasn't.
+        outdated = {pc for pc, row in existing.items() if row.highlight_name != highlight}
+        rehighlight = sum(1 for _, pc, _ in entries if pc in outdated)
+        if rehighlight and not self.full:
+            self.stdout.write(f"  {rehighlight} work(s) stored with another highlight name; re-syncing them.")
+        entries  = self._changed(existing, entries, "works", outdated)
+
+        details = {}
+        if not no_authors:
+            details = _fetch_work_details(
+                orcid_id, [pc for _, pc, _ in entries], client, self.workers,
+            )
+
+        changes = Changeset(Publication)
+
+        for summary, put_code, title in entries:
 
             pub_type = WORK_TYPE_MAP.get(summary.get("type", ""), "other")
             year     = _year(summary.get("publication-date"))
@@ -137,13 +303,14 @@ class Command(BaseCommand):
             doi      = _extract_doi(summary.get("external-ids"))
 
             authors = ""
-            if not no_authors:
-                try:
-                    detail  = _get(f"{ORCID_API}/{orcid_id}/work/{put_code}", session)
-                    authors = _extract_authors(detail)
-                    time.sleep(0.2)
-                except Exception as exc:
-                    self.stderr.write(f"  Could not fetch work {put_code}: {exc}")
+            detail  = details.get(put_code)
+            if isinstance(detail, Exception):
+                self.stderr.write(f"  Could not fetch work {put_code}: {detail}")
+            elif detail:
+                authors = _extract_authors(detail)
+            # Only a complete sync marks this version as done; otherwise the
+            # next run picks the work up again.
+            complete = not no_authors and not isinstance(detail, Exception)
 
             defaults = {
                 "title":          title,
@@ -155,71 +322,63 @@ class Command(BaseCommand):
             }
             if authors:
                 defaults["authors"] = authors
+            elif put_code not in existing:
+                defaults["authors"] = ""
+            if complete:
+                defaults["orcid_modified"] = _modified(summary)
 
-            existing = Publication.objects.filter(orcid_put_code=put_code).first()
-
-            if dry_run:
-                action = "UPDATE" if existing else "CREATE"
-                self.stdout.write(f"  [work {action}] {year} — {title[:70]}")
-                skipped += 1
-                continue
-
-            if existing:
-                for k, v in defaults.items():
-                    setattr(existing, k, v)
-                existing.save()
-                updated += 1
-            else:
-                defaults["orcid_put_code"] = put_code
-                defaults.setdefault("authors", "")
-                Publication.objects.create(**defaults)
-                created += 1
+            self._stage(changes, "work", existing, put_code, defaults, year, dry_run)
 
-        if dry_run:
-            self.stdout.write(self.style.WARNING(f"  Works dry run: {skipped} would be processed."))
-        else:
-            self.stdout.write(self.style.SUCCESS(f"  Works: {created} created, {updated} updated."))
+        self._finish(changes, "Works", dry_run)
 
     # ── Grants ───────────────────────────────────────────────────────────────
 
-    def _sync_grants(self, session, orcid_id, dry_run):
+    def _sync_grants(self, client, orcid_id, dry_run):
         self.stdout.write(f"\nFetching fundings for {orcid_id}…")
         try:
-            data = _get(f"{ORCID_API}/{orcid_id}/fundings", session)
+            data = _get(f"{ORCID_API}/{orcid_id}/fundings", client)
         except Exception as exc:
             self.stderr.write(f"Fundings API error: {exc}")
             return
 
-        groups  = data.get("group") or []
-        created = updated = skipped = 0
-
-        for group in groups:
+        entries = []
+        for group in data.get("group") or []:
             summaries = group.get("funding-summary") or []
             if not summaries:
                 continue
             summary  = summaries[0]
             put_code = str(summary.get("put-code", ""))
             title    = ((summary.get("title") or {}).get("title") or {}).get("value", "").strip()
-            if not title or not put_code:
-                continue
+            if title and put_code:
+                entries.append((summary, put_code, title))
+        existing = self._existing(Grant)
+        entries  = self._changed(existing, entries, "fundings")
+
+        # Fetch full details (amount + description) concurrently
+        details = _fetch_all(
+            {pc: f"{ORCID_API}/{orcid_id}/funding/{pc}" for _, pc, _ in entries},
+            client, self.workers,
+        )
+
+        changes = Changeset(Grant)
+
+        for summary, put_code, title in entries:
 
             funder     = ((summary.get("organization") or {}).get("name") or "").strip()
             start_year = _year(summary.get("start-date"))
             end_year   = _year(summary.get("end-date"))
 
-            # Fetch full detail for amount + description
             amount = description = ""
-            try:
-                detail      = _get(f"{ORCID_API}/{orcid_id}/funding/{put_code}", session)
+            detail = details.get(put_code)
+            if isinstance(detail, Exception):
+                self.stderr.write(f"  Could not fetch funding {put_code}: {detail}")
+            elif detail:
                 amt_obj     = detail.get("amount") or {}
                 amt_val     = (amt_obj.get("value") or "").strip()
                 amt_cur     = (amt_obj.get("currency-code") or "").strip()
                 if amt_val:
                     amount = f"{amt_cur} {amt_val}".strip() if amt_cur else amt_val
                 description = (detail.get("description") or "").strip()
-                time.sleep(0.2)
-            except Exception as exc:
-                self.stderr.write(f"  Could not fetch funding {put_code}: {exc}")
 
             defaults = {
                 "title":       title,
@@ -229,26 +388,9 @@ class Command(BaseCommand):
                 "amount":      amount,
                 "description": description,
             }
+            if not isinstance(detail, Exception):
+                defaults["orcid_modified"] = _modified(summary)
 
-            existing = Grant.objects.filter(orcid_put_code=put_code).first()
-
-            if dry_run:
-                action = "UPDATE" if existing else "CREATE"
-                self.stdout.write(f"  [grant {action}] {start_year} — {title[:70]}")
-                skipped += 1
-                continue
-
-            if existing:
-                for k, v in defaults.items():
-                    setattr(existing, k, v)
-                existing.save()
-                updated += 1
-            else:
-                defaults["orcid_put_code"] = put_code
-                Grant.objects.create(**defaults)
-                created += 1
+            self._stage(changes, "grant", existing, put_code, defaults, start_year, dry_run)
 
-        if dry_run:
-            self.stdout.write(self.style.WARNING(f"  Grants dry run: {skipped} would be processed."))
-        else:
-            self.stdout.write(self.style.SUCCESS(f"  Grants: {created} created, {updated} updated."))
+        self._finish(changes, "Grants", dry_run)
@@ -21,11 +21,11 @@ IMAGE_KEYS = ["about_profile", "home_profile"]
 def _import_to_wagtail_image(asset):
     # Use the real Wagtail image model: its file field's upload_to needs
     # instance.get_upload_to(), which the historical migration model lacks.
-    from wagtail.images import get_image_model
+    # (The stock model, not get_image_model(): cms.CustomImage doesn't exist
+    # yet at this point; cms 0017 copies these rows into it.)
+    from wagtail.images.models import Image
     from wagtail.models import Collection
 
-    Image = get_image_model()
-
     try:
         asset.image.open("rb")
         data = asset.image.read()
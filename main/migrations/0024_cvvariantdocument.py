@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def adopt_existing_cv(apps, schema_editor):
+    """Reuse the existing SiteContent CV Document for the default 'full'
+    variant, so the first run after upgrading updates it in place."""
+    SiteContent = apps.get_model("main", "SiteContent")
+    CVVariantDocument = apps.get_model("main", "CVVariantDocument")
+    sc = SiteContent.objects.first()
+    if sc and sc.cv_document_id:
+        CVVariantDocument.objects.get_or_create(
+            variant="full",
+            defaults={"document_id": sc.cv_document_id, "generated_at": sc.cv_generated_at},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_sitecontent_uses_sitecontent_uses_intro'),
+        ('wagtaildocs', '0014_alter_document_file_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVVariantDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variant', models.CharField(max_length=40, unique=True)),
+                ('fingerprint', models.CharField(blank=True, max_length=64)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wagtaildocs.document')),
+            ],
+            options={
+                'verbose_name': 'CV variant document',
+                'verbose_name_plural': 'CV variant documents',
+                'ordering': ['variant'],
+            },
+        ),
+        migrations.RunPython(adopt_existing_cv, migrations.RunPython.noop),
+    ]
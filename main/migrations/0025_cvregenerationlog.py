@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0024_cvvariantdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVRegenerationLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('variants', models.CharField(blank=True, max_length=200)),
+                ('status', models.CharField(choices=[('ok', 'OK'), ('unchanged', 'Unchanged'), ('failed', 'Failed')], default='ok', max_length=12)),
+                ('total_ms', models.PositiveIntegerField(default=0)),
+                ('stages', models.JSONField(blank=True, default=dict)),
+                ('sizes', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'CV regeneration log',
+                'verbose_name_plural': 'CV regeneration logs',
+                'ordering': ['-started_at', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0025_cvregenerationlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='grant',
+            name='orcid_modified',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='ORCID last-modified-date (ms since epoch) of the synced version.', null=True),
+        ),
+        migrations.AddField(
+            model_name='grant',
+            name='orcid_synced_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='orcid_modified',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='ORCID last-modified-date (ms since epoch) of the synced version.', null=True),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='orcid_synced_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_orcid_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CitationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('semantic_scholar', 'Semantic Scholar')], default='semantic_scholar', max_length=40)),
+                ('count', models.PositiveIntegerField()),
+                ('fetched_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('publication', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='citation_snapshots', to='main.publication')),
+            ],
+            options={
+                'verbose_name': 'citation snapshot',
+                'verbose_name_plural': 'citation snapshots',
+                'ordering': ['-fetched_at', '-id'],
+                'indexes': [models.Index(fields=['publication', 'source', '-fetched_at'], name='main_citati_publica_c0fbba_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0017_copy_images_to_customimage'),
+        ('main', '0029_task'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sitecontent',
+            name='about_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cms.customimage'),
+        ),
+        migrations.AlterField(
+            model_name='sitecontent',
+            name='home_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cms.customimage'),
+        ),
+    ]
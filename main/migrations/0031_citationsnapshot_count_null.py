@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0030_sitecontent_customimage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='citationsnapshot',
+            name='count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,10 +1,12 @@
 # main/models.py
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.text import slugify
 
 import os, uuid
 from .validators import validate_image_file
+from .panels import CVRegenerationLogPanel
 
 from modelcluster.models import ClusterableModel
 from modelcluster.fields import ParentalKey
@@ -18,6 +20,7 @@ from wagtail.admin.panels import (
 )
 from wagtail.contrib.settings.models import BaseGenericSetting, register_setting
 from wagtail.fields import StreamField
+from wagtail.images import get_image_model_string
 
 
 class UsesItemBlock(blocks.StructBlock):
@@ -151,6 +154,11 @@ class Grant(models.Model):
     description    = models.TextField(blank=True)
     url            = models.URLField(blank=True)
     orcid_put_code = models.CharField(max_length=50, blank=True, db_index=True)
+    orcid_modified = models.BigIntegerField(
+        null=True, blank=True, editable=False,
+        help_text="ORCID last-modified-date (ms since epoch) of the synced version.",
+    )
+    orcid_synced_at = models.DateTimeField(null=True, blank=True, editable=False)
     order          = models.PositiveIntegerField(default=0)
 
     class Meta:
@@ -333,11 +341,11 @@ class SiteContent(BaseGenericSetting):
     cv_generated_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     about_profile = models.ForeignKey(
-        "wagtailimages.Image", null=True, blank=True,
+        get_image_model_string(), null=True, blank=True,
         on_delete=models.SET_NULL, related_name="+",
     )
     home_profile = models.ForeignKey(
-        "wagtailimages.Image", null=True, blank=True,
+        get_image_model_string(), null=True, blank=True,
         on_delete=models.SET_NULL, related_name="+",
     )
 
@@ -449,6 +457,7 @@ class SiteContent(BaseGenericSetting):
             ],
             heading="CV PDF",
         ),
+        CVRegenerationLogPanel(heading="Recent regenerations"),
     ]
 
     edit_handler = TabbedInterface(
@@ -466,6 +475,169 @@ class SiteContent(BaseGenericSetting):
         verbose_name = "Site content"
 
 
+class CVVariantDocument(models.Model):
+    """
+    Cached PDF for one named CV variant (see main.cv.CV_VARIANTS). The
+    fingerprint hashes the rendered LaTeX source + photo, so a variant whose
+    inputs have not changed is never re-rendered. The default variant's
+    Document is mirrored on SiteContent.cv_document.
+    """
+
+    variant      = models.CharField(max_length=40, unique=True)
+    document     = models.ForeignKey(
+        "wagtaildocs.Document", null=True, blank=True,
+        on_delete=models.SET_NULL, related_name="+",
+    )
+    fingerprint  = models.CharField(max_length=64, blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["variant"]
+        verbose_name = "CV variant document"
+        verbose_name_plural = "CV variant documents"
+
+    def __str__(self):
+        return self.variant
+
+
+class CVRegenerationLog(models.Model):
+    """
+    One CV regeneration run: per-stage timings (ms) and output sizes (bytes),
+    shown in the CV settings tab. Shared stages ("context", "photo") sit at
+    the top level of ``stages``; the rest are keyed by variant, e.g.
+    {"full": {"tex": 4, "xelatex_1": 1830, "xelatex_2": 1790, "save": 12}}.
+    """
+
+    KEEP = 50  # older rows are pruned on write
+
+    STATUS_CHOICES = [("ok", "OK"), ("unchanged", "Unchanged"), ("failed", "Failed")]
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    variants   = models.CharField(max_length=200, blank=True)
+    status     = models.CharField(max_length=12, choices=STATUS_CHOICES, default="ok")
+    total_ms   = models.PositiveIntegerField(default=0)
+    stages     = models.JSONField(default=dict, blank=True)
+    sizes      = models.JSONField(default=dict, blank=True)
+    error      = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-started_at", "-id"]
+        verbose_name = "CV regeneration log"
+        verbose_name_plural = "CV regeneration logs"
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} {self.variants} ({self.status})"
+
+    def stage_lines(self):
+        """Human-readable "scope: stage 12 ms · …" lines for the admin panel."""
+        shared = {k: v for k, v in self.stages.items() if not isinstance(v, dict)}
+        scopes = [("shared", shared, {k: v for k, v in self.sizes.items() if not isinstance(v, dict)})]
+        scopes += [
+            (k, v, self.sizes.get(k) or {})
+            for k, v in self.stages.items() if isinstance(v, dict)
+        ]
+        lines = []
+        for scope, stages, sizes in scopes:
+            parts = [f"{name} {ms} ms" for name, ms in stages.items()]
+            parts += [f"{name} size {n / 1024:.1f} KB" for name, n in sizes.items()]
+            if parts:
+                lines.append(f"{scope}: " + " · ".join(parts))
+        return lines
+
+
+class SchedulerLock(models.Model):
+    """
+    Lease on one scheduled job (see main.scheduler), so that several
+    `run_scheduler` replicas never run the same job at once. The holder renews
+    ``expires_at`` while the job runs; a crashed holder's lease simply expires.
+    """
+
+    job         = models.CharField(max_length=60, unique=True)
+    owner       = models.CharField(max_length=120, blank=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at  = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.job} ({self.owner or 'free'})"
+
+
+class ScheduledJobRun(models.Model):
+    """One run (or skipped run) of a scheduled job, with its duration."""
+
+    KEEP = 200  # rows kept per job; older ones are pruned on write
+
+    STATUS_CHOICES = [
+        ("running", "Running"), ("ok", "OK"), ("failed", "Failed"), ("skipped", "Skipped"),
+    ]
+
+    job         = models.CharField(max_length=60, db_index=True)
+    status      = models.CharField(max_length=10, choices=STATUS_CHOICES, default="running")
+    started_at  = models.DateTimeField(default=timezone.now, db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    host        = models.CharField(max_length=120, blank=True)
+    output      = models.TextField(blank=True)
+    error       = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-started_at", "-id"]
+        verbose_name = "scheduled job run"
+        verbose_name_plural = "scheduled job runs"
+
+    def __str__(self):
+        return f"{self.job} {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class Task(models.Model):
+    """
+    A unit of background work for `run_worker` (see main.taskqueue). Workers
+    claim queued tasks with SELECT … FOR UPDATE SKIP LOCKED, highest priority
+    first; failures are retried with backoff up to ``max_attempts``.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"), ("running", "Running"), ("done", "Done"), ("failed", "Failed"),
+    ]
+
+    name         = models.CharField(max_length=100, db_index=True)
+    kwargs       = models.JSONField(default=dict, blank=True)
+    priority     = models.SmallIntegerField(default=0, help_text="Higher runs first.")
+    status       = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    dedup_key    = models.CharField(
+        max_length=200, blank=True,
+        help_text="At most one queued task per key; enqueueing a duplicate returns the existing task.",
+    )
+    attempts     = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after    = models.DateTimeField(default=timezone.now)
+    locked_by    = models.CharField(max_length=120, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at   = models.DateTimeField(auto_now_add=True)
+    started_at   = models.DateTimeField(null=True, blank=True)
+    finished_at  = models.DateTimeField(null=True, blank=True)
+    last_error   = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["status", "-priority", "run_after"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedup_key"],
+                condition=models.Q(status="queued") & ~models.Q(dedup_key=""),
+                name="task_unique_queued_dedup_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def duration_ms(self):
+        if self.started_at and self.finished_at:
+            return round((self.finished_at - self.started_at).total_seconds() * 1000)
+        return None
+
+
 PUB_TYPE_CHOICES = [
     ("journal",      "Journal Article"),
     ("conference",   "Conference Paper"),
@@ -492,6 +664,11 @@ class Publication(models.Model):
     url            = models.URLField(blank=True)
     abstract       = models.TextField(blank=True)
     orcid_put_code = models.CharField(max_length=50, blank=True, db_index=True)
+    orcid_modified = models.BigIntegerField(
+        null=True, blank=True, editable=False,
+        help_text="ORCID last-modified-date (ms since epoch) of the synced version.",
+    )
+    orcid_synced_at = models.DateTimeField(null=True, blank=True, editable=False)
     citation_count = models.IntegerField(default=0)
     featured       = models.BooleanField(default=False)
     order          = models.PositiveIntegerField(default=0)
@@ -546,6 +723,35 @@ class Publication(models.Model):
     ]
 
 
+class CitationSnapshot(models.Model):
+    """
+    One citation count observed for a publication, written on every fetch by
+    `sync_citations`. The series drives the refresh planner (main.citations),
+    which revisits recent / fast-growing papers more often than stable ones.
+    Publication.citation_count mirrors the latest value. A fetch the source
+    had no record for is stored with an empty count, so the planner backs off.
+    """
+
+    SOURCE_CHOICES = [("semantic_scholar", "Semantic Scholar")]
+
+    publication = models.ForeignKey(
+        Publication, on_delete=models.CASCADE, related_name="citation_snapshots",
+    )
+    source      = models.CharField(max_length=40, choices=SOURCE_CHOICES, default="semantic_scholar")
+    count       = models.PositiveIntegerField(null=True, blank=True)  # None: DOI not found
+    fetched_at  = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["-fetched_at", "-id"]
+        indexes = [models.Index(fields=["publication", "source", "-fetched_at"])]
+        verbose_name = "citation snapshot"
+        verbose_name_plural = "citation snapshots"
+
+    def __str__(self):
+        count = "not found" if self.count is None else self.count
+        return f"{self.publication_id} {self.source} {count} @ {self.fetched_at:%Y-%m-%d}"
+
+
 class Skill(Timestamped):
     name = models.CharField(max_length=80)
     description = models.CharField(max_length=240, blank=True)
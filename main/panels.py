@@ -0,0 +1,20 @@
+# main/panels.py
+"""Custom Wagtail admin panels for the SiteContent settings tabs."""
+from wagtail.admin.panels import Panel
+
+
+class CVRegenerationLogPanel(Panel):
+    """Read-only table of the latest CV regeneration runs (stage timings and
+    output sizes), so slow stages and growing PDFs are visible at a glance."""
+
+    LIMIT = 10
+
+    class BoundPanel(Panel.BoundPanel):
+        template_name = "main/panels/cv_regeneration_log.html"
+
+        def get_context_data(self, parent_context=None):
+            from .models import CVRegenerationLog
+
+            context = super().get_context_data(parent_context)
+            context["logs"] = CVRegenerationLog.objects.all()[: self.panel.LIMIT]
+            return context
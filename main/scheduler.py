@@ -0,0 +1,290 @@
+"""
+In-process job scheduler for periodic work (`run_scheduler`).
+
+Jobs are declared in JOBS with an interval and a jitter; settings.SCHEDULER_JOBS
+can override either or disable a job:
+
+    SCHEDULER_JOBS = {"sync_orcid": {"interval": 12 * 3600}, "gen_cv": {"enabled": False}}
+
+Several scheduler replicas can run side by side. A job only runs while its
+replica holds the job's SchedulerLock lease, and the shared ScheduledJobRun
+history decides when a job is next due, so replicas agree on it. A job still
+running when it comes due again is recorded as skipped rather than started
+twice.
+"""
+import io
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScheduledJobRun, SchedulerLock
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)   # renewed every tick while a job runs
+OUTPUT_LIMIT = 8000            # chars of command output kept per run
+
+
+@dataclass(frozen=True)
+class Job:
+    name:     str
+    interval: timedelta
+    jitter:   timedelta = timedelta(0)
+    command:  tuple = ()       # management command + args, or …
+    func:     object = None    # … a callable taking no arguments
+    enabled:  object = True    # bool, or a callable evaluated at run time
+
+    def is_enabled(self):
+        return self.enabled() if callable(self.enabled) else bool(self.enabled)
+
+    def run(self):
+        """Run the job; returns its captured output."""
+        if self.func:
+            return self.func() or ""
+        out = io.StringIO()
+        call_command(*self.command, stdout=out, stderr=out)
+        return out.getvalue()
+
+
+def warm_github_stats():
+    """Refresh the cached GitHub stats before they expire, so site requests
+    never fetch them from GitHub themselves."""
+    from .api import github_stats
+    from .models import SiteContent
+
+    sc = SiteContent.objects.first()
+    username = sc.github_username if sc else ""
+    if not username:
+        return "No GitHub username configured."
+    data = github_stats(username, refresh=True)
+    return f"GitHub stats for {username}: {'refreshed' if data else 'fetch failed'}"
+
+
+JOBS = [
+    # gen_cv only recompiles variants that are stale and whose data changed.
+    Job("gen_cv", timedelta(hours=1), timedelta(minutes=5), command=("gen_cv",)),
+    Job(
+        "sync_orcid", timedelta(hours=24), timedelta(minutes=30), command=("sync_orcid",),
+        enabled=lambda: bool(getattr(settings, "ORCID_ID", "")),
+    ),
+    # The refresh planner decides which DOIs are actually due.
+    Job("sync_citations", timedelta(hours=6), timedelta(minutes=15), command=("sync_citations",)),
+    # Well inside the 1h GitHub stats cache TTL.
+    Job("github_stats", timedelta(minutes=45), timedelta(minutes=5), func=warm_github_stats),
+]
+
+
+def configured_jobs():
+    """JOBS with settings.SCHEDULER_JOBS overrides (seconds) applied."""
+    overrides = getattr(settings, "SCHEDULER_JOBS", {}) or {}
+    jobs = []
+    for job in JOBS:
+        o = overrides.get(job.name, {})
+        changes = {}
+        if "interval" in o:
+            changes["interval"] = timedelta(seconds=o["interval"])
+        if "jitter" in o:
+            changes["jitter"] = timedelta(seconds=o["jitter"])
+        if "enabled" in o:
+            changes["enabled"] = o["enabled"]
+        jobs.append(replace(job, **changes) if changes else job)
+    return jobs
+
+
+# ── Locks ────────────────────────────────────────────────────────────────────
+
+def acquire_lock(job, owner, lease=LEASE):
+    """Take (or renew) the job's lease. True if ``owner`` now holds it."""
+    now = timezone.now()
+    try:
+        SchedulerLock.objects.get_or_create(job=job, defaults={"expires_at": now})
+    except IntegrityError:
+        pass  # created concurrently by another replica
+    # A single conditional UPDATE: only one replica can win an expired lease.
+    return bool(
+        SchedulerLock.objects
+        .filter(job=job)
+        .filter(Q(expires_at__lte=now) | Q(owner=owner))
+        .update(owner=owner, acquired_at=now, expires_at=now + lease)
+    )
+
+
+def renew_lock(job, owner, lease=LEASE):
+    return bool(SchedulerLock.objects.filter(job=job, owner=owner).update(
+        expires_at=timezone.now() + lease,
+    ))
+
+
+def release_lock(job, owner):
+    SchedulerLock.objects.filter(job=job, owner=owner).update(owner="", expires_at=timezone.now())
+
+
+# ── History ──────────────────────────────────────────────────────────────────
+
+def last_started(job):
+    """Start time of the job's latest real (non-skipped) run, or None."""
+    return (
+        ScheduledJobRun.objects.filter(job=job).exclude(status="skipped")
+        .values_list("started_at", flat=True).first()
+    )
+
+
+def _prune(job):
+    stale = ScheduledJobRun.objects.filter(job=job).values_list("pk", flat=True)[ScheduledJobRun.KEEP:]
+    ScheduledJobRun.objects.filter(pk__in=list(stale)).delete()
+
+
+def _finish(run, status, output="", error=""):
+    run.status      = status
+    run.finished_at = timezone.now()
+    run.duration_ms = round((run.finished_at - run.started_at).total_seconds() * 1000)
+    run.output      = output[-OUTPUT_LIMIT:]
+    run.error       = error
+    run.save(update_fields=["status", "finished_at", "duration_ms", "output", "error"])
+
+
+class Scheduler:
+    def __init__(self, jobs=None, tick=30, stdout=None):
+        self.jobs    = jobs if jobs is not None else configured_jobs()
+        self.tick    = tick
+        self.stdout  = stdout
+        self.owner   = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.running = {}   # job name -> (thread, ScheduledJobRun)
+        self.next_due = {}
+        self.stop    = threading.Event()
+
+    def _say(self, msg):
+        if self.stdout:
+            self.stdout.write(msg)
+        else:
+            logger.info(msg)
+
+    def _jitter(self, job):
+        return timedelta(seconds=random.uniform(0, job.jitter.total_seconds()))
+
+    def _due_at(self, job, now):
+        last = last_started(job.name)
+        return (last + job.interval if last else now) + self._jitter(job)
+
+    # ── Running a job ────────────────────────────────────────────────────────
+
+    def _execute(self, job, run):
+        output, error, status = "", "", "ok"
+        try:
+            output = job.run()
+        except BaseException as exc:  # SystemExit from a command counts as a failure too
+            status, error = "failed", f"{type(exc).__name__}: {exc}"
+            logger.exception("Scheduled job %s failed", job.name)
+        finally:
+            try:
+                _finish(run, status, output, error)
+                self._say(f"[{job.name}] {status} in {run.duration_ms} ms")
+            finally:
+                connection.close()   # this thread's connection only
+
+    def _start(self, job, now, force=False):
+        if not acquire_lock(job.name, self.owner):
+            # Another replica holds it; look again after a short while.
+            self.next_due[job.name] = now + timedelta(seconds=60) + self._jitter(job)
+            return None
+        last = last_started(job.name)
+        if last and last + job.interval > now and not force:
+            # Another replica ran it since we last looked.
+            release_lock(job.name, self.owner)
+            self.next_due[job.name] = last + job.interval + self._jitter(job)
+            return None
+        # We hold the lease, so any "running" row for this job was orphaned by
+        # a replica that died mid-run.
+        ScheduledJobRun.objects.filter(job=job.name, status="running").update(
+            status="failed", finished_at=now, error="Interrupted (scheduler stopped or crashed).",
+        )
+        run = ScheduledJobRun.objects.create(job=job.name, host=self.owner, started_at=now)
+        _prune(job.name)
+        thread = threading.Thread(target=self._execute, args=(job, run), name=f"job-{job.name}", daemon=True)
+        self.running[job.name] = (thread, run)
+        self.next_due[job.name] = now + job.interval + self._jitter(job)
+        self._say(f"[{job.name}] started")
+        thread.start()
+        return run
+
+    def _skip(self, job, now):
+        ScheduledJobRun.objects.create(
+            job=job.name, status="skipped", host=self.owner, started_at=now, finished_at=now,
+            duration_ms=0, error="Previous run still in progress.",
+        )
+        _prune(job.name)
+        self.next_due[job.name] = now + job.interval + self._jitter(job)
+        self._say(f"[{job.name}] skipped: previous run still in progress")
+
+    def _reap(self):
+        for name, (thread, _) in list(self.running.items()):
+            if thread.is_alive():
+                renew_lock(name, self.owner)
+            else:
+                release_lock(name, self.owner)
+                del self.running[name]
+
+    # ── Loop ─────────────────────────────────────────────────────────────────
+
+    def run_pending(self, force=False):
+        """Start every enabled job that is due (all of them with ``force``).
+        Returns the runs started."""
+        close_old_connections()
+        now = timezone.now()
+        self._reap()
+        started = []
+        for job in self.jobs:
+            if job.name not in self.next_due:
+                self.next_due[job.name] = now if force else self._due_at(job, now)
+            if now < self.next_due[job.name]:
+                continue
+            if not job.is_enabled():
+                self.next_due[job.name] = now + job.interval
+                continue
+            if job.name in self.running:
+                self._skip(job, now)
+                continue
+            run = self._start(job, now, force)
+            if run:
+                started.append(run)
+        return started
+
+    def wait(self, timeout=None):
+        """Wait for running jobs to finish (and release their locks), renewing
+        the leases of those still running as the main loop does, so a long
+        job isn't taken over by another replica meanwhile."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        renew_every = LEASE.total_seconds() / 5
+        while self.running:
+            left = renew_every if deadline is None else min(renew_every, deadline - time.monotonic())
+            if left <= 0:
+                break
+            thread, _ = next(iter(self.running.values()))
+            thread.join(left)
+            self._reap()
+
+    def run_forever(self, grace=None):
+        self._say(f"Scheduler {self.owner}: " + ", ".join(
+            f"{j.name} every {j.interval}" for j in self.jobs if j.is_enabled()
+        ))
+        while not self.stop.is_set():
+            self.run_pending()
+            sleep = self.tick
+            if self.next_due:
+                until = (min(self.next_due.values()) - timezone.now()).total_seconds()
+                sleep = min(sleep, max(until, 1))
+            self.stop.wait(sleep)
+        self._say("Scheduler stopping; waiting for running jobs…")
+        self.wait(grace)
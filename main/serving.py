@@ -0,0 +1,193 @@
+"""
+Serving stored files (generated CVs, media) from Django without re-sending
+unchanged bytes.
+
+serve_stored_file answers conditional requests (If-None-Match) with 304,
+single byte-range requests with 206, and — when MEDIA_ACCEL_REDIRECT_PREFIX is
+set and the file lives on local disk — hands the transfer to nginx with
+X-Accel-Redirect so no gunicorn worker streams the body. nginx then handles
+Range itself; the cache headers set here are passed through unchanged. The
+same hand-off backs Wagtail's /documents/ view (this module is its
+SENDFILE_BACKEND) and the /media/ fallback (main.views.media).
+
+Renditions and documents are linked through content-hashed URLs
+(hashed_media_url, document_url) served with IMMUTABLE caching; a request for
+an outdated digest redirects to the current URL, so old links keep working.
+"""
+import hashlib
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+
+# For URLs that embed a content hash: the bytes behind them never change.
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Same, for files behind a view restriction: browsers only, never shared caches.
+IMMUTABLE_PRIVATE = "private, max-age=31536000, immutable"
+
+DIGEST_LENGTH = 12      # hex characters of a content hash embedded in a URL
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK = 64 * 1024
+
+
+def _byte_range(request, size, etag):
+    """(start, end) inclusive for a satisfiable single-range request, None to
+    send the whole file, or False if the range cannot be satisfied."""
+    header = request.META.get("HTTP_RANGE", "").strip()
+    if not header or request.method not in ("GET", "HEAD"):
+        return None
+    # If-Range: only honour the range when the client's copy is current.
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if if_range and if_range != etag:
+        return None
+    match = _RANGE_RE.match(header)
+    if not match:
+        # Multi-range or malformed: a full 200 response is always acceptable.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return False
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(fh, start, length):
+    try:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(_CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def accel_location(name):
+    """Internal nginx location for ``name`` (relative to MEDIA_ROOT), or None
+    when X-Accel-Redirect is off."""
+    prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    if not prefix:
+        return None
+    return prefix.rstrip("/") + "/" + quote(name.lstrip("/"))
+
+
+def _accel_location(field_file):
+    if not isinstance(field_file.storage, FileSystemStorage):
+        return None
+    return accel_location(field_file.name)
+
+
+def sendfile(request, filename, **kwargs):
+    """SENDFILE_BACKEND for wagtail.utils.sendfile (Wagtail's document view):
+    an empty response that has nginx send ``filename`` after Django's checks.
+    Files outside MEDIA_ROOT are streamed as before."""
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(filename)
+    location = accel_location(os.path.relpath(path, root)) if path.startswith(root + os.sep) else None
+    if not location:
+        from wagtail.utils.sendfile_streaming_backend import sendfile as stream
+
+        return stream(request, filename, **kwargs)
+    response = HttpResponse()
+    response["X-Accel-Redirect"] = location
+    return response
+
+
+def serve_stored_file(request, field_file, etag, content_type,
+                      filename=None, cache_control=IMMUTABLE, inline=True):
+    """
+    Respond with a stored file (a FieldFile, e.g. Document.file).
+
+    etag: strong, quoted validator derived from the content (e.g. its hash).
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        for k, v in headers.items():
+            not_modified[k] = v
+        return not_modified
+
+    if filename:
+        headers["Content-Disposition"] = content_disposition_header(not inline, filename)
+
+    accel = _accel_location(field_file)
+    if accel:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response["X-Accel-Redirect"] = accel
+        return response
+
+    size = field_file.size
+    headers["Accept-Ranges"] = "bytes"
+    byte_range = _byte_range(request, size, etag)
+    if byte_range is False:
+        headers["Content-Range"] = f"bytes */{size}"
+        return HttpResponse(status=416, headers=headers)
+
+    fh = field_file.storage.open(field_file.name, "rb")
+    if byte_range is None:
+        return FileResponse(
+            fh, content_type=content_type, headers=headers,
+            as_attachment=not inline, filename=filename or "",
+        )
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingHttpResponse(
+        _read_range(fh, start, length), status=206,
+        content_type=content_type, headers=headers,
+    )
+
+
+# ── Content-hashed URLs ──────────────────────────────────────────────────────
+
+def rendition_digest(rendition):
+    """Digest of a rendition's bytes, without reading them: renditions are a
+    pure function of the original (its file_hash), the filter spec and the
+    focal point. Empty when the original has no hash recorded."""
+    file_hash = rendition.image.file_hash
+    if not file_hash:
+        return ""
+    key = f"{file_hash}:{rendition.filter_spec}:{rendition.focal_point_key}"
+    return hashlib.sha1(key.encode()).hexdigest()[:DIGEST_LENGTH]
+
+
+def hashed_media_url(field_file, digest):
+    """/media/v/<digest>/<name> for a file on local storage (see
+    main.views.media_hashed); the plain URL when there is no digest or the
+    storage serves files itself."""
+    if not digest or not isinstance(field_file.storage, FileSystemStorage):
+        return field_file.url
+    return field_file.storage.url(f"v/{digest}/{field_file.name}")
+
+
+def document_filename(doc):
+    """The name a document was uploaded under: its file's name, unless upload
+    dedup stored it as an earlier upload's file (cms.models.DocumentUpload)."""
+    upload = getattr(doc, "upload", None)
+    return upload.filename if upload else doc.filename
+
+
+def document_url(doc):
+    """Content-hashed URL for a Wagtail document (main.views.document_hashed),
+    or doc.url when it has no file hash or documents are served directly
+    from storage."""
+    if not doc.file_hash or getattr(settings, "WAGTAILDOCS_SERVE_METHOD", None) == "direct":
+        return doc.url
+    return reverse("document-hashed", args=[doc.id, doc.file_hash[:DIGEST_LENGTH], document_filename(doc)])
@@ -0,0 +1,71 @@
+"""
+In-memory diffing and bulk writes for the external-data sync commands
+(sync_orcid, sync_citations).
+
+A command preloads the existing rows into a map (by put-code, DOI, …), stages
+each incoming item on a Changeset, and applies it once at the end: new rows
+with bulk_create, changed rows with bulk_update of only the fields that
+changed, all in one transaction. Rows with no changes are never written.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+BATCH_SIZE = 200
+
+
+class Changeset:
+    """Creates and per-field updates for one model, applied atomically."""
+
+    def __init__(self, model):
+        self.model     = model
+        self.creates   = []
+        self.updates   = defaultdict(list)   # frozenset of field names -> rows
+        self.fields    = Counter()           # field name -> rows changed
+        self.unchanged = 0
+
+    def stage(self, obj, values, touch=None):
+        """
+        Stage ``values`` for ``obj`` (an existing row, or None to create one).
+
+        ``touch`` holds bookkeeping values (e.g. a sync timestamp) that are
+        written along with a change but never count as one. Returns "create",
+        the list of changed field names, or [] when the row is unchanged.
+        """
+        touch = touch or {}
+        if obj is None:
+            self.creates.append(self.model(**values, **touch))
+            return "create"
+        changed = [f for f, v in values.items() if getattr(obj, f) != v]
+        if not changed:
+            self.unchanged += 1
+            return []
+        for f in changed:
+            setattr(obj, f, values[f])
+        for f, v in touch.items():
+            setattr(obj, f, v)
+        self.updates[frozenset(changed) | frozenset(touch)].append(obj)
+        self.fields.update(changed)
+        return changed
+
+    @property
+    def created(self):
+        return len(self.creates)
+
+    @property
+    def updated(self):
+        return sum(len(rows) for rows in self.updates.values())
+
+    def apply(self):
+        with transaction.atomic():
+            self.model.objects.bulk_create(self.creates, batch_size=BATCH_SIZE)
+            # One bulk_update per distinct set of changed fields, so unchanged
+            # columns are never rewritten.
+            for fields, rows in self.updates.items():
+                self.model.objects.bulk_update(rows, sorted(fields), batch_size=BATCH_SIZE)
+
+    def summary(self):
+        text = f"{self.created} created, {self.updated} updated, {self.unchanged} unchanged"
+        if self.fields:
+            text += " (" + ", ".join(f"{f} ×{n}" for f, n in sorted(self.fields.items())) + ")"
+        return text
@@ -0,0 +1,216 @@
+"""
+Lightweight background task queue on the existing database (no broker).
+
+Declare a task with the decorator, in a ``tasks`` module of any installed app
+(they are autodiscovered by `run_worker`):
+
+    @task("cv.regenerate", max_attempts=2)
+    def regenerate(variants=None): …
+
+    regenerate.enqueue(variants=["full"], dedup_key="cv:full", priority=5)
+
+Tasks are Task rows. Workers claim the next queued task with
+SELECT … FOR UPDATE SKIP LOCKED (highest priority first, then oldest), so
+any number of `run_worker` processes can share the queue without blocking
+each other. A claimed task holds a lease (``locked_until``), renewed while its
+handler runs; a worker that dies mid-task leaves it to be re-queued once the
+lease expires. Only the worker holding the lease records the outcome. Failures are
+retried with exponential backoff until ``max_attempts``, then marked failed.
+A ``dedup_key`` allows at most one queued task per key.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = timedelta(seconds=30)   # doubled after each failed attempt
+REGISTRY = {}
+
+
+def _timeout():
+    return timedelta(seconds=getattr(settings, "TASK_TIMEOUT", 1800))
+
+
+class _TaskFunction:
+    def __init__(self, func, name, max_attempts, priority):
+        self.func         = func
+        self.name         = name
+        self.max_attempts = max_attempts
+        self.priority     = priority
+        self.__doc__      = func.__doc__
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, dedup_key="", priority=None, delay=None, **kwargs):
+        return enqueue(
+            self.name, dedup_key=dedup_key, delay=delay,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts, **kwargs,
+        )
+
+
+def task(name, max_attempts=3, priority=0):
+    """Register a function as a task. Its kwargs must be JSON-serialisable."""
+    def decorator(func):
+        wrapped = _TaskFunction(func, name, max_attempts, priority)
+        REGISTRY[name] = wrapped
+        return wrapped
+    return decorator
+
+
+def autodiscover():
+    autodiscover_modules("tasks")
+
+
+def enqueue(name, dedup_key="", priority=0, delay=None, max_attempts=3, **kwargs):
+    """Queue a task (or return the already-queued task with the same dedup_key)."""
+    if dedup_key:
+        existing = Task.objects.filter(dedup_key=dedup_key, status="queued").first()
+        if existing:
+            return existing
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name, kwargs=kwargs, priority=priority, dedup_key=dedup_key,
+                max_attempts=max_attempts, run_after=timezone.now() + (delay or timedelta(0)),
+            )
+    except IntegrityError:
+        # Lost a race with another enqueue of the same key. That task may
+        # already have been claimed since; then queue this one after all.
+        existing = Task.objects.filter(dedup_key=dedup_key, status="queued").first()
+        if existing:
+            return existing
+        return enqueue(name, dedup_key, priority, delay, max_attempts, **kwargs)
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim(worker):
+    """Lock and return the next runnable task for ``worker``, or None."""
+    now = timezone.now()
+    with transaction.atomic():
+        t = (
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status="queued", run_after__lte=now)
+            .order_by("-priority", "run_after", "id")
+            .first()
+        )
+        if t is None:
+            return None
+        t.status       = "running"
+        t.attempts    += 1
+        t.locked_by    = worker
+        t.locked_until = now + _timeout()
+        t.started_at   = now
+        t.finished_at  = None
+        t.save(update_fields=[
+            "status", "attempts", "locked_by", "locked_until", "started_at", "finished_at",
+        ])
+    return t
+
+
+def _heartbeat(t, stop):
+    """Renew ``t``'s lease every third of TASK_TIMEOUT until ``stop`` is set."""
+    every = _timeout().total_seconds() / 3
+    try:
+        while not stop.wait(every):
+            Task.objects.filter(pk=t.pk, status="running", locked_by=t.locked_by).update(
+                locked_until=timezone.now() + _timeout(),
+            )
+    finally:
+        connection.close()   # this thread's connection only
+
+
+def execute(t):
+    """Run a claimed task and record the outcome. Returns True on success."""
+    func = REGISTRY.get(t.name)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(t, stop), name=f"lease-{t.pk}", daemon=True)
+    heartbeat.start()
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {t.name!r} (is its tasks module installed?)")
+        func(**t.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Task %s #%s failed (attempt %s/%s)", t.name, t.pk, t.attempts, t.max_attempts)
+        _fail(t, error)
+        return False
+    finally:
+        stop.set()
+        heartbeat.join()
+    t.status, t.finished_at, t.locked_until = "done", timezone.now(), None
+    t.last_error = ""
+    _settle(t, "status", "finished_at", "locked_until", "last_error")
+    return True
+
+
+def _settle(t, *fields):
+    """Write the outcome of ``t``'s current attempt, unless its lease was lost
+    (reaped and possibly running again elsewhere). True if written."""
+    written = Task.objects.filter(pk=t.pk, status="running", locked_by=t.locked_by).update(
+        **{f: getattr(t, f) for f in fields}
+    )
+    if not written:
+        logger.warning("Task %s #%s lost its lease; outcome of attempt %s dropped", t.name, t.pk, t.attempts)
+    return bool(written)
+
+
+def _fail(t, error):
+    now = timezone.now()
+    t.finished_at, t.locked_until, t.last_error = now, None, error[-8000:]
+    fields = ("status", "finished_at", "locked_until", "last_error", "run_after")
+    if t.attempts < t.max_attempts:
+        t.status    = "queued"
+        t.run_after = now + RETRY_DELAY * 2 ** (t.attempts - 1)
+        try:
+            with transaction.atomic():
+                return _settle(t, *fields)
+        except IntegrityError:
+            pass  # a newer task with the same dedup_key is queued; it supersedes this retry
+    t.status = "failed"
+    return _settle(t, *fields)
+
+
+def reap_expired():
+    """Treat running tasks whose lease expired (worker died) as failed attempts."""
+    reaped = 0
+    with transaction.atomic():
+        expired = Task.objects.select_for_update(skip_locked=True).filter(
+            status="running", locked_until__lt=timezone.now(),
+        )
+        for t in expired:
+            _fail(t, f"Lease expired while running on {t.locked_by} (worker stopped or timed out).")
+            reaped += 1
+    return reaped
+
+
+def prune(days=None):
+    """Delete finished (done) tasks older than settings.TASK_RETENTION_DAYS."""
+    days = days if days is not None else getattr(settings, "TASK_RETENTION_DAYS", 7)
+    cutoff = timezone.now() - timedelta(days=days)
+    return Task.objects.filter(status="done", finished_at__lt=cutoff).delete()[0]
+
+
+def run_next(worker):
+    """Claim and execute one task. Returns the task, or None if the queue is idle."""
+    close_old_connections()
+    t = claim(worker)
+    if t is not None:
+        execute(t)
+    return t
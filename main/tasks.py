@@ -0,0 +1,20 @@
+"""
+Background tasks for `run_worker` (see main.taskqueue).
+"""
+from django.core.management import call_command
+
+from .taskqueue import task
+
+
+@task("cv.regenerate", max_attempts=2, priority=5)
+def regenerate_cv(variants=None):
+    """Re-render CV variants (default: all) into their Documents."""
+    from .cv import regenerate_cv_documents
+
+    regenerate_cv_documents(variants=variants)
+
+
+@task("command.run")
+def run_command(command, args=()):
+    """Run a management command, e.g. enqueue(command="sync_orcid", args=["--full"])."""
+    call_command(command, *args)
@@ -1,3 +1,62 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import time
+import unittest
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+from wagtail.images import get_image_model
+
+from .cv import _resume_context, _stage_profile_photo, _variant_context
+from .models import SiteContent
+
+
+def _camera_jpeg(size=(4000, 3000)):
+    """A large, noisy JPEG (noise keeps it from compressing to nothing)."""
+    buf = io.BytesIO()
+    PILImage.effect_noise(size, 64).convert("RGB").save(buf, "JPEG", quality=80)
+    return buf.getvalue()
+
+
+class CVPhotoTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+        original = _camera_jpeg()
+        image = get_image_model()(
+            title="profile", file=SimpleUploadedFile("profile.jpg", original, "image/jpeg"),
+        )
+        image.save()
+        self.original_size = len(original)
+        self.sc = SiteContent.objects.create(home_profile=image)
+
+    def test_staged_photo_is_bounded(self):
+        path, digest = _stage_profile_photo(self.sc, self.workdir)
+        self.assertTrue(path)
+        self.assertEqual(len(digest), 64)
+        with open(path, "rb") as f:
+            size = len(f.read())
+        with PILImage.open(path) as photo:
+            self.assertEqual(photo.format, "JPEG")
+            self.assertLessEqual(max(photo.size), 600)
+        self.assertLess(size, 200 * 1024)
+        self.assertLess(size, self.original_size / 10)
+
+    @unittest.skipUnless(shutil.which("xelatex"), "xelatex is not installed")
+    def test_pdf_size_and_render_time(self):
+        from .cv_pdf import render_cv_pdf
+
+        path, _ = _stage_profile_photo(self.sc, self.workdir)
+        context = _variant_context(_resume_context(self.sc), "full")
+        start = time.perf_counter()
+        pdf = render_cv_pdf(context, profile_image_path=path)
+        elapsed = time.perf_counter() - start
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertLess(len(pdf), 500 * 1024)
+        self.assertLess(elapsed, 30)
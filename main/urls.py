@@ -1,6 +1,4 @@
-from django.conf import settings
 from django.urls import path
-from django.conf.urls.static import static
 from main import views
 
 urlpatterns = [
@@ -12,6 +10,20 @@ urlpatterns = [
     # slashes when forwarding), so matching it directly avoids an APPEND_SLASH
     # redirect loop.
     path("resume/pdf", views.resume_pdf),
+    # Named CV variants (main.cv.CV_VARIANTS), e.g. /resume/pdf/onepage
+    path("resume/pdf/<slug:variant>/", views.resume_pdf, name="resume-pdf-variant"),
+    path("resume/pdf/<slug:variant>", views.resume_pdf),
+    # Content-hashed, immutable URL the routes above redirect to.
+    path(
+        "resume/pdf/<slug:variant>/<str:digest>.pdf",
+        views.resume_pdf_hashed, name="resume-pdf-hashed",
+    ),
+    # Content-hashed rendition and document URLs (main.serving): immutable,
+    # and an outdated digest redirects to the current one. Listed before the
+    # media route (main.views.media, portfolio/urls.py) and Wagtail's /documents/<id>/<filename>.
+    path("media/v/<str:digest>/<path:name>", views.media_hashed, name="media-hashed"),
+    path(
+        "documents/<int:document_id>/<str:digest>/<str:filename>",
+        views.document_hashed, name="document-hashed",
+    ),
 ]
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,40 +1,233 @@
-from PIL import Image, UnidentifiedImageError
+import hashlib
+import io
+import os
+
+from PIL import Image, ImageOps, ImageSequence, UnidentifiedImageError
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
 
 # maximum upload size in megabytes
 MAX_IMAGE_UPLOAD_MB = 10
 
+_CHUNK = 64 * 1024
+
+
+def _max_pixels():
+    return getattr(settings, "IMAGE_MAX_PIXELS", 40_000_000)
+
+
+def hash_upload(file, max_mb, label="File"):
+    """Read an upload once, chunk by chunk, for its size and SHA-1 (the digest
+    Wagtail stores as ``file_hash``). Raises ``ValidationError`` as soon as it
+    passes ``max_mb``, whatever size the client claimed."""
+    limit = max_mb * 1024 * 1024
+    sha1 = hashlib.sha1()
+    size = 0
+    file.seek(0)
+    try:
+        chunks = file.chunks(_CHUNK) if hasattr(file, "chunks") else iter(lambda: file.read(_CHUNK), b"")
+        for chunk in chunks:
+            size += len(chunk)
+            if size > limit:
+                raise ValidationError(f"{label} too large (max {max_mb} MB).")
+            sha1.update(chunk)
+    finally:
+        file.seek(0)
+    return sha1.hexdigest()
+
+
+# Upload validation reads at most this much of the file: enough for the
+# headers Pillow needs (JPEG markers with EXIF/ICC/XMP ahead of the frame
+# header, PNG chunks before IDAT). The full decode happens later, in the
+# background (decode_image_file and normalise_image_file, run by
+# cms.tasks.verify_image).
+HEADER_BYTES = 1024 * 1024
+MAX_IMAGE_FRAMES = 300
+
+PENDING_DIR = "pending"         # storage prefix for uploads not yet decoded and normalised
+QUARANTINE_DIR = "quarantine"   # storage prefix for originals that failed to decode
+PRIVATE_MEDIA_DIRS = (PENDING_DIR, QUARANTINE_DIR)   # never served under /media/
+
+# Leading bytes of each accepted format, checked against what Pillow reports
+# so a file can't pass as one format while holding another.
+_MAGIC = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+)
+# Camera JPEGs with embedded previews open as MPO.
+_SAME_FORMAT = {"MPO": "JPEG"}
+
+
+def _sniff_format(head):
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "AVIF"
+    return None
+
 
 def validate_image_file(file):
     """Validate uploaded images:
     - enforce a maximum file size
     - check provided content_type if available
-    - verify actual image bytes with Pillow
-    Raises ``ValidationError`` on failure.
+    - check the image header (check_image_header)
+    Raises ``ValidationError`` on failure; returns the upload's SHA-1.
     """
     if not file:
-        return
+        return None
 
-    # size check
-    try:
-        size = file.size
-    except Exception:
-        size = None
-    if size and size > MAX_IMAGE_UPLOAD_MB * 1024 * 1024:
-        raise ValidationError(f"Image file too large (max {MAX_IMAGE_UPLOAD_MB} MB).")
+    # size check, hashing in the same pass (the digest drives upload dedup)
+    digest = hash_upload(file, MAX_IMAGE_UPLOAD_MB, "Image file")
 
     # basic content-type hint check (some uploaders provide this)
     content_type = getattr(file, "content_type", "")
     if content_type and not content_type.startswith("image/"):
         raise ValidationError("Uploaded file does not appear to be an image.")
 
-    # verify image can be opened by Pillow
+    check_image_header(file)
+    return digest
+
+
+def check_image_header(file):
+    """Check an image from its first HEADER_BYTES only:
+    - the magic bytes match the format Pillow reads from the header
+    - reject decompression bombs (more than settings.IMAGE_MAX_PIXELS pixels,
+      more than MAX_IMAGE_FRAMES frames)
+    Pixel data is decoded later, by decode_image_file. Raises
+    ``ValidationError`` on failure.
+    """
+    file.seek(0)
     try:
-        # Pillow can fail if file is a non-image with an image extension
-        img = Image.open(file)
-        img.verify()
+        head = file.read(HEADER_BYTES)
+    finally:
+        file.seek(0)
+    fmt = _sniff_format(head)
+    if fmt is None:
+        raise ValidationError("Uploaded file is not a valid image.")
+
+    # parse the header from the prefix only
+    try:
+        img = Image.open(io.BytesIO(head))
+        width, height = img.size
+        try:
+            # GIF counts frames by walking them, so past the prefix this is
+            # a lower bound; the background decode checks the real count.
+            frames = getattr(img, "n_frames", 1)
+        except (EOFError, OSError, SyntaxError):
+            frames = 1
     except UnidentifiedImageError:
         raise ValidationError("Uploaded file is not a valid image.")
     except Exception:
         # Any other errors are treated as invalid image
+        # (including Pillow's own DecompressionBombError)
         raise ValidationError("Uploaded file could not be validated as an image.")
+
+    if _SAME_FORMAT.get(img.format, img.format) != fmt:
+        raise ValidationError("Uploaded file's contents don't match its image format.")
+    if width * height > _max_pixels():
+        raise ValidationError(
+            f"Image is too large ({width}×{height} px; max {_max_pixels() / 1e6:g} megapixels)."
+        )
+    if frames > MAX_IMAGE_FRAMES:
+        raise ValidationError(f"Image has too many frames ({frames}; max {MAX_IMAGE_FRAMES}).")
+
+
+def decode_image_file(file):
+    """Fully decode an image, every frame: the check upload validation leaves
+    out. Raises ``ValidationError`` if the pixel data is corrupt or truncated."""
+    file.seek(0)
+    try:
+        img = Image.open(file)
+        img.verify()
+        file.seek(0)
+        img = Image.open(file)
+        for index, frame in enumerate(ImageSequence.Iterator(img)):
+            if index >= MAX_IMAGE_FRAMES:
+                raise ValidationError(f"Image has too many frames (max {MAX_IMAGE_FRAMES}).")
+            frame.load()
+    except ValidationError:
+        raise
+    except Exception as exc:
+        raise ValidationError(f"Image could not be decoded ({type(exc).__name__}: {exc}).")
+    finally:
+        file.seek(0)
+
+
+# ── Normalisation ────────────────────────────────────────────────────────────
+
+# Formats re-encoded in place; anything else raster and still-image is
+# converted (JPEG, or PNG when it has transparency). GIF (animation) and
+# formats Pillow cannot write are stored untouched.
+_KEEP_FORMAT = {"JPEG", "PNG", "WEBP"}
+_CONVERT = {"BMP", "TIFF", "PPM", "TGA"}
+_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def normalise_image_file(file, name=""):
+    """Prepare an uploaded original for storage: apply the EXIF orientation,
+    drop metadata (EXIF/GPS, XMP, comments; the ICC profile is kept so colours
+    don't shift), cap the longest side at settings.IMAGE_MAX_DIMENSION and
+    re-encode compactly.
+
+    Returns a ContentFile to store instead, or None when the file is already
+    fine as it is (or is a format left untouched).
+    """
+    max_dim = getattr(settings, "IMAGE_MAX_DIMENSION", 3200)
+    quality = getattr(settings, "IMAGE_JPEG_QUALITY", 85)
+
+    file.seek(0)
+    try:
+        img = Image.open(file)
+        fmt = img.format
+        if fmt not in _KEEP_FORMAT | _CONVERT or getattr(img, "n_frames", 1) > 1:
+            return None
+
+        # Only when the header carries EXIF: for a PNG, getexif() decodes the
+        # whole image looking for an eXIf chunk after the pixel data.
+        orientation = img.getexif().get(0x0112, 1) if "exif" in img.info else 1
+        metadata = bool({"exif", "xmp", "comment", "XML:com.adobe.xmp"} & set(img.info))
+        oversized = max(img.size) > max_dim
+        if fmt in _KEEP_FORMAT and orientation == 1 and not metadata and not oversized:
+            return None
+
+        if oversized and fmt == "JPEG":
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale: far less memory and
+            # time than decoding 8000px just to throw most of it away.
+            img.draft(img.mode, (max_dim, max_dim))
+        icc_profile = img.info.get("icc_profile")
+        img = ImageOps.exif_transpose(img)
+        # Pillow carries some metadata (comments, XMP) over on save.
+        img.info = {k: v for k, v in img.info.items() if k == "transparency"}
+        if max(img.size) > max_dim:
+            img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    finally:
+        file.seek(0)
+
+    out_fmt = fmt if fmt in _KEEP_FORMAT else ("PNG" if _has_alpha(img) else "JPEG")
+    options = {"icc_profile": icc_profile} if icc_profile else {}
+    if out_fmt == "JPEG":
+        if img.mode not in ("RGB", "L", "CMYK"):
+            img = img.convert("RGB")
+        options.update(quality=quality, optimize=True, progressive=True)
+    elif out_fmt == "PNG":
+        options.update(optimize=True)
+    else:
+        options.update(quality=quality, method=4)
+
+    buf = io.BytesIO()
+    img.save(buf, out_fmt, **options)
+    base = os.path.splitext(os.path.basename(name or getattr(file, "name", "") or "image"))[0]
+    return ContentFile(buf.getvalue(), name=base + _EXTENSIONS[out_fmt])
@@ -1,7 +1,24 @@
-from django.http import HttpResponse
-from django.shortcuts import redirect
+import mimetypes
+import os
+import posixpath
 
-from .models import SiteContent
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils._os import safe_join
+from django.views.static import serve
+from wagtail import hooks
+from wagtail.documents import get_document_model
+from wagtail.documents.models import document_served
+from wagtail.images import get_image_model
+
+from .models import CVVariantDocument, SiteContent
+from .serving import (
+    DIGEST_LENGTH, IMMUTABLE, IMMUTABLE_PRIVATE, accel_location, document_filename, document_url,
+    rendition_digest, serve_stored_file,
+)
+from .validators import PRIVATE_MEDIA_DIRS
 
 
 def _site_content():
@@ -13,11 +30,111 @@ def root(request):
     return redirect("/cms/")
 
 
-def resume_pdf(request):
-    """Open the cached, auto-generated CV PDF (regenerated only when stale)."""
-    from main.cv import get_cv_document
+def resume_pdf(request, variant=None):
+    """Open a cached, auto-generated CV PDF variant (regenerated only when
+    stale). Without a variant, the default (full) CV."""
+    from main.cv import DEFAULT_CV_VARIANT, get_cv_document
 
-    doc = get_cv_document(_site_content())
+    variant = variant or DEFAULT_CV_VARIANT
+    doc = get_cv_document(_site_content(), variant)
     if not doc:
         return HttpResponse("CV is unavailable.", status=404, content_type="text/plain")
-    return redirect(doc.url)
+    if not CVVariantDocument.objects.filter(variant=variant, document=doc).exists():
+        return redirect(document_url(doc))
+    # Hand off to the content-hashed URL, which is cacheable forever. The
+    # hash is of the stored PDF: a rebuild from the same inputs (same
+    # fingerprint) can still produce different bytes.
+    return redirect("resume-pdf-hashed", variant=variant, digest=doc.get_file_hash()[:16])
+
+
+def resume_pdf_hashed(request, variant, digest):
+    """Serve a CV variant at its content-hashed URL with a strong ETag,
+    immutable caching and Range support (or an nginx X-Accel-Redirect)."""
+    from main.cv import CV_VARIANTS
+
+    sc = _site_content()
+    row = (
+        CVVariantDocument.objects.filter(variant=variant).select_related("document").first()
+        if sc and sc.cv_enabled and variant in CV_VARIANTS else None
+    )
+    if not row or not row.document:
+        return HttpResponse("CV is unavailable.", status=404, content_type="text/plain")
+    file_hash = row.document.get_file_hash()
+    if file_hash[:16] != digest:
+        # An older render: send the client to whatever is current now.
+        return redirect("resume-pdf-variant", variant=variant)
+    return serve_stored_file(
+        request, row.document.file,
+        etag=f'"{file_hash}"', content_type="application/pdf",
+        filename=CV_VARIANTS[variant]["filename"],
+    )
+
+
+def media(request, path):
+    """/media/<path> when nginx isn't serving it directly (e.g. behind the
+    frontend proxy): Django only resolves the path, nginx sends the bytes
+    via X-Accel-Redirect when MEDIA_ACCEL_REDIRECT_PREFIX is set."""
+    # Checked on the normalised path: serve()/safe_join resolve "./", "//"
+    # and "../" before opening the file.
+    top = posixpath.normpath(path).lstrip("/").split("/", 1)[0]
+    if top in PRIVATE_MEDIA_DIRS:
+        raise Http404("No such file.")
+    if not accel_location(path):
+        return serve(request, path, document_root=settings.MEDIA_ROOT)
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("No such file.")
+    if not os.path.isfile(full_path):
+        raise Http404("No such file.")
+    response = HttpResponse(content_type=mimetypes.guess_type(full_path)[0] or "application/octet-stream")
+    response["X-Accel-Redirect"] = accel_location(path)
+    return response
+
+
+def media_hashed(request, digest, name):
+    """Serve an image rendition at its content-hashed URL
+    (main.serving.hashed_media_url) with immutable caching."""
+    Rendition = get_image_model().get_rendition_model()
+    rendition = Rendition.objects.filter(file=name).select_related("image").first()
+    if not rendition:
+        raise Http404("No such rendition.")
+    current = rendition_digest(rendition)
+    if digest != current:
+        # An older (or unhashed) URL: send the client to the current one.
+        return redirect(rendition.url)
+    return serve_stored_file(
+        request, rendition.file, etag=f'"{current}"',
+        content_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+    )
+
+
+def document_hashed(request, document_id, digest, filename):
+    """Serve a Wagtail document at its content-hashed URL
+    (main.serving.document_url), with the same privacy checks as Wagtail's
+    own /documents/ view plus immutable caching."""
+    Document = get_document_model()
+    doc = get_object_or_404(Document, id=document_id)
+    if filename not in (document_filename(doc), doc.filename):
+        raise Http404("This document does not match the given filename.")
+
+    # Collection view restrictions (password/login) are enforced here.
+    for fn in hooks.get_hooks("before_serve_document"):
+        result = fn(doc, request)
+        if isinstance(result, HttpResponse):
+            return result
+
+    if digest != doc.file_hash[:DIGEST_LENGTH]:
+        return redirect(document_url(doc))
+
+    document_served.send(sender=Document, instance=doc, request=request)
+    restricted = doc.collection.get_view_restrictions().exists()
+    response = serve_stored_file(
+        request, doc.file, etag=f'"{doc.file_hash}"', content_type=doc.content_type,
+        filename=document_filename(doc), cache_control=IMMUTABLE_PRIVATE if restricted else IMMUTABLE,
+        inline=doc.content_disposition == "inline",
+    )
+    if getattr(settings, "WAGTAILDOCS_BLOCK_EMBEDDED_CONTENT", True):
+        response["Content-Security-Policy"] = "default-src 'none'"
+    response["X-Content-Type-Options"] = "nosniff"
+    return response
@@ -3,14 +3,15 @@
 Registers the CV / résumé models as Wagtail snippets so all content is editable
 from the single Wagtail admin (/cms). Schema-neutral: these are the existing
 Django models, just surfaced in Wagtail with list views mirroring the old
-django-admin config.
+django-admin config. The background task queue is listed under Settings.
 """
+from wagtail.admin.panels import FieldPanel, MultiFieldPanel
 from wagtail.snippets.models import register_snippet
 from wagtail.snippets.views.snippets import SnippetViewSet, SnippetViewSetGroup
 
 from .models import (
     Education, Experience, Publication,
-    Grant, Award, Language, Skill,
+    Grant, Award, Language, Skill, Task,
 )
 
 
@@ -94,3 +95,27 @@ class CVViewSetGroup(SnippetViewSetGroup):
 
 
 register_snippet(CVViewSetGroup)
+
+
+class TaskViewSet(SnippetViewSet):
+    """Queued / running / failed background tasks. Set a failed task back to
+    "Queued" (and its run-after to now) to retry it."""
+    model = Task
+    icon = "cogs"
+    menu_label = "Tasks"
+    add_to_settings_menu = True
+    list_display = ("name", "status", "priority", "attempts", "run_after", "started_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "dedup_key", "last_error")
+    ordering = ("-created_at",)
+    inspect_view_enabled = True
+    panels = [
+        MultiFieldPanel(
+            [FieldPanel("status"), FieldPanel("priority"), FieldPanel("run_after"), FieldPanel("max_attempts")],
+            heading="Scheduling",
+        ),
+        FieldPanel("last_error", read_only=True),
+    ]
+
+
+register_snippet(TaskViewSet)
@@ -95,6 +95,30 @@ WAGTAILADMIN_BASE_URL = os.environ.get("WAGTAIL_BASE_URL", "http://localhost:300
 # Open PDFs (e.g. the generated CV) inline in the browser instead of downloading.
 WAGTAILDOCS_INLINE_CONTENT_TYPES = ["application/pdf"]
 
+# Adds an inline blur-up placeholder + dominant colour to every image.
+WAGTAILIMAGES_IMAGE_MODEL = "cms.CustomImage"
+
+# Identical uploads share one stored file (cms.signals); these admin forms
+# only delete a replaced file once nothing else uses it.
+WAGTAILIMAGES_IMAGE_FORM_BASE = "cms.forms.SharedFileImageForm"
+WAGTAILDOCS_DOCUMENT_FORM_BASE = "cms.forms.SharedFileDocumentForm"
+
+# Uploaded originals are re-oriented, stripped of metadata and capped at
+# IMAGE_MAX_DIMENSION px on the longest side by the image.verify task
+# (main.validators.normalise_image_file) before they reach public media. Uploads over IMAGE_MAX_PIXELS are
+# rejected from their header, before decoding (decompression-bomb guard).
+# Wagtail's own pixel check is off: it decodes the whole upload to count them.
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "3200"))
+IMAGE_MAX_PIXELS    = int(os.environ.get("IMAGE_MAX_PIXELS", "40000000"))
+IMAGE_JPEG_QUALITY  = int(os.environ.get("IMAGE_JPEG_QUALITY", "85"))
+WAGTAILIMAGES_MAX_IMAGE_PIXELS = None
+
+# Modern-format rendition variants offered in the image API (cms.images), best
+# first. AVIF is skipped automatically when Pillow cannot encode it.
+IMAGE_VARIANT_FORMATS = [
+    f.strip() for f in os.environ.get("IMAGE_VARIANT_FORMATS", "avif,webp").split(",") if f.strip()
+]
+
 # Public Next.js frontend base URL. Headless page serve/preview redirect here,
 # and the CMS "Preview" opens <FRONTEND_BASE_URL>/preview?content_type=&token=.
 FRONTEND_BASE_URL = os.environ.get("FRONTEND_BASE_URL", "http://localhost:8000").rstrip("/")
@@ -109,6 +133,67 @@ WAGTAIL_HEADLESS_PREVIEW = {
 ORCID_ID             = os.environ.get("ORCID_ID", "")
 # Your name as it appears in ORCID author lists — bolded in the PDF CV
 ORCID_HIGHLIGHT_NAME = os.environ.get("ORCID_HIGHLIGHT_NAME", "")
+# Optional: Semantic Scholar API key for `sync_citations` (higher rate limit)
+SEMANTIC_SCHOLAR_API_KEY = os.environ.get("SEMANTIC_SCHOLAR_API_KEY", "")
+
+# Optional on-disk cache for outbound API responses (main.http_client); only
+# calls that pass a cache_ttl use it. Empty = disabled.
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", "")
+# Record every outbound API response to, or replay them only from, gzipped
+# fixtures in this directory (offline runs, benchmarks, CI). See also the
+# --record / --replay flags of sync_orcid and sync_citations.
+HTTP_RECORD_DIR = os.environ.get("HTTP_RECORD_DIR", "")
+HTTP_REPLAY_DIR = os.environ.get("HTTP_REPLAY_DIR", "")
+
+# Per-job overrides for `run_scheduler` (see main.scheduler.JOBS), in seconds:
+# {"sync_orcid": {"interval": 43200, "jitter": 600}, "gen_cv": {"enabled": False}}
+SCHEDULER_JOBS = {}
+
+# Background task queue (`run_worker`): lease per running task before it is
+# considered abandoned, and how long finished tasks are kept.
+TASK_TIMEOUT        = int(os.environ.get("TASK_TIMEOUT", "1800"))
+TASK_RETENTION_DAYS = int(os.environ.get("TASK_RETENTION_DAYS", "7"))
+
+# Shared by all gunicorn workers and the `run_scheduler` process, so values it
+# warms or refreshes (GitHub stats, citation summary) are seen by every worker.
+# The table is created by `python manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+    # Wagtail's rendition lookups (an image's srcset ladder × formats is a few
+    # dozen keys). Per-process memory is enough, and avoids a DB write per key.
+    "renditions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "renditions",
+        "TIMEOUT": 3600,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+# Max CV variants compiled at once by `gen_cv` (each is a XeLaTeX process).
+CV_RENDER_CONCURRENCY = int(os.environ.get("CV_RENDER_CONCURRENCY", "2"))
+
+# When set (e.g. "/internal-media/"), files Django serves — the CV, Wagtail
+# documents, the /media/ fallback — are handed to nginx via X-Accel-Redirect to
+# this internal location instead of being streamed by a worker. Requires the
+# matching `internal` locations in nginx.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+if MEDIA_ACCEL_REDIRECT_PREFIX:
+    # Wagtail's /documents/ view sends files through this backend.
+    SENDFILE_BACKEND = "main.serving"
+
+# Route the `main` app's loggers (CV regeneration stats, sync commands) to the
+# console; Django's own logging config is left untouched.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "main": {"handlers": ["console"], "level": os.environ.get("MAIN_LOG_LEVEL", "INFO")},
+    },
+}
 
 
 def env_list(name: str, default: str = "") -> list[str]:
@@ -8,7 +8,6 @@ from wagtail.documents import urls as wagtaildocs_urls
 from wagtail import urls as wagtail_urls
 from wagtail.contrib.sitemaps import Sitemap as WagtailSitemap
 
-from django.conf import settings
 from cms.feeds import BlogRssFeed, BlogAtomFeed
 from portfolio.api import api_router
 from main.api import SiteBundleView
@@ -36,7 +35,7 @@ urlpatterns = [
     path("", include(wagtail_urls)),
 ]
 
-from django.views.static import serve
+from main.views import media
 urlpatterns += [
-    path("media/<path:path>", serve, {"document_root": settings.MEDIA_ROOT}),
+    path("media/<path:path>", media),
 ]